@@ -0,0 +1,192 @@
+import os
+import time
+import threading
+from collections import namedtuple
+
+# --- Asset Store ---
+# Product images are kept in one store, written by the manager and read by the storefront.
+# The backend is local disk (ASSET_DIR, default static/product_images) or an S3-compatible
+# bucket (ASSET_BACKEND=s3). Either way the store keeps an in-memory manifest of the assets
+# that exist, so building the catalog never checks files one product at a time:
+#   - writes and deletes through the store update the manifest directly;
+#   - changes made by another process (the manager writes, the storefront reads) are noticed
+#     through backend.version(): the directory's mtime for local disk, checked at most every
+#     ASSET_MANIFEST_CHECK_SECONDS, or a time bucket of ASSET_S3_LIST_SECONDS for S3, which
+#     has no cheap change marker and is re-listed instead.
+# Image URLs stored on products keep the /static/product_images/<key> form; with
+# ASSET_PUBLIC_URL set (e.g. a bucket or CDN address) new uploads point there instead.
+
+URL_PREFIX = '/static/product_images/'
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CHECK_SECONDS = float(os.getenv('ASSET_MANIFEST_CHECK_SECONDS', '1'))
+
+AssetInfo = namedtuple('AssetInfo', ['size', 'modified'])
+
+class LocalBackend:
+    """Assets as files in one directory."""
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def version(self):
+        try:
+            return os.stat(self.root).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def list(self):
+        try:
+            with os.scandir(self.root) as entries:
+                return {entry.name: AssetInfo(entry.stat().st_size, entry.stat().st_mtime)
+                        for entry in entries if entry.is_file() and not entry.name.startswith('.')}
+        except FileNotFoundError:
+            return {}
+
+    def put(self, key, data, content_type=None):
+        os.makedirs(self.root, exist_ok=True)
+        # Written under a dot name (which list() skips) and renamed, so readers never see half a file
+        temp_path = self.path(f".{key}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, self.path(key))
+        stat = os.stat(self.path(key))
+        return AssetInfo(stat.st_size, stat.st_mtime)
+
+    def read(self, key):
+        with open(self.path(key), 'rb') as f:
+            return f.read()
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+class S3Backend:
+    """Assets as objects under a prefix of an S3-compatible bucket (AWS S3, MinIO, ...).
+
+    `client` is anything with boto3's put_object/get_object/delete_object/list_objects_v2;
+    by default a boto3 client for ASSET_S3_ENDPOINT_URL (unset for AWS itself).
+    """
+    def __init__(self, bucket, prefix='', client=None, list_seconds=60):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("ASSET_BACKEND=s3 needs boto3: pip install boto3")
+            client = boto3.client('s3', endpoint_url=os.getenv('ASSET_S3_ENDPOINT_URL') or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.list_seconds = list_seconds
+
+    def version(self):
+        # No cheap way to tell whether anything changed, so the listing is simply renewed periodically
+        return int(time.time() // self.list_seconds)
+
+    def list(self):
+        assets = {}
+        kwargs = {'Bucket': self.bucket, 'Prefix': self.prefix}
+        while True:
+            page = self.client.list_objects_v2(**kwargs)
+            for obj in page.get('Contents', []):
+                key = obj['Key'][len(self.prefix):]
+                if key and '/' not in key:
+                    assets[key] = AssetInfo(obj['Size'], obj['LastModified'].timestamp())
+            if not page.get('IsTruncated'):
+                return assets
+            kwargs['ContinuationToken'] = page['NextContinuationToken']
+
+    def put(self, key, data, content_type=None):
+        extra = {'ContentType': content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data, **extra)
+        return AssetInfo(len(data), time.time())
+
+    def read(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)['Body'].read()
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+class AssetStore:
+    """A backend plus the in-memory manifest of what it holds."""
+    def __init__(self, backend, public_url=None, check_seconds=CHECK_SECONDS):
+        self.backend = backend
+        self.public_url = public_url.rstrip('/') + '/' if public_url else None
+        self.check_seconds = check_seconds
+        self._entries = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def manifest(self):
+        """{key: AssetInfo} for every stored asset; at most one backend check per check_seconds."""
+        now = time.monotonic()
+        if self._entries is None or now - self._checked_at >= self.check_seconds:
+            with self._lock:
+                if self._entries is None or now - self._checked_at >= self.check_seconds:
+                    # Version first: anything written during the listing shows up as a change next time
+                    version = self.backend.version()
+                    if self._entries is None or version != self._version:
+                        self._entries = self.backend.list()
+                        self._version = version
+                    self._checked_at = now
+        return self._entries
+
+    def get(self, key):
+        """The asset's AssetInfo, or None if it doesn't exist."""
+        return self.manifest().get(key)
+
+    def url(self, key):
+        return (self.public_url or URL_PREFIX) + key
+
+    def key_for_url(self, url):
+        """The key of an asset URL produced by url(), or None for anything else."""
+        for prefix in filter(None, (URL_PREFIX, self.public_url)):
+            if url and url.startswith(prefix):
+                return url[len(prefix):]
+        return None
+
+    def resolve(self, url):
+        """`url` if it points at an asset that exists, otherwise None (external URLs pass through)."""
+        if not url:
+            return None
+        key = self.key_for_url(url)
+        if key is None:
+            return url
+        return url if key in self.manifest() else None
+
+    def put(self, key, data, content_type=None):
+        """Stores an asset and returns its URL."""
+        if not key or '/' in key or key.startswith('.'):
+            raise ValueError(f"Invalid asset key: {key!r}")
+        info = self.backend.put(key, data, content_type)
+        with self._lock:
+            if self._entries is not None:
+                self._entries = {**self._entries, key: info}
+        return self.url(key)
+
+    def read(self, key):
+        return self.backend.read(key)
+
+    def delete(self, key):
+        self.backend.delete(key)
+        with self._lock:
+            if self._entries is not None and key in self._entries:
+                self._entries = {k: v for k, v in self._entries.items() if k != key}
+
+    def delete_url(self, url):
+        """Deletes the asset behind a URL from url(); other URLs are left alone."""
+        key = self.key_for_url(url)
+        if key is not None:
+            self.delete(key)
+
+def backend_from_env():
+    if os.getenv('ASSET_BACKEND', 'local') == 's3':
+        return S3Backend(os.environ['ASSET_S3_BUCKET'], os.getenv('ASSET_S3_PREFIX', 'product_images/'),
+                         list_seconds=float(os.getenv('ASSET_S3_LIST_SECONDS', '60')))
+    return LocalBackend(os.getenv('ASSET_DIR', os.path.join(APP_DIR, 'static', 'product_images')))
+
+store = AssetStore(backend_from_env(), public_url=os.getenv('ASSET_PUBLIC_URL'))
@@ -0,0 +1,364 @@
+let inventory = [];
+let cart = [];
+// Identifies this bag's stock holds on the server
+let cartId = newRandomId();
+
+function formatCurrency(num) {
+    return new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD' }).format(num);
+}
+
+let stockStream = null;
+
+async function loadProducts() {
+    try {
+        const response = await fetch('/api/products');
+        inventory = await response.json();
+        renderProducts();
+        subscribeToStock(response.headers.get('X-Stock-Seq'));
+    } catch (error) {
+        console.error('Error loading products:', error);
+        document.getElementById('inventory-grid').innerHTML = `
+            <div class="col-span-full text-center py-12 text-stone-500">
+                <p>Error loading products. Please try again later.</p>
+            </div>
+        `;
+    }
+}
+
+// Live stock updates: the server pushes {product_id: stock} deltas whenever stock changes
+function subscribeToStock(sinceSeq) {
+    if (!window.EventSource || stockStream) return;
+    const url = sinceSeq ? `/api/stock/stream?since=${encodeURIComponent(sinceSeq)}` : '/api/stock/stream';
+    stockStream = new EventSource(url);
+    stockStream.addEventListener('stock', event => applyStockChanges(JSON.parse(event.data)));
+    stockStream.addEventListener('resync', () => {
+        stockStream.close();
+        stockStream = null;
+        loadProducts();
+    });
+}
+
+function applyStockChanges(changes) {
+    let catalogChanged = false;
+    for (const [id, stock] of Object.entries(changes)) {
+        const productId = Number(id);
+        const product = inventory.find(i => i.id === productId);
+        if (product) {
+            product.stock = stock;
+            catalogChanged = true;
+        } else if (stock > 0) {
+            // Restocked or new product: fetch its details with the rest of the catalog
+            stockStream.close();
+            stockStream = null;
+            loadProducts();
+            return;
+        }
+
+        // Items already in the bag are held for it, so they stay even if the rest sells out
+    }
+    if (catalogChanged) {
+        inventory = inventory.filter(i => i.stock > 0);
+        renderProducts();
+    }
+}
+
+function renderProducts() {
+    const grid = document.getElementById('inventory-grid');
+
+    if (inventory.length === 0) {
+        grid.innerHTML = `
+            <div class="col-span-full text-center py-12 text-stone-500">
+                <p class="text-lg">No products available at the moment.</p>
+                <p class="text-sm mt-2">Check back soon!</p>
+            </div>
+        `;
+        return;
+    }
+
+    grid.innerHTML = inventory.map(item => `
+        <div class="group flex flex-col">
+            <div class="aspect-[4/5] overflow-hidden rounded-2xl mb-5 bg-stone-800 relative shadow-lg shadow-black/40">
+                <img src="${item.image}" alt="${item.name}" 
+                     class="w-full h-full object-cover opacity-90 group-hover:opacity-100 transition-all duration-700 group-hover:scale-105" 
+                     onerror="this.src='https://via.placeholder.com/400x500/272b33/e2e8f0?text=${encodeURIComponent(item.category)}'">
+
+                <div class="absolute top-3 left-3 bg-black/60 backdrop-blur-md px-3 py-1 rounded-full text-xs text-stone-200 tracking-wide border border-white/10">
+                    ${item.category}
+                </div>
+            </div>
+
+            <div class="flex justify-between items-start mb-2">
+                <h3 class="font-serif text-xl text-stone-100 group-hover:text-gold-400 transition-colors cursor-pointer" onclick="addToCart(${item.id})">${item.name}</h3>
+                <span class="font-serif text-lg text-stone-300">${formatCurrency(item.price)}</span>
+            </div>
+
+            <p class="text-sm text-stone-500 leading-relaxed mb-4 flex-grow font-light">${item.desc}</p>
+
+            <button onclick="addToCart(${item.id})" class="w-full border border-stone-700 text-stone-300 py-3 rounded-xl hover:bg-stone-100 hover:text-stone-900 hover:border-stone-100 transition-all duration-300 text-sm uppercase tracking-widest font-medium">
+                Add to Bag
+            </button>
+        </div>
+    `).join('');
+
+    lucide.createIcons();
+}
+
+// Every change to the bag holds (or returns) the units on the server for a while, so what's
+// in the bag can't sell out before checkout. Resolves to {held, available}, where available is
+// how many the bag could hold when there weren't enough.
+async function holdInCart(item, qty) {
+    try {
+        const response = await fetch(`/api/cart/${encodeURIComponent(cartId)}/items/${item.id}`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ qty })
+        });
+        if (response.ok) return { held: true };
+        const data = await response.json();
+        showToast(data.available > 0 ? `Only ${data.available} ${item.name} available` : `${item.name} just sold out`);
+        return { held: false, available: data.available || 0 };
+    } catch (error) {
+        showToast('Could not update your bag. Please try again.');
+        return { held: false, available: 0 };
+    }
+}
+
+async function addToCart(id) {
+    const item = inventory.find(i => i.id === id);
+    const existing = cart.find(i => i.id === id);
+
+    if (!(await holdInCart(item, existing ? existing.qty + 1 : 1)).held) return;
+    if (existing) {
+        existing.qty++;
+    } else {
+        cart.push({ ...item, qty: 1 });
+    }
+
+    updateCartUI();
+    showToast(`Added ${item.name}`);
+
+    const fab = document.querySelector('button.fixed');
+    fab.classList.add('scale-110');
+    setTimeout(() => fab.classList.remove('scale-110'), 200);
+}
+
+function removeFromCart(id) {
+    cart = cart.filter(i => i.id !== id);
+    updateCartUI();
+    // Unreturned holds expire on their own
+    fetch(`/api/cart/${encodeURIComponent(cartId)}/items/${id}`, { method: 'DELETE' }).catch(() => {});
+}
+
+async function updateQuantity(id, change) {
+    const item = cart.find(i => i.id === id);
+    if (!item) return;
+
+    const qty = item.qty + change;
+    if (qty <= 0) {
+        removeFromCart(id);
+    } else if ((await holdInCart(item, qty)).held) {
+        item.qty = qty;
+        updateCartUI();
+    }
+}
+
+// Holds the whole bag again after its holds expired, keeping what's still available
+async function holdCartAgain() {
+    for (const item of [...cart]) {
+        const result = await holdInCart(item, item.qty);
+        if (!result.held) {
+            item.qty = result.available > 0 && (await holdInCart(item, result.available)).held ? result.available : 0;
+        }
+        if (item.qty === 0) {
+            cart = cart.filter(i => i !== item);
+        }
+    }
+    updateCartUI();
+}
+
+function updateCartUI() {
+    const cartCount = document.getElementById('cart-count');
+    const cartItemsContainer = document.getElementById('cart-items');
+    const cartTotalEl = document.getElementById('cart-total');
+
+    const totalQty = cart.reduce((sum, item) => sum + item.qty, 0);
+    cartCount.textContent = totalQty;
+    cartCount.style.opacity = totalQty > 0 ? '1' : '0';
+
+    const totalValue = cart.reduce((sum, item) => sum + (item.price * item.qty), 0);
+    cartTotalEl.textContent = formatCurrency(totalValue);
+
+    if (cart.length === 0) {
+        cartItemsContainer.innerHTML = `
+            <div class="h-full flex flex-col items-center justify-center text-stone-500">
+                <i data-lucide="shopping-bag" class="w-16 h-16 mb-4 opacity-20 stroke-1"></i>
+                <p class="text-lg font-light">Your collection is empty.</p>
+                <button onclick="toggleCart()" class="mt-6 text-gold-400 hover:text-gold-500 text-sm uppercase tracking-widest border-b border-gold-400/30 pb-1">Return to Shop</button>
+            </div>
+        `;
+    } else {
+        cartItemsContainer.innerHTML = cart.map(item => `
+            <div class="flex gap-5 items-center">
+                <div class="w-20 h-24 bg-stone-800 rounded-lg overflow-hidden flex-shrink-0 border border-stone-700/50">
+                    <img src="${item.image}" class="w-full h-full object-cover" alt="${item.name}">
+                </div>
+                <div class="flex-1 min-w-0 py-1">
+                    <div class="flex justify-between items-start">
+                        <h4 class="text-stone-100 font-serif text-lg leading-tight mb-1">${item.name}</h4>
+                        <p class="text-stone-300 text-lg font-serif">${formatCurrency(item.price * item.qty)}</p>
+                    </div>
+                    <p class="text-stone-500 text-xs uppercase tracking-wider mb-3">${item.category}</p>
+
+                    <div class="flex items-center gap-4">
+                        <div class="flex items-center bg-stone-800 rounded-lg border border-stone-700/50">
+                            <button onclick="updateQuantity(${item.id}, -1)" class="w-8 h-8 flex items-center justify-center text-stone-400 hover:text-white hover:bg-stone-700 rounded-l-lg transition-colors">-</button>
+                            <span class="text-sm font-medium w-6 text-center text-stone-200">${item.qty}</span>
+                            <button onclick="updateQuantity(${item.id}, 1)" class="w-8 h-8 flex items-center justify-center text-stone-400 hover:text-white hover:bg-stone-700 rounded-r-lg transition-colors">+</button>
+                        </div>
+                        <button onclick="removeFromCart(${item.id})" class="text-xs text-stone-500 hover:text-red-400 underline decoration-stone-700 underline-offset-2">Remove</button>
+                    </div>
+                </div>
+            </div>
+        `).join('');
+    }
+
+    lucide.createIcons();
+}
+
+function toggleCart() {
+    const modal = document.getElementById('cart-modal');
+    if (modal.classList.contains('translate-y-full')) {
+        modal.classList.remove('translate-y-full');
+        modal.classList.add('translate-y-0');
+        document.body.style.overflow = 'hidden';
+    } else {
+        modal.classList.add('translate-y-full');
+        modal.classList.remove('translate-y-0');
+        document.body.style.overflow = '';
+    }
+}
+
+function showToast(message) {
+    const container = document.getElementById('toast-container');
+    const toast = document.createElement('div');
+    toast.className = 'toast-enter inline-flex items-center justify-center bg-stone-800/90 backdrop-blur text-stone-100 px-6 py-3 rounded-full shadow-2xl border border-stone-700/50 text-sm font-medium gap-3 mb-3';
+    toast.innerHTML = `<i data-lucide="check" class="w-4 h-4 text-gold-400"></i> ${message}`;
+
+    container.appendChild(toast);
+    lucide.createIcons();
+
+    setTimeout(() => {
+        toast.style.opacity = '0';
+        toast.style.transform = 'translate(0, 20px)';
+        toast.style.transition = 'all 0.3s ease';
+        setTimeout(() => toast.remove(), 300);
+    }, 2500);
+}
+
+function newRandomId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`;
+}
+
+async function postWithRetry(url, payload, idempotencyKey, attempts = 3) {
+    for (let attempt = 1; ; attempt++) {
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': idempotencyKey,
+                },
+                body: JSON.stringify(payload)
+            });
+            // Retry server errors; 4xx responses are final
+            if (response.status < 500 || attempt >= attempts) {
+                return response;
+            }
+        } catch (error) {
+            if (attempt >= attempts) {
+                throw error;
+            }
+        }
+        await new Promise(resolve => setTimeout(resolve, 500 * 2 ** (attempt - 1)));
+    }
+}
+
+async function checkout() {
+    if (cart.length === 0) return;
+
+    const customerName = prompt('Enter your name:');
+    if (!customerName) return;
+
+    const customerEmail = prompt('Enter your email:');
+    if (!customerEmail) return;
+
+    const btn = document.querySelector('#cart-modal button[onclick="checkout()"]');
+    const originalText = btn.innerHTML;
+
+    btn.innerHTML = `<i data-lucide="loader" class="animate-spin w-5 h-5"></i> Processing...`;
+    btn.disabled = true;
+    btn.classList.add('opacity-75');
+    lucide.createIcons();
+
+    try {
+        // One key per checkout attempt: retries reuse it so the server never places the order twice
+        const idempotencyKey = newRandomId();
+        const response = await postWithRetry('/api/orders', {
+            customer_name: customerName,
+            customer_email: customerEmail,
+            cart_id: cartId,
+            items: cart.map(item => ({ id: item.id, qty: item.qty }))
+        }, idempotencyKey);
+
+        const data = await response.json();
+
+        if (response.ok) {
+            cart = [];
+            cartId = newRandomId();
+            updateCartUI();
+            toggleCart();
+            showToast(`Order #${data.order_id} placed! Total: ${formatCurrency(data.total)}`);
+            loadProducts(); // Refresh inventory
+        } else if (data.code === 'reservation_expired') {
+            await holdCartAgain();
+            showToast('Your bag was no longer reserved. Please check it and try again.');
+        } else {
+            showToast(`Error: ${data.error}`);
+        }
+    } catch (error) {
+        showToast('Error placing order. Please try again.');
+        console.error('Checkout error:', error);
+    } finally {
+        btn.innerHTML = originalText;
+        btn.disabled = false;
+        btn.classList.remove('opacity-75');
+        lucide.createIcons();
+    }
+}
+
+// The first page of the catalog is embedded in the page by the server, so products show
+// without waiting for /api/products; the rest of a larger catalog is fetched afterwards
+function loadEmbeddedCatalog() {
+    const embedded = document.getElementById('catalog-data');
+    if (!embedded) return false;
+    const catalog = JSON.parse(embedded.textContent);
+    inventory = catalog.products;
+    renderProducts();
+    if (inventory.length < catalog.total) {
+        loadProducts();
+    } else {
+        subscribeToStock(catalog.stock_seq);
+    }
+    return true;
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', () => {
+    if (!loadEmbeddedCatalog()) {
+        loadProducts();
+    }
+    lucide.createIcons();
+});
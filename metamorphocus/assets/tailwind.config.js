@@ -0,0 +1,32 @@
+// Shared by the build (`python bundle.py`, via the Tailwind CLI) and by development pages,
+// where the Tailwind CDN script picks it up from `tailwind.config`.
+const storefrontTailwindConfig = {
+    content: ['./templates/**/*.html', './assets/**/*.js'],
+    theme: {
+        extend: {
+            fontFamily: {
+                serif: ['"Playfair Display"', 'serif'],
+                sans: ['"Inter"', 'sans-serif'],
+            },
+            colors: {
+                stone: {
+                    900: '#0f1115',
+                    800: '#1a1d23',
+                    700: '#272b33',
+                    300: '#a8aeb8',
+                    100: '#e2e8f0',
+                },
+                gold: {
+                    400: '#d4af37',
+                    500: '#b5952f',
+                }
+            }
+        }
+    }
+};
+
+if (typeof module !== 'undefined') {
+    module.exports = storefrontTailwindConfig;
+} else {
+    tailwind.config = storefrontTailwindConfig;
+}
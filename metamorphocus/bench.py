@@ -0,0 +1,548 @@
+"""Performance benchmarks for the manager app and storefront.
+
+Usage:
+    python bench.py reruns [--repeat N] [--orders N] [--products N]
+    python bench.py charts [--repeat N] [--orders N] [--products N]
+    python bench.py bootstrap [--repeat N] [--orders N] [--products N]
+    python bench.py pages [--repeat N] [--orders N] [--products N]
+    python bench.py boot [--repeat N] [--orders N] [--products N]
+    python bench.py images [--repeat N] [--requests N] [--images N] [--size-kb N]
+    python bench.py shards [--threads N] [--checkouts N] [--stock N] [--shards N] [--database-url URL]
+
+Every benchmark runs against a throwaway SQLite database seeded with synthetic data,
+never against DATABASE_URL; `shards` can instead use a scratch server database given
+with --database-url.
+"""
+import os
+import sys
+import time
+import random
+import json
+import argparse
+import subprocess
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def use_scratch_database():
+    """Points DATABASE_URL at a new temporary SQLite file. Must run before `database` is imported."""
+    path = os.path.join(tempfile.mkdtemp(prefix='metamorphocus-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    return path
+
+def seed(products=200, orders=1000, seed_value=42):
+    """Fills the scratch database with products, materials, orders, ideas, production runs and finance rows."""
+    from database import init_db, get_db, Inventory, Material, BillOfMaterials, Order, OrderItem, Idea, ProductionOrder, Finance
+
+    rng = random.Random(seed_value)
+    init_db()
+    db = get_db()
+    try:
+        categories = ['Prints', 'Stickers', 'Jewelry', 'Apparel', 'Home']
+        db.add_all([Inventory(
+            product_name=f"Product {i}", sku=f"SKU-{i:05d}", category=rng.choice(categories),
+            stock_level=rng.randint(0, 100), min_stock=10, unit_price=round(rng.uniform(5, 80), 2)
+        ) for i in range(products)])
+        db.add_all([Material(
+            material_name=f"Material {i}", category='Supplies', quantity=rng.uniform(0, 200), unit='pcs',
+            supplier='Bench Supply Co', reorder_point=20, cost_per_unit=round(rng.uniform(0.1, 10), 2)
+        ) for i in range(products // 2)])
+        db.flush()
+        product_ids = [row.id for row in db.query(Inventory.id)]
+        material_ids = [row.id for row in db.query(Material.id)]
+        db.add_all([BillOfMaterials(product_id=product_id, material_id=rng.choice(material_ids), quantity_needed=rng.randint(1, 5))
+                    for product_id in product_ids])
+
+        start = datetime.utcnow() - timedelta(days=365)
+        statuses = ['pending', 'processing', 'completed', 'cancelled']
+        for i in range(orders):
+            items = [(rng.choice(product_ids), rng.randint(1, 3), round(rng.uniform(5, 80), 2)) for _ in range(rng.randint(1, 4))]
+            order = Order(
+                customer_name=f"Customer {i}", customer_email=f"customer{i}@example.com",
+                total_amount=round(sum(quantity * price for _, quantity, price in items), 2),
+                status=rng.choice(statuses), created_at=start + timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+            )
+            order.items = [OrderItem(product_id=product_id, product_name=f"Product {product_id}", quantity=quantity, price=price)
+                           for product_id, quantity, price in items]
+            db.add(order)
+
+        db.add_all([Idea(title=f"Idea {i}", description="Benchmark idea", status=rng.choice(['Brainstorming', 'In Progress', 'Completed', 'On Hold']),
+                         priority=rng.choice(['High', 'Medium', 'Low']), assigned_to=rng.choice(['Emily', 'Sage', 'Both']))
+                    for i in range(products // 2)])
+        db.add_all([ProductionOrder(product_id=rng.choice(product_ids), quantity_produced=rng.randint(1, 20), produced_by=rng.choice(['Emily', 'Sage', 'Both']),
+                                    production_date=date.today() - timedelta(days=rng.randint(0, 365)), material_cost=round(rng.uniform(5, 200), 2))
+                    for _ in range(orders // 2)])
+        db.add_all([Finance(date=date.today() - timedelta(days=rng.randint(0, 365)), type=rng.choice(['Income', 'Expense']),
+                            category='Bench', description=f"Transaction {i}", amount=round(rng.uniform(1, 500), 2))
+                    for i in range(orders)])
+        db.commit()
+    finally:
+        db.close()
+
+def summarize(samples):
+    """Returns (median, min) in milliseconds."""
+    return statistics.median(samples) * 1000, min(samples) * 1000
+
+# --- Manager Reruns ---
+# A widget change used to rerun the whole page. Sections that are now fragments rerun on
+# their own in a live session, so for each interaction this reports the full-script rerun
+# (what every interaction cost before) next to the fragment's own run time (what it costs now).
+
+RERUN_SCENARIOS = [
+    # (page, fragment name, description, interaction)
+    ("🛒 Orders", "Order card", "change one order's status",
+     lambda at, i: at.selectbox(key=f"status_{first_order_id(at)}").set_value(['processing', 'completed'][i % 2])),
+    ("📦 Inventory", "Inventory list", "type in product search",
+     lambda at, i: at.text_input[0].set_value(f"Product {i % 10}")),
+    ("🏭 Production", "Production history", "change producer filter",
+     lambda at, i: at.selectbox(key="production_history_producer").set_value(['Emily', 'Sage'][i % 2])),
+    ("💡 Ideas", "Ideas", "change idea status filter",
+     lambda at, i: at.selectbox[0].set_value(['In Progress', 'Completed'][i % 2])),
+    ("📈 Analytics", "Cash flow", "narrow cash flow range",
+     lambda at, i: at.date_input(key="cash_flow_range").set_value((date.today() - timedelta(days=30 + i), date.today()))),
+]
+
+def first_order_id(at):
+    # Cancelled orders' status selectors are disabled
+    keys = [sb.key for sb in at.selectbox if sb.key and sb.key.startswith('status_') and not sb.disabled]
+    return int(keys[0].split('_')[1])
+
+def bench_reruns(args):
+    use_scratch_database()
+    seed(products=args.products, orders=args.orders)
+
+    import instrumentation
+    from streamlit.testing.v1 import AppTest
+
+    print(f"{'page':<16} {'interaction':<28} {'full rerun ms':>14} {'fragment ms':>12} {'speedup':>8}")
+    for page, fragment, description, interact in RERUN_SCENARIOS:
+        at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=120)
+        at.run()
+        at.sidebar.radio[0].set_value(page).run()
+        if at.exception:
+            raise RuntimeError(f"{page} failed to render: {at.exception}")
+
+        full_runs, fragment_runs = [], []
+        for i in range(args.repeat):
+            interact(at, i)
+            started = time.perf_counter()
+            at.run()
+            full_runs.append(time.perf_counter() - started)
+            if at.exception:
+                raise RuntimeError(f"{page} failed after '{description}': {at.exception}")
+            stats = instrumentation.scope_snapshot(f"{page} › {fragment}")
+            fragment_runs.append(stats['last_run']['duration_ms'] / 1000)
+
+        full_ms, _ = summarize(full_runs)
+        fragment_ms, _ = summarize(fragment_runs)
+        print(f"{page:<16} {description:<28} {full_ms:>14.1f} {fragment_ms:>12.1f} {full_ms / fragment_ms:>7.1f}x")
+
+# --- Chart Cache ---
+# Rerun time of the chart-heavy pages with an empty figure cache (every figure is built
+# and converted, as before charts.py) and with a warm one (data unchanged since last run).
+
+CHART_PAGES = ["🏠 Dashboard", "📈 Analytics", "💰 Finance"]
+
+def bench_charts(args):
+    use_scratch_database()
+    seed(products=args.products, orders=args.orders)
+
+    import charts
+    from streamlit.testing.v1 import AppTest
+
+    print(f"{'page':<16} {'cold ms':>10} {'warm ms':>10} {'figures':>8}")
+    for page in CHART_PAGES:
+        at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=120)
+        at.run()
+        at.sidebar.radio[0].set_value(page)
+
+        cold_runs, warm_runs = [], []
+        for _ in range(args.repeat):
+            charts.figure_cache.clear()
+            started = time.perf_counter()
+            at.run()
+            cold_runs.append(time.perf_counter() - started)
+            figures = len(charts.figure_cache)
+            started = time.perf_counter()
+            at.run()
+            warm_runs.append(time.perf_counter() - started)
+            if at.exception:
+                raise RuntimeError(f"{page} failed to render: {at.exception}")
+
+        cold_ms, _ = summarize(cold_runs)
+        warm_ms, _ = summarize(warm_runs)
+        print(f"{page:<16} {cold_ms:>10.1f} {warm_ms:>10.1f} {figures:>8}")
+
+# --- Schema Bootstrap ---
+# Every manager rerun used to start with init_db(): create_all checking each table, the index
+# checks and the migrations. The app now bootstraps once per process behind st.cache_resource.
+# This reports what init_db() costs (the work that preceded every rerun), what bootstrap()
+# costs on a current schema (first rerun of a new process), and manager reruns as they are now.
+
+BOOTSTRAP_PAGES = ["💡 Ideas", "👷 Labor", "🏠 Dashboard"]
+
+def bench_bootstrap(args):
+    use_scratch_database()
+    seed(products=args.products, orders=args.orders)
+
+    import database
+    import instrumentation
+    from streamlit.testing.v1 import AppTest
+
+    print(f"{'step':<30} {'median ms':>10} {'min ms':>8} {'queries':>8}")
+    for label, step in [("init_db() (was every rerun)", database.init_db), ("bootstrap() (once per process)", database.bootstrap)]:
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            with instrumentation.scoped_run(f"bench › {label}") as run:
+                step()
+            samples.append(time.perf_counter() - started)
+        median_ms, min_ms = summarize(samples)
+        print(f"{label:<30} {median_ms:>10.1f} {min_ms:>8.1f} {run.queries:>8}")
+
+    print()
+    print(f"{'page':<16} {'rerun ms':>10} {'+ init_db ms':>13} {'saved':>7}")
+    init_ms, _ = summarize([_timed(database.init_db) for _ in range(args.repeat)])
+    for page in BOOTSTRAP_PAGES:
+        at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=120)
+        at.run()
+        at.sidebar.radio[0].set_value(page).run()
+        if at.exception:
+            raise RuntimeError(f"{page} failed to render: {at.exception}")
+        rerun_ms, _ = summarize([_timed(at.run) for _ in range(args.repeat)])
+        print(f"{page:<16} {rerun_ms:>10.1f} {rerun_ms + init_ms:>13.1f} {init_ms / (rerun_ms + init_ms):>6.0%}")
+
+# --- Manager Pages ---
+# Cold start: a fresh Python process rendering the manager's first page (what a new server
+# process pays), including which heavy modules that pulled in. Rerun: a widget-free rerun of
+# each page in a warm process.
+
+COLD_START_SCRIPT = '''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+before = set(sys.modules)
+started = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - started
+heavy = sorted(m for m in ('plotly.express', 'plotly.graph_objects', 'pyarrow.parquet', 'numpy') if m in sys.modules and m not in before)
+print(json.dumps({'ms': elapsed * 1000, 'modules': len(set(sys.modules) - before), 'heavy': heavy, 'error': bool(at.exception)}))
+'''
+
+PAGES = ["🏠 Dashboard", "📈 Analytics", "📦 Inventory", "🔧 Materials", "🏭 Production",
+         "💰 Finance", "👷 Labor", "🛒 Orders", "💡 Ideas", "🧪 Test Data"]
+
+def bench_pages(args):
+    use_scratch_database()
+    seed(products=args.products, orders=args.orders)
+
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.join(APP_DIR, 'app.py')
+    cold = []
+    for _ in range(args.repeat):
+        result = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, app_path], capture_output=True, text=True,
+                                cwd=APP_DIR, env=os.environ, check=True)
+        cold.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        if cold[-1]['error']:
+            raise RuntimeError("First page failed to render in a fresh process")
+    cold_ms, cold_min = summarize([run['ms'] / 1000 for run in cold])
+    print(f"cold start (first page, new process): median {cold_ms:.1f} ms, min {cold_min:.1f} ms, "
+          f"{cold[-1]['modules']} modules imported, heavy: {', '.join(cold[-1]['heavy']) or 'none'}")
+
+    print()
+    print(f"{'page':<16} {'first ms':>10} {'rerun ms':>10}")
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.run()
+    for page in PAGES:
+        at.sidebar.radio[0].set_value(page)
+        first = _timed(at.run)
+        if at.exception:
+            raise RuntimeError(f"{page} failed to render: {at.exception}")
+        rerun_ms, _ = summarize([_timed(at.run) for _ in range(args.repeat)])
+        print(f"{page:<16} {first * 1000:>10.1f} {rerun_ms:>10.1f}")
+
+# --- Storefront Boot ---
+# What a new storefront worker pays before it can answer: importing sales.py (broken down by
+# top-level package with `python -X importtime`), create_app(), and the first request, which
+# now carries the one-time schema check and job worker start. The app's own modules are also
+# listed with their cumulative time (including whatever they import first), which shows
+# whether deferring one of sales.py's imports would pay off.
+
+BOOT_SCRIPT = '''
+import json, time
+started = time.perf_counter()
+import sales
+imported = time.perf_counter()
+app = sales.create_app()
+created = time.perf_counter()
+client = app.test_client()
+assert client.get('/api/products').status_code == 200
+first = time.perf_counter()
+assert client.get('/api/products').status_code == 200
+second = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': created - imported,
+                  'first_request': first - created, 'second_request': second - first}))
+'''
+
+def import_costs(importtime_output):
+    """Sums `-X importtime` self times (microseconds) by top-level package."""
+    totals = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    return totals
+
+def app_module_costs(importtime_output):
+    """Cumulative `-X importtime` times (microseconds) of the app's own modules."""
+    costs = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name != 'sales' and os.path.exists(os.path.join(APP_DIR, name.replace('.', os.sep) + '.py')):
+            costs[name] = int(cumulative_us)
+    return costs
+
+def bench_boot(args):
+    use_scratch_database()
+    seed(products=args.products, orders=args.orders)
+
+    runs, packages, modules = [], {}, {}
+    for _ in range(args.repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT], capture_output=True, text=True,
+                                cwd=APP_DIR, env=os.environ, check=True)
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        packages = import_costs(result.stderr)
+        modules = app_module_costs(result.stderr)
+
+    # -X importtime adds some overhead of its own, so compare these numbers with each other
+    print(f"{'step':<20} {'median ms':>10} {'min ms':>8}")
+    for step in ('import', 'create_app', 'first_request', 'second_request'):
+        median_ms, min_ms = summarize([run[step] for run in runs])
+        print(f"{step:<20} {median_ms:>10.1f} {min_ms:>8.1f}")
+    print()
+    print("slowest imports (self time by package, last run):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {package:<28} {self_us / 1000:>8.1f} ms")
+    print()
+    print("app modules imported by sales.py (cumulative, last run):")
+    for module, cumulative_us in sorted(modules.items(), key=lambda item: -item[1]):
+        print(f"  {module:<28} {cumulative_us / 1000:>8.1f} ms")
+
+# --- Product Images ---
+# One worker thread serving product images in each IMAGE_SERVING mode, next to the previous
+# plain send_from_directory route. "Python bytes" counts the body bytes that went through
+# the WSGI response iterator in Python; the offload modes leave those to the fronting server.
+
+def bench_images(args):
+    use_scratch_database()
+    image_dir = tempfile.mkdtemp(prefix='metamorphocus-images-')
+    os.environ['ASSET_DIR'] = image_dir
+
+    import database
+    import asset_store
+    import sales
+    from flask import send_from_directory
+
+    database.init_db()
+    rng = random.Random(42)
+    names = [f"bench-{i}.jpg" for i in range(args.images)]
+    for name in names:
+        asset_store.store.put(name, rng.randbytes(args.size_kb * 1024))
+
+    app = sales.create_app()
+    app.add_url_rule('/bench/send_from_directory/<path:filename>', 'bench_send_from_directory',
+                     lambda filename: send_from_directory(image_dir, filename))
+    client = app.test_client()
+    client.get('/api/products')  # One-time startup
+
+    etags = {name: sales.image_validators(asset_store.store.get(name))[0] for name in names}
+    scenarios = [
+        ("send_from_directory (before)", 'python', '/bench/send_from_directory/', False, False),
+        ("python", 'python', '/static/product_images/', False, False),
+        ("x-sendfile", 'x-sendfile', '/static/product_images/', False, False),
+        ("x-accel", 'x-accel', '/static/product_images/', False, False),
+        ("python, 64 KiB range", 'python', '/static/product_images/', True, False),
+        ("any mode, revalidation", 'python', '/static/product_images/', False, True),
+    ]
+    def serve(prefix, ranged, revalidate):
+        """Returns (seconds, bytes) for args.requests requests."""
+        copied = 0
+        started = time.perf_counter()
+        for i in range(args.requests):
+            name = names[i % len(names)]
+            headers = {}
+            if ranged:
+                headers['Range'] = 'bytes=0-65535'
+            if revalidate:
+                headers['If-None-Match'] = f'"{etags[name]}"'
+            copied += len(client.get(prefix + name, headers=headers).get_data())
+        return time.perf_counter() - started, copied
+
+    # Throughput is the best of --repeat rounds, which keeps scheduler noise out of the comparison
+    print(f"{'scenario':<30} {'req/s':>8} {'Python MiB':>11} {'bytes/req':>10}")
+    for label, mode, prefix, ranged, revalidate in scenarios:
+        sales.IMAGE_SERVING = mode
+        rounds = [serve(prefix, ranged, revalidate) for _ in range(args.repeat)]
+        elapsed, copied = min(rounds)
+        print(f"{label:<30} {args.requests / elapsed:>8.0f} {copied / 2**20:>11.1f} {copied // args.requests:>10}")
+
+# --- Sharded Stock ---
+# Shoppers on --threads threads all checking out one unit of the same product through
+# POST /api/orders, first with the product's stock on its inventory row, then split across
+# --shards stock shards. Checks that sold plus remaining stock adds up, i.e. nothing was
+# oversold. SQLite serializes every writer whatever the schema, so the difference shows on
+# a server database: --database-url should point at an empty scratch database (the tables
+# are created if missing, and the benchmark's products and orders are left there).
+
+def bench_shards(args):
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+        if APP_DIR not in sys.path:
+            sys.path.insert(0, APP_DIR)
+    else:
+        use_scratch_database()
+
+    import threading
+    from collections import Counter
+    from sqlalchemy import func
+    import database
+    import stock_shards
+    import sales
+    from database import get_db, Inventory, OrderItem
+
+    database.init_db()
+    app = sales.create_app()
+    app.test_client().get('/api/products')  # One-time startup
+    stock = args.stock if args.stock is not None else args.checkouts * 3 // 4
+    per_thread = args.checkouts // args.threads
+    run = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+
+    def drop(shards):
+        """Returns (seconds, latencies, status counts, units sold, stock left)."""
+        db = get_db()
+        try:
+            product = Inventory(product_name="Hot drop", sku=f"BENCH-{run}-{shards}", category='Bench',
+                                stock_level=stock, min_stock=0, unit_price=20)
+            db.add(product)
+            db.flush()
+            stock_shards.set_shards(db, product, shards)
+            db.commit()
+            product_id = product.id
+        finally:
+            db.close()
+
+        latencies = []
+        statuses = Counter()
+        lock = threading.Lock()
+        ready = threading.Barrier(args.threads + 1)
+        def shopper():
+            client = app.test_client()
+            ready.wait()
+            for _ in range(per_thread):
+                started = time.perf_counter()
+                response = client.post('/api/orders', json={
+                    'customer_name': "Bench Shopper", 'customer_email': 'shopper@example.com',
+                    'items': [{'id': product_id, 'qty': 1}]})
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+                    statuses[response.status_code] += 1
+
+        threads = [threading.Thread(target=shopper) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        ready.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        db = get_db()
+        try:
+            stock_shards.rebalance(db, [product_id])
+            db.commit()
+            left = db.get(Inventory, product_id).stock_level
+            sold = db.query(func.coalesce(func.sum(OrderItem.quantity), 0)).filter(OrderItem.product_id == product_id).scalar()
+        finally:
+            db.close()
+        return elapsed, latencies, statuses, sold, left
+
+    print(f"{database.engine.dialect.name}, {args.threads} threads, {per_thread * args.threads} checkouts for {stock} units")
+    print(f"{'scenario':<16} {'checkouts/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'placed':>7} {'sold out':>9} {'errors':>7} {'left':>6}  check")
+    for label, shards in [("single row", 0), (f"{args.shards} shards", args.shards)]:
+        elapsed, latencies, statuses, sold, left = drop(shards)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        errors = sum(count for status, count in statuses.items() if status not in (200, 400))
+        check = "ok" if sold == statuses[200] and sold + left == stock and left >= 0 else "OVERSOLD"
+        print(f"{label:<16} {len(latencies) / elapsed:>11.0f} {statistics.median(latencies) * 1000:>8.1f} {p95:>8.1f} "
+              f"{statuses[200]:>7} {statuses[400]:>9} {errors:>7} {left:>6}  {check}")
+
+def _timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="metamorphocus performance benchmarks")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    reruns = subcommands.add_parser('reruns', help="Manager page rerun cost per interaction, full page vs fragment")
+    reruns.add_argument('--repeat', type=int, default=5)
+    reruns.add_argument('--products', type=int, default=200)
+    reruns.add_argument('--orders', type=int, default=1000)
+    reruns.set_defaults(func=bench_reruns)
+
+    chart_cache = subcommands.add_parser('charts', help="Chart-heavy page reruns with a cold and a warm figure cache")
+    chart_cache.add_argument('--repeat', type=int, default=5)
+    chart_cache.add_argument('--products', type=int, default=200)
+    chart_cache.add_argument('--orders', type=int, default=1000)
+    chart_cache.set_defaults(func=bench_charts)
+
+    bootstrap = subcommands.add_parser('bootstrap', help="Schema initialization cost per rerun before and after the cached bootstrap")
+    bootstrap.add_argument('--repeat', type=int, default=10)
+    bootstrap.add_argument('--products', type=int, default=200)
+    bootstrap.add_argument('--orders', type=int, default=1000)
+    bootstrap.set_defaults(func=bench_bootstrap)
+
+    pages = subcommands.add_parser('pages', help="Manager cold start and per-page rerun time")
+    pages.add_argument('--repeat', type=int, default=5)
+    pages.add_argument('--products', type=int, default=200)
+    pages.add_argument('--orders', type=int, default=1000)
+    pages.set_defaults(func=bench_pages)
+
+    boot = subcommands.add_parser('boot', help="Storefront worker boot: import time, create_app() and first request")
+    boot.add_argument('--repeat', type=int, default=5)
+    boot.add_argument('--products', type=int, default=200)
+    boot.add_argument('--orders', type=int, default=1000)
+    boot.set_defaults(func=bench_boot)
+
+    images = subcommands.add_parser('images', help="Product image serving throughput and bytes copied in Python, per IMAGE_SERVING mode")
+    images.add_argument('--repeat', type=int, default=3)
+    images.add_argument('--requests', type=int, default=1000)
+    images.add_argument('--images', type=int, default=50)
+    images.add_argument('--size-kb', type=int, default=256)
+    images.set_defaults(func=bench_images)
+
+    shards = subcommands.add_parser('shards', help="Concurrent checkouts of one hot product, single stock row vs stock shards")
+    shards.add_argument('--threads', type=int, default=8)
+    shards.add_argument('--checkouts', type=int, default=800)
+    shards.add_argument('--stock', type=int, default=None, help="Units on sale (default: 3/4 of --checkouts)")
+    shards.add_argument('--shards', type=int, default=8)
+    shards.add_argument('--database-url', default=None, help="A scratch server database to run against instead of SQLite")
+    shards.set_defaults(func=bench_shards)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+from sqlalchemy import Integer, Float, insert, update
+import stock_ledger
+import stock_shards
+
+# --- Bulk Grid Editing ---
+# The Inventory and Materials pages edit records in an st.data_editor grid. Saving diffs the
+# edited DataFrame against the one that was displayed and writes only the cells that changed:
+# inserts and updates as executemany statements and deletes through the ORM (so cascades to
+# BOM, production and labor rows still apply), all in one transaction. Stock edits on
+# products and materials are recorded in the stock ledger as adjustments. Checkout, cancels and
+# production change stock while a grid is open, so an edited stock cell is only written if the
+# stock still has the value the grid showed; otherwise the save fails with StockChanged.
+
+class GridChanges:
+    """Rows to insert, rows to update (the primary key and the changed columns only), ids to
+    delete, and the displayed values of the changed cells ({id: {column: value}})."""
+    def __init__(self, inserts, updates, deletes, loaded):
+        self.inserts = inserts
+        self.updates = updates
+        self.deletes = deletes
+        self.loaded = loaded
+
+    def __bool__(self):
+        return bool(self.inserts or self.updates or self.deletes)
+
+    def summary(self):
+        return f"{len(self.inserts)} new, {len(self.updates)} changed, {len(self.deletes)} deleted"
+
+class StockChanged(RuntimeError):
+    """Raised when edited stock levels changed in the database after the grid was loaded."""
+    def __init__(self, item_ids):
+        super().__init__(f"Stock changed since the grid was loaded (ids {', '.join(map(str, item_ids))})")
+        self.item_ids = item_ids
+
+def _records(df):
+    """Converts a DataFrame to a list of dicts of plain Python values, with None for missing cells."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def diff_frames(original, edited, columns, key='id'):
+    """Compares the displayed and edited grids and returns GridChanges for `columns`.
+
+    Rows are matched on `key`. Rows added in the editor have no key yet and become
+    inserts; rows whose key is no longer present become deletes. Updates carry only the
+    cells that changed.
+    """
+    original = original.set_index(key)
+    is_new = edited[key].isna()
+    existing = edited.loc[~is_new].astype({key: 'int64'}).set_index(key)
+
+    deletes = [int(row_id) for row_id in original.index.difference(existing.index)]
+
+    common = existing.index.intersection(original.index)
+    before = original.loc[common, columns]
+    after = existing.loc[common, columns]
+    cell_changed = ~(before.eq(after) | (before.isna() & after.isna()))
+    rows = cell_changed.any(axis=1)
+    updates = []
+    loaded = {}
+    for new, old, changed in zip(_records(after.loc[rows].reset_index()), _records(before.loc[rows].reset_index()),
+                                 cell_changed.loc[rows].to_dict('records')):
+        changed_columns = [column for column in columns if changed[column]]
+        updates.append({key: new[key], **{column: new[column] for column in changed_columns}})
+        loaded[new[key]] = {column: old[column] for column in changed_columns}
+
+    # Rows the editor added but left completely empty are ignored
+    added = edited.loc[is_new, columns].dropna(how='all')
+
+    return GridChanges(_records(added), updates, deletes, loaded)
+
+def validate(changes, required):
+    """Returns a list of error messages for inserted rows missing a required column, or
+    updated rows where one was cleared."""
+    errors = []
+    for label, rows in (("New row", changes.inserts), ("Row", changes.updates)):
+        for number, row in enumerate(rows, start=1):
+            missing = [column for column in required
+                       if row.get(column) in (None, '') and (rows is changes.inserts or column in row)]
+            if missing:
+                errors.append(f"{label} {number}: missing {', '.join(missing)}")
+    return errors
+
+def _coerce(model, rows):
+    """Casts values to the model's column types (the editor returns floats for integer columns)."""
+    columns = model.__table__.columns
+    for row in rows:
+        for name, value in row.items():
+            if value is None or name not in columns:
+                continue
+            if isinstance(columns[name].type, Integer):
+                row[name] = int(value)
+            elif isinstance(columns[name].type, Float):
+                row[name] = float(value)
+    return rows
+
+def _write_stock(db, model, item_type, stock_column, levels, loaded):
+    """Sets each item's stock ({item_id: level}) if it still has its loaded level, and records
+    the adjustments. Raises StockChanged for the items whose stock moved on. Does not commit."""
+    current_stock = stock_ledger.CURRENT_STOCK[item_type]
+    changed_ids = []
+    for item_id, level in levels.items():
+        was = loaded[item_id]
+        written = db.execute(
+            update(model).where(model.id == item_id, current_stock == was).values({stock_column: level}),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        if not written:
+            changed_ids.append(item_id)
+        elif level is not None:
+            stock_ledger.record(db, item_type, item_id, level - was, level, 'adjustment')
+    if changed_ids:
+        raise StockChanged(changed_ids)
+
+def apply_changes(db, model, changes, key='id'):
+    """Writes the changes in one transaction and commits; rolls back and re-raises on error."""
+    item_type = stock_ledger.LEDGERED_MODELS.get(model)
+    stock_column = stock_ledger.ITEMS[item_type][1] if item_type else None
+    try:
+        if changes.updates:
+            updates = _coerce(model, [dict(row) for row in changes.updates])
+            if stock_column is not None:
+                new_levels = {row[key]: row.pop(stock_column.key) for row in updates if stock_column.key in row}
+                if new_levels:
+                    loaded = {item_id: changes.loaded[item_id][stock_column.key] for item_id in new_levels}
+                    if item_type == stock_ledger.PRODUCT:
+                        # Sharded products: take shard sales off first, so the new levels replace the real stock
+                        stock_shards.rebalance(db, new_levels)
+                    _write_stock(db, model, item_type, stock_column, new_levels, loaded)
+                    if item_type == stock_ledger.PRODUCT:
+                        stock_shards.rebalance(db, new_levels)
+                updates = [row for row in updates if len(row) > 1]
+            if updates:
+                db.execute(update(model), updates)
+        if changes.inserts:
+            # Leave blank cells out so column defaults apply
+            inserts = _coerce(model, [{name: value for name, value in row.items() if value is not None} for row in changes.inserts])
+            if stock_column is not None:
+                # Opening stock of the new rows goes into the ledger too
+                for item_id, level in db.execute(insert(model).returning(model.id, stock_column), inserts):
+                    stock_ledger.record(db, item_type, item_id, level, level, 'adjustment')
+            else:
+                db.execute(insert(model), inserts)
+        if changes.deletes:
+            for row in db.query(model).filter(getattr(model, key).in_(changes.deletes)):
+                db.delete(row)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,106 @@
+"""Storefront CSS/JS bundle.
+
+Usage:
+    python bundle.py
+
+Compiles the Tailwind classes used by the storefront into one minified stylesheet, minifies
+the storefront script, and writes both to static/dist/ under content-hashed names, with a
+manifest mapping each source name to its current file. Run it as part of a deployment; until
+a bundle exists, the storefront falls back to compiling Tailwind in the browser.
+"""
+import os
+import re
+import json
+import shlex
+import shutil
+import hashlib
+import subprocess
+
+# --- Bundle Layout ---
+# assets/                 sources: storefront.css (Tailwind directives + custom CSS),
+#                         storefront.js and tailwind.config.js
+# static/dist/            storefront.<hash>.css, storefront.<hash>.js and manifest.json
+# Hashed files never change, so they are served with a year-long immutable Cache-Control.
+# The previous build's files are kept, so pages rendered just before a deploy still load.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(APP_DIR, 'assets')
+DIST_DIR = os.getenv('ASSET_DIST_DIR', os.path.join(APP_DIR, 'static', 'dist'))
+MANIFEST_FILE = 'manifest.json'
+HASHED_FILE = re.compile(r'storefront\.[0-9a-f]{12}\.(css|js)')
+# Tailwind standalone CLI; falls back to `npx tailwindcss@3` if it isn't on PATH
+TAILWIND_CLI = os.getenv('TAILWIND_CLI', 'tailwindcss')
+
+def tailwind_command():
+    command = shlex.split(TAILWIND_CLI)
+    if shutil.which(command[0]):
+        return command
+    if shutil.which('npx'):
+        return ['npx', '--yes', 'tailwindcss@3']
+    raise RuntimeError("The Tailwind CLI is needed to build the stylesheet: install the standalone "
+                       "tailwindcss binary (or Node.js for npx) or set TAILWIND_CLI")
+
+def build_css(dist_dir):
+    output = os.path.join(dist_dir, 'storefront.css.tmp')
+    subprocess.run(tailwind_command() + ['--config', os.path.join(SOURCE_DIR, 'tailwind.config.js'),
+                                         '--input', os.path.join(SOURCE_DIR, 'storefront.css'), '--output', output, '--minify'],
+                   cwd=APP_DIR, check=True)
+    with open(output) as f:
+        css = f.read()
+    os.remove(output)
+    return css
+
+def minify_js(source):
+    """Drops indentation, blank lines and whole-line comments. Deliberately conservative: code
+    inside a line (strings, URLs, template literals) is never touched."""
+    lines = []
+    for line in source.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+def hashed_name(name, content):
+    digest = hashlib.sha256(content.encode()).hexdigest()[:12]
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest}{ext}"
+
+def load_manifest(dist_dir=None):
+    """{source name: hashed file name} for the current bundle, or {} if none has been built."""
+    path = os.path.join(dist_dir or DIST_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def build(dist_dir=None):
+    """Builds the bundle and returns the new manifest."""
+    dist_dir = dist_dir or DIST_DIR
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(SOURCE_DIR, 'storefront.js')) as f:
+        outputs = {'storefront.css': build_css(dist_dir), 'storefront.js': minify_js(f.read())}
+
+    previous = load_manifest(dist_dir)
+    manifest = {}
+    for name, content in outputs.items():
+        manifest[name] = hashed_name(name, content)
+        with open(os.path.join(dist_dir, manifest[name]), 'w') as f:
+            f.write(content)
+    path = os.path.join(dist_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+    keep = set(manifest.values()) | set(previous.values()) | {MANIFEST_FILE}
+    for entry in os.listdir(dist_dir):
+        if entry not in keep and HASHED_FILE.fullmatch(entry):
+            os.remove(os.path.join(dist_dir, entry))
+    return manifest
+
+def main():
+    for name, file_name in build().items():
+        size = os.path.getsize(os.path.join(DIST_DIR, file_name))
+        print(f"{name:<16} -> {file_name} ({size / 1024:.1f} KiB)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import time
+import threading
+from collections import OrderedDict
+
+# --- In-Process Caches ---
+# Small, thread-safe caches for data that is read on every request but changes rarely,
+# such as the storefront catalog. Hits and misses are counted so /metrics can report
+# the hit ratio.
+
+class CachedValue:
+    """Caches the result of a loader function for `ttl` seconds.
+
+    Only one thread reloads an expired value; concurrent callers wait for it instead of
+    all querying the database at once. Call invalidate() after a write that changes the data.
+    """
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._value = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if time.monotonic() < self._expires_at:
+            self.hits += 1
+            return self._value
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            if time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            generation = self._generation
+            value = self.loader()
+            self._value = value
+            # Don't keep a value that was loaded while a write invalidated the cache
+            if generation == self._generation:
+                self._expires_at = time.monotonic() + self.ttl
+            return value
+
+    def invalidate(self):
+        self._generation += 1
+        self._expires_at = 0.0
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with a fixed capacity."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else None
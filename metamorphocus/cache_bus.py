@@ -0,0 +1,169 @@
+import os
+import select
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import event, inspect, text, update
+from sqlalchemy import select as sql_select
+
+# --- Cache Invalidation Bus ---
+# The storefront, its workers and the Streamlit manager are separate processes, each with
+# its own in-memory caches, and any of them can write. So writes bump a per-table counter in
+# the cache_versions table, and every process watches the counters:
+#   - each session notes the tables it writes (ORM flushes and bulk insert/update/delete
+#     statements) and, just before committing, bumps the ones in VERSIONED_TABLES in the same
+#     transaction, so a bump is committed or rolled back together with the data;
+#   - a watcher thread reads the whole (tiny) table every CACHE_POLL_INTERVAL seconds and calls
+#     the callbacks subscribed to the tables whose counters moved;
+#   - on PostgreSQL the bump also sends NOTIFY cache_versions, delivered at commit, and the
+#     watcher LISTENs for it, so other processes usually hear about a write at once; polling
+#     remains as the fallback.
+# Bumping takes a row lock on the table's counter until commit, which serializes writers to a
+# versioned table, and makes every process drop its cache of it; only list tables here that
+# something actually caches. Frequent writes that caches can do without run their statements
+# with execution option cache_bus=False and call note_written only when the change matters:
+# checkouts, cart holds and shard rebalancing move stock that way and bump 'inventory' only
+# when a product goes on or off sale (see stock_shards.py). Writes made outside a session
+# (raw connections, other tools) aren't seen, so caches keep a TTL as a safety net.
+
+VERSIONED_TABLES = ('inventory',)
+POLL_INTERVAL = float(os.getenv('CACHE_POLL_INTERVAL', '1'))
+CHANNEL = 'cache_versions'
+WRITTEN_KEY = 'cache_bus_written'
+
+logger = logging.getLogger(__name__)
+
+_versions_table = None
+
+# --- Session Hooks ---
+
+def install(session_factory, versions_table):
+    """Bumps `versions_table` for writes made through sessions from `session_factory`."""
+    global _versions_table
+    _versions_table = versions_table
+    event.listen(session_factory, 'after_flush', _note_flush)
+    event.listen(session_factory, 'do_orm_execute', _note_statement)
+    event.listen(session_factory, 'before_commit', _bump_written)
+    event.listen(session_factory, 'after_transaction_end', _forget_written)
+
+def note_written(session, table_name):
+    """Makes the session's transaction bump `table_name`'s counter when it commits."""
+    if table_name in VERSIONED_TABLES:
+        session.info.setdefault(WRITTEN_KEY, set()).add(table_name)
+
+def _note_flush(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    for obj in session.new | session.dirty | session.deleted:
+        note_written(session, inspect(obj).mapper.local_table.name)
+
+def _note_statement(orm_execute_state):
+    if not orm_execute_state.execution_options.get('cache_bus', True):
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            note_written(orm_execute_state.session, table.name)
+
+def _bump_written(session):
+    # Commit flushes after this hook; flush now so those writes are noted too
+    session.flush()
+    written = session.info.pop(WRITTEN_KEY, None)
+    if not written:
+        return
+    names = sorted(written)
+    conn = session.connection()
+    conn.execute(update(_versions_table).where(_versions_table.c.name.in_(names))
+                 .values(version=_versions_table.c.version + 1, updated_at=datetime.utcnow()))
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text("SELECT pg_notify(:channel, :payload)"), {'channel': CHANNEL, 'payload': ','.join(names)})
+
+def _forget_written(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(WRITTEN_KEY, None)
+
+def seed(conn):
+    """Adds a counter row for each versioned table that doesn't have one yet."""
+    existing = set(conn.execute(sql_select(_versions_table.c.name)).scalars())
+    for name in VERSIONED_TABLES:
+        if name not in existing:
+            conn.execute(_versions_table.insert().values(name=name, version=0, updated_at=datetime.utcnow()))
+
+# --- Version Watcher ---
+
+class VersionWatcher:
+    """Calls subscribers when another transaction (in any process) commits a write to their table."""
+    def __init__(self, interval=POLL_INTERVAL):
+        self.interval = interval
+        self.versions = None
+        self._callbacks = {}
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._engine = None
+
+    def subscribe(self, table_name, callback):
+        if table_name not in VERSIONED_TABLES:
+            raise ValueError(f"{table_name} is not in cache_bus.VERSIONED_TABLES")
+        self._callbacks.setdefault(table_name, []).append(callback)
+
+    def poll(self):
+        """Reads the counters and runs the callbacks of tables that changed; returns their names."""
+        with self._engine.connect() as conn:
+            current = dict(conn.execute(sql_select(_versions_table.c.name, _versions_table.c.version)).all())
+        with self._lock:
+            previous, self.versions = self.versions, current
+        if previous is None:
+            # First read only sets the baseline
+            return []
+        changed = [name for name, version in current.items() if previous.get(name) != version]
+        for name in changed:
+            for callback in self._callbacks.get(name, []):
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Cache invalidation callback for %s failed", name)
+        return changed
+
+    def start(self, engine):
+        """Starts polling (and, on PostgreSQL, listening) in background threads; safe to call twice."""
+        with self._lock:
+            if self._engine is not None:
+                return
+            self._engine = engine
+        self.poll()
+        threading.Thread(target=self._poll_loop, name='cache-bus-poll', daemon=True).start()
+        if engine.dialect.name == 'postgresql':
+            threading.Thread(target=self._listen_loop, name='cache-bus-listen', daemon=True).start()
+
+    def _poll_loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling cache versions failed")
+
+    def _listen_loop(self):
+        # A dedicated autocommit connection, detached from the pool since it stays LISTENing
+        while True:
+            raw = None
+            try:
+                raw = self._engine.raw_connection()
+                raw.detach()
+                conn = raw.dbapi_connection
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self._wake.set()
+            except Exception:
+                logger.exception("Listening for cache version notifications failed; polling only until it reconnects")
+                if raw is not None:
+                    raw.close()
+                threading.Event().wait(self.interval * 10)
+
+watcher = VersionWatcher()
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from database import Finance
+import money
+
+# --- Cash Flow Series ---
+# Builds the running cash balance used by the "Cumulative Cash Flow" chart. Signed amounts and
+# the running total are computed with vectorized numpy/pandas operations, and the result is
+# resampled to a resolution that fits the visible date range so Plotly never receives more
+# than `max_points` points, however many transactions there are.
+
+MAX_POINTS = 2000
+
+# Candidate resolutions from finest to coarsest; the first one that fits is used
+RESOLUTIONS = [('D', 'Daily'), ('W', 'Weekly'), ('MS', 'Monthly'), ('QS', 'Quarterly'), ('YS', 'Yearly')]
+
+def finance_frame(db):
+    """Loads all transactions as a DataFrame of Date (datetime64), Type, Category, Description
+    and Amount in integer cents (int64), without building a Finance object per row."""
+    rows = db.query(
+        Finance.date.label('Date'),
+        Finance.type.label('Type'),
+        Finance.category.label('Category'),
+        Finance.description.label('Description'),
+        money.cents(Finance.amount, 'Amount'),
+    ).all()
+    df = pd.DataFrame(rows, columns=['Date', 'Type', 'Category', 'Description', 'Amount'])
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['Amount'] = df['Amount'].astype('int64')
+    return df
+
+def signed_amounts(df, type_col='Type', amount_col='Amount'):
+    """Returns income as positive and expenses as negative amounts, in the column's own dtype."""
+    amounts = df[amount_col].to_numpy()
+    return np.where(df[type_col].to_numpy() == 'Income', amounts, -amounts)
+
+def choose_resolution(start, end, max_points=MAX_POINTS):
+    """Picks the finest resampling frequency that keeps the range within max_points buckets."""
+    for freq, label in RESOLUTIONS:
+        buckets = len(pd.date_range(start, end, freq=freq))
+        if buckets <= max_points:
+            return freq, label
+    return RESOLUTIONS[-1]
+
+def cash_flow_series(df, start=None, end=None, max_points=MAX_POINTS, date_col='Date', type_col='Type', amount_col='Amount'):
+    """Returns (DataFrame[Date, Cumulative], resolution label) for the visible range.
+
+    The running balance includes every transaction before `start`, so zooming in doesn't reset
+    the balance to zero. Each bucket holds the balance at the end of that period.
+    """
+    if df.empty:
+        return pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]'), 'Cumulative': pd.Series(dtype='float64')}), None
+
+    dates = pd.to_datetime(df[date_col])
+    balance = pd.Series(signed_amounts(df, type_col, amount_col), index=dates).sort_index(kind='stable').cumsum()
+    # Several transactions can share a date; keep the balance after the last one
+    balance = balance[~balance.index.duplicated(keep='last')]
+
+    start = pd.Timestamp(start) if start is not None else balance.index[0]
+    end = pd.Timestamp(end) if end is not None else balance.index[-1]
+    if start > end:
+        start, end = end, start
+
+    # Balance carried into the range from earlier transactions
+    opening = balance[balance.index < start]
+    visible = balance[(balance.index >= start) & (balance.index <= end)]
+    if not opening.empty:
+        visible = pd.concat([pd.Series([opening.iloc[-1]], index=[start]), visible])
+        visible = visible[~visible.index.duplicated(keep='last')]
+
+    if len(visible) <= max_points:
+        resolution = 'Per transaction day'
+        series = visible
+    else:
+        freq, resolution = choose_resolution(start, end, max_points)
+        series = visible.resample(freq).last().ffill()
+
+    return pd.DataFrame({'Date': series.index, 'Cumulative': series.to_numpy()}), resolution
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from sqlalchemy import func
+from database import get_db, Inventory
+
+# --- Stock Change Feed ---
+# An in-process broadcast of stock-level changes, used by the storefront's server-sent-events
+# endpoint so shoppers' carts stay valid without re-fetching the catalog.
+#
+# Every change gets a sequence number and is kept in a bounded history. Listeners don't get
+# their own queue or thread: they remember the last sequence number they sent and wait on one
+# shared condition, so an idle connection costs only its (green)thread and a few bytes.
+# Run the storefront under a cooperative server (e.g. `gunicorn -k gevent 'sales:create_app()'`,
+# from the `gevent` extra) to hold thousands of idle streams in one process.
+
+HISTORY_SIZE = 4096
+STOCK_POLL_INTERVAL = float(os.getenv('STOCK_POLL_INTERVAL', '2'))
+
+logger = logging.getLogger('metamorphocus.changefeed')
+
+class ChangeFeed:
+    """Broadcasts {product_id: stock_level} changes to any number of waiting listeners."""
+    def __init__(self, history_size=HISTORY_SIZE):
+        self._history = deque(maxlen=history_size)  # (seq, product_id, stock_level)
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, changes):
+        """Records new stock levels and wakes every listener."""
+        if not changes:
+            return
+        with self._condition:
+            for product_id, stock_level in changes.items():
+                self._seq += 1
+                self._history.append((self._seq, product_id, stock_level))
+            self._condition.notify_all()
+
+    def wait(self, seq, timeout):
+        """Blocks until there are changes after `seq` or the timeout passes.
+
+        Returns (latest stock per product after `seq`, new seq); ({}, seq) on timeout; or
+        (None, new seq) if `seq` has fallen out of the history and the listener must resync
+        from the full catalog.
+        """
+        with self._condition:
+            if self._seq == seq:
+                self._condition.wait(timeout)
+            return self._collect(seq)
+
+    def _collect(self, seq):
+        if seq > self._seq:
+            # Sequence numbers are per process; an id from another worker or before a restart
+            return None, self._seq
+        if self._seq == seq:
+            return {}, seq
+        if not self._history or self._history[0][0] > seq + 1:
+            return None, self._seq
+        changes = {}
+        # Walk backwards from the newest entry; history is ordered by sequence number
+        for entry_seq, product_id, stock_level in reversed(self._history):
+            if entry_seq <= seq:
+                break
+            changes.setdefault(product_id, stock_level)
+        return changes, self._seq
+
+stock_feed = ChangeFeed()
+
+class StockWatcher:
+    """Publishes stock changes made by other processes (e.g. the Streamlit manager).
+
+    Polls the inventory table for rows whose last_updated moved past a watermark and
+    publishes only those whose available stock (stock less cart holds) actually changed.
+    One query per interval serves every connected listener. Started lazily by the first listener.
+    """
+    def __init__(self, feed, interval=STOCK_POLL_INTERVAL, on_change=None):
+        self.feed = feed
+        self.interval = interval
+        self.on_change = on_change
+        self._known = {}
+        self._watermark = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._load_initial()
+            self._thread = threading.Thread(target=self._run, name='stock-watcher', daemon=True)
+            self._thread.start()
+
+    def note(self, changes):
+        """Records stock levels this process published itself so the poll doesn't repeat them."""
+        self._known.update(changes)
+
+    def _load_initial(self):
+        db = get_db()
+        try:
+            self._known = dict(db.query(Inventory.id, Inventory.available_stock).all())
+            self._watermark = db.query(func.max(Inventory.last_updated)).scalar() or datetime.min
+        finally:
+            db.close()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Stock watcher failed to poll inventory")
+
+    def poll(self):
+        db = get_db()
+        try:
+            rows = db.query(Inventory.id, Inventory.available_stock, Inventory.last_updated).filter(
+                Inventory.last_updated > self._watermark
+            ).all()
+        finally:
+            db.close()
+        changes = {}
+        for product_id, stock_level, last_updated in rows:
+            if self._known.get(product_id) != stock_level:
+                changes[product_id] = stock_level
+                self._known[product_id] = stock_level
+            if last_updated > self._watermark:
+                self._watermark = last_updated
+        if changes:
+            self.feed.publish(changes)
+            if self.on_change:
+                self.on_change(changes)
+        return changes
+
+def format_event(event, data, event_id=None):
+    """Formats one server-sent event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+def stream_stock_events(feed, last_seq, keepalive=15.0):
+    """Yields server-sent events with stock deltas after `last_seq`, forever.
+
+    Sends a `resync` event when the client is too far behind to catch up from the history,
+    and a comment line every `keepalive` seconds so proxies don't close idle connections.
+    """
+    # Tell the client how long to wait before reconnecting after a dropped connection
+    yield "retry: 3000\n\n"
+    while True:
+        changes, seq = feed.wait(last_seq, keepalive)
+        if changes is None:
+            yield format_event('resync', {}, seq)
+        elif changes:
+            yield format_event('stock', {str(product_id): stock for product_id, stock in changes.items()}, seq)
+        else:
+            yield ": keep-alive\n\n"
+        last_seq = seq
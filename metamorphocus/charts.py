@@ -0,0 +1,97 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from cache import LRUCache
+
+# --- Charts ---
+# Shared theme and memoized figure builders for the manager's Plotly charts. A figure is
+# built once per (chart id, data version, parameters) and kept together with its dict, so a
+# rerun with unchanged data skips figure construction, Plotly's figure-to-dict conversion
+# and validation; st.plotly_chart is left with only the JSON encoding. (Handing it the bare
+# dict would not do: it rebuilds and validates a Figure from every dict it is given.) The
+# cache lives in the process, so every session shares it.
+
+CHART_CACHE_SIZE = int(os.getenv('CHART_CACHE_SIZE', '256'))
+
+THEME = dict(plot_bgcolor='#0F172A', paper_bgcolor='#0F172A', font=dict(color='#CBD5E1'), title_font=dict(color='#E0E7FF'))
+# Percentages and labels drawn inside the slices
+PIE_TRACES = dict(textposition='inside', textinfo='percent+label')
+
+figure_cache = LRUCache(CHART_CACHE_SIZE)
+
+class CachedFigure(go.Figure):
+    """A finished, read-only figure that converts itself to a dict only once."""
+    def __init__(self, built):
+        super().__init__(built)
+        self._spec = super().to_dict()
+
+    def to_dict(self):
+        return self._spec
+
+def _update_digest(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        digest.update(repr(value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(pd.util.hash_array(value.ravel()).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b']')
+    elif isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _update_digest(digest, value[key])
+        digest.update(b'}')
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b'|')
+
+def data_version(*values):
+    """Returns a content hash of DataFrames, Series, arrays and plain values."""
+    digest = hashlib.sha1()
+    for value in values:
+        _update_digest(digest, value)
+    return digest.hexdigest()
+
+def figure(chart_id, build, data=None, version=None, traces=None, layout=None, **kwargs):
+    """Returns the themed figure for `build(data, **kwargs)`, built at most once per version.
+
+    `version` identifies the data behind the chart; by default it is a content hash of
+    `data` and any array arguments. `traces` and `layout` are applied with update_traces and
+    update_layout on top of the shared theme. The figure is shared, so callers must not
+    change it.
+    """
+    params = data_version(kwargs, traces, layout)
+    key = (chart_id, version if version is not None else data_version(data), params)
+    fig = figure_cache.get(key)
+    if fig is None:
+        built = build(data, **kwargs)
+        if traces:
+            built.update_traces(**traces)
+        built.update_layout(**{**THEME, **(layout or {})})
+        fig = CachedFigure(built)
+        figure_cache.put(key, fig)
+    return fig
+
+# --- Figure Builders ---
+
+def bar(chart_id, data=None, **kwargs):
+    return figure(chart_id, px.bar, data, **kwargs)
+
+def line(chart_id, data=None, **kwargs):
+    return figure(chart_id, px.line, data, **kwargs)
+
+def area(chart_id, data=None, **kwargs):
+    return figure(chart_id, px.area, data, **kwargs)
+
+def pie(chart_id, data=None, **kwargs):
+    return figure(chart_id, px.pie, data, **kwargs)
@@ -1,7 +1,11 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Date, Text, LargeBinary, ForeignKey
-from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from sqlalchemy import create_engine, case, func, insert, inspect, select, text, Column, Integer, String, Float, DateTime, Date, Text, Boolean, LargeBinary, ForeignKey, Index
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.orm import sessionmaker, declarative_base, relationship, column_property
 from datetime import datetime, date
+import instrumentation
+import cache_bus
+from money import Money
 
 # Base model for SQLAlchemy - MUST BE DEFINED BEFORE MODELS
 Base = declarative_base()
@@ -20,6 +24,11 @@ engine = create_engine(
     pool_recycle=3600    # Recycle connections after 1 hour
 )
 
+# Per-page/per-route query counts, DB time and slow-query logging (see instrumentation.py).
+# Set SQL_INSTRUMENTATION=0 to disable the hooks entirely.
+if os.getenv('SQL_INSTRUMENTATION', '1') != '0':
+    instrumentation.install(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
@@ -27,9 +36,40 @@ def get_db():
     return SessionLocal()
 
 def init_db():
-    """Creates all database tables if they don't already exist.
-    This should be called once at application startup."""
+    """Creates all database tables if they don't already exist, applies pending migrations
+    and records the schema version."""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    link_order_finance_entries()
+    # create_all only adds indexes along with new tables; add ones introduced later to existing tables
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    migrate_money_to_cents()
+    try:
+        with engine.begin() as conn:
+            cache_bus.seed(conn)
+    except IntegrityError:
+        # Another process seeded them first
+        pass
+    record_schema_version()
+
+def bootstrap(migrate=True):
+    """Makes sure the database schema is current, once per process, and returns the session factory.
+
+    A database already at SCHEMA_VERSION costs one query; anything older (or new) goes
+    through init_db, or raises SchemaVersionError with `migrate=False` (when migrations are
+    run as a deployment step instead). Also raises if the database was migrated by newer code.
+    """
+    version = schema_version()
+    if version != SCHEMA_VERSION:
+        if version is not None and version > SCHEMA_VERSION:
+            raise SchemaVersionError(f"Database schema is version {version}, but this code only knows up to {SCHEMA_VERSION}")
+        if not migrate:
+            raise SchemaVersionError(f"Database schema is not at version {SCHEMA_VERSION} (found {version}); "
+                                     "run `flask --app sales init-db` to migrate it")
+        init_db()
+    return SessionLocal
 
 # --- Model Definitions ---
 
@@ -42,13 +82,17 @@ class Inventory(Base):
     category = Column(String, nullable=False)
     stock_level = Column(Integer, nullable=False, default=0)
     min_stock = Column(Integer, nullable=False, default=10)
-    unit_price = Column(Float, nullable=False)
+    unit_price = Column(Money, nullable=False)
     image_url = Column(String, nullable=True)
     description = Column(Text, nullable=True)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    stock_shards = Column(Integer, nullable=False, default=0, server_default='0') # Checkout shards for hot products, 0 = off (see stock_shards.py)
+    held = Column(Integer, nullable=False, default=0, server_default='0') # Units set aside for carts, not counting holds on shards (see stock_holds.py)
 
     # Relationships
     boms = relationship("BillOfMaterials", back_populates="product", cascade="all, delete-orphan")
+    shards = relationship("StockShard", cascade="all, delete-orphan")
+    holds = relationship("StockHold", cascade="all, delete-orphan")
     production_orders = relationship("ProductionOrder", back_populates="product", cascade="all, delete-orphan")
     labor_entries = relationship("Labor", back_populates="product", cascade="all, delete-orphan")
 
@@ -62,7 +106,7 @@ class Material(Base):
     unit = Column(String, nullable=False) # e.g., kg, lbs, pcs, meters
     supplier = Column(String, nullable=False)
     reorder_point = Column(Float, nullable=False, default=10.0)
-    cost_per_unit = Column(Float, nullable=False)
+    cost_per_unit = Column(Money, nullable=False)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -71,13 +115,16 @@ class Material(Base):
 # Finance model
 class Finance(Base):
     __tablename__ = 'finance'
+    # One income entry per storefront order, however often its job runs
+    __table_args__ = (Index('ux_finance_order_id', 'order_id', unique=True),)
     id = Column(Integer, primary_key=True, index=True)
     date = Column(Date, nullable=False, default=date.today)
     type = Column(String, nullable=False) # Income or Expense
     category = Column(String, nullable=False)
     description = Column(String, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     payment_method = Column(String, nullable=True)
+    order_id = Column(Integer, nullable=True) # Storefront order this entry records (no foreign key: entries outlive deleted orders)
 
 # Idea Board model
 class Idea(Base):
@@ -112,9 +159,12 @@ class ProductionOrder(Base):
     quantity_produced = Column(Integer, nullable=False)
     produced_by = Column(String, nullable=False) # Emily, Sage, Both
     production_date = Column(Date, nullable=False, default=date.today)
-    material_cost = Column(Float, nullable=False)
+    material_cost = Column(Money, nullable=False)
     notes = Column(Text, nullable=True)
 
+    # Matches the Production History ordering, so each page is an index range scan
+    __table_args__ = (Index('ix_production_orders_date_id', 'production_date', 'id'),)
+
     # Relationship
     product = relationship("Inventory", back_populates="production_orders")
 
@@ -147,7 +197,7 @@ class Order(Base):
     customer_name = Column(String, nullable=False)
     customer_email = Column(String, nullable=False)
     customer_phone = Column(String, nullable=True)
-    total_amount = Column(Float, nullable=False)
+    total_amount = Column(Money, nullable=False)
     status = Column(String, default='pending') # pending, processing, completed, cancelled
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -162,6 +212,270 @@ class OrderItem(Base):
     product_id = Column(Integer, nullable=False)
     product_name = Column(String, nullable=False)
     quantity = Column(Integer, nullable=False)
-    price = Column(Float, nullable=False)
+    price = Column(Money, nullable=False)
 
     order = relationship("Order", back_populates="items")
+
+# Idempotency Keys model - stored checkout responses for retried requests
+class IdempotencyKey(Base):
+    __tablename__ = 'idempotency_keys'
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, nullable=False, index=True)
+    request_hash = Column(String, nullable=False) # SHA-256 of the request body
+    response_status = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False) # JSON
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Background Job model - durable queue for work done after a request commits
+class Job(Base):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+        # At most one pending run of each recurring job, however many processes schedule it
+        Index('ux_jobs_pending_recurring', 'kind', unique=True,
+              sqlite_where=text("status = 'pending' AND recurring"), postgresql_where=text("status = 'pending' AND recurring")),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False) # e.g., order_finance_entry, low_stock_check
+    payload = Column(Text, nullable=False, default='{}') # JSON
+    status = Column(String, nullable=False, default='pending') # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    recurring = Column(Boolean, nullable=True) # Scheduled by jobs.schedule(), which keeps one pending run per kind
+
+# Daily Sales rollup - one row per day, refreshed by the order post-processing jobs
+class DailySales(Base):
+    __tablename__ = 'daily_sales'
+    id = Column(Integer, primary_key=True, index=True)
+    sales_date = Column(Date, unique=True, nullable=False, index=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Money, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Valuation Snapshot model - one compact row per day of inventory and materials value
+class ValuationSnapshot(Base):
+    __tablename__ = 'valuation_snapshots'
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_date = Column(Date, unique=True, nullable=False, index=True)
+    inventory_value = Column(Money, nullable=False, default=0)
+    inventory_units = Column(Integer, nullable=False, default=0)
+    low_stock_count = Column(Integer, nullable=False, default=0)
+    materials_value = Column(Money, nullable=False, default=0)
+    reorder_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Stock Movement model - append-only ledger of every change to a product's or material's stock
+class StockMovement(Base):
+    __tablename__ = 'stock_movements'
+    # Point-in-time lookups per item, and consumption over a time range per item type
+    __table_args__ = (Index('ix_stock_movements_item_time', 'item_type', 'item_id', 'created_at', 'id'),
+                      Index('ix_stock_movements_type_time', 'item_type', 'created_at'))
+    id = Column(Integer, primary_key=True)
+    item_type = Column(String, nullable=False) # product or material
+    item_id = Column(Integer, nullable=False) # No foreign key: the history outlives deleted items
+    delta = Column(Float, nullable=False)
+    balance = Column(Float, nullable=False) # Stock right after this movement
+    source = Column(String, nullable=False) # order, cancellation, production, adjustment, reconciliation
+    reference_id = Column(Integer, nullable=True) # Order or production order id
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+# Stock Checkpoint model - each item's balance as verified against the ledger at a point in time
+class StockCheckpoint(Base):
+    __tablename__ = 'stock_checkpoints'
+    __table_args__ = (Index('ix_stock_checkpoints_item_time', 'item_type', 'item_id', 'taken_at'),)
+    id = Column(Integer, primary_key=True)
+    item_type = Column(String, nullable=False)
+    item_id = Column(Integer, nullable=False)
+    balance = Column(Float, nullable=False)
+    movement_id = Column(Integer, nullable=True) # Last movement included in the balance
+    taken_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+# Stock Shard model - one checkout counter of a hot product's stock
+class StockShard(Base):
+    __tablename__ = 'stock_shards'
+    product_id = Column(Integer, ForeignKey('inventory.id'), primary_key=True)
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    available = Column(Integer, nullable=False, default=0) # Units this shard may still sell
+    sold = Column(Integer, nullable=False, default=0) # Units sold here, not yet taken off inventory.stock_level
+    held = Column(Integer, nullable=False, default=0, server_default='0') # Units set aside here for carts
+
+def _shard_total(column):
+    return select(func.coalesce(func.sum(column), 0)).where(StockShard.product_id == Inventory.id).scalar_subquery()
+
+# A product's stock including units sold through its shards since the last rebalance; only loaded when asked for
+Inventory.current_stock = column_property(
+    case((Inventory.stock_shards > 0, Inventory.stock_level - _shard_total(StockShard.sold)), else_=Inventory.stock_level),
+    deferred=True
+)
+# What shoppers can still buy: current stock less the units held for carts; only loaded when asked for
+Inventory.available_stock = column_property(
+    case((Inventory.stock_shards > 0,
+          Inventory.stock_level - Inventory.held - _shard_total(StockShard.sold) - _shard_total(StockShard.held)),
+         else_=Inventory.stock_level - Inventory.held),
+    deferred=True
+)
+
+# Stock Hold model - units set aside for a shopper's cart until checkout or expiry
+class StockHold(Base):
+    __tablename__ = 'stock_holds'
+    # The sweeper reads expired holds oldest first; checkout reads one cart's holds
+    __table_args__ = (Index('ix_stock_holds_expires_at', 'expires_at'),
+                      Index('ix_stock_holds_cart', 'cart_id', 'product_id'))
+    id = Column(Integer, primary_key=True)
+    cart_id = Column(String, nullable=False) # Random id generated by the shopper's browser
+    product_id = Column(Integer, ForeignKey('inventory.id'), nullable=False)
+    shard = Column(Integer, nullable=True) # Stock shard the units are held on, None for inventory.held
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+# Cache Version model - one counter per cached table, bumped by every transaction writing to it
+class CacheVersion(Base):
+    __tablename__ = 'cache_versions'
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+# Writes through sessions bump cache_versions so other processes can drop stale caches (see cache_bus.py)
+cache_bus.install(SessionLocal, CacheVersion.__table__)
+
+# --- Added Columns ---
+# create_all only creates missing tables. Columns added to an existing model later are added
+# here, so they must be nullable or have a server_default.
+
+def add_missing_columns():
+    quote = engine.dialect.identifier_preparer.quote
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(engine.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(ddl))
+            except (OperationalError, ProgrammingError):
+                # Another process added it first
+                pass
+
+def link_order_finance_entries():
+    """Sets finance.order_id on order entries recorded before the column existed (found by
+    their "Online order #<id>" description), so a retried job doesn't add a second one. Runs
+    before the unique index is created, so only the oldest entry per order is linked."""
+    with engine.begin() as conn:
+        finance = Finance.__table__
+        if conn.execute(select(finance.c.id).where(finance.c.order_id.isnot(None)).limit(1)).first():
+            return
+        linked = {}
+        for entry_id, description in conn.execute(
+                select(finance.c.id, finance.c.description)
+                .where(finance.c.type == 'Income', finance.c.payment_method == 'Online', finance.c.description.like('Online order #%'))
+                .order_by(finance.c.id)):
+            order_id = description[len('Online order #'):]
+            if order_id.isdigit():
+                linked.setdefault(int(order_id), entry_id)
+        existing = {order_id for (order_id,) in conn.execute(select(Order.__table__.c.id))}
+        for order_id, entry_id in linked.items():
+            if order_id in existing:
+                conn.execute(finance.update().where(finance.c.id == entry_id).values(order_id=order_id))
+
+# --- Money Migration ---
+# Money columns used to be FLOAT dollars. The first init_db after upgrading multiplies every
+# stored amount by 100 (and on PostgreSQL changes the column to BIGINT). SQLite can't change a
+# column's type in place, so upgraded SQLite tables keep REAL storage holding whole cents,
+# which sum exactly well past any realistic total.
+# It must never run twice, so it is recorded in schema_migrations, which nothing but init_db
+# writes. Databases converted before that table existed are recognised by their schema
+# version (2 and up store cents), the old `money_storage` row in settings, or, column by
+# column, an integer column type.
+
+MONEY_MIGRATION = 'money_cents'
+LEGACY_MONEY_STORAGE_KEY = 'money_storage'
+
+class SchemaMigration(Base):
+    __tablename__ = 'schema_migrations'
+    name = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+def migrate_money_to_cents():
+    """Converts dollar amounts in every Money column to cents, once per database."""
+    migrations = SchemaMigration.__table__
+    settings = Settings.__table__
+    quote = engine.dialect.identifier_preparer.quote
+    try:
+        with engine.begin() as conn:
+            if conn.execute(select(migrations.c.name).where(migrations.c.name == MONEY_MIGRATION)).first():
+                return
+            # Claim the migration before converting: a second process starting at the same
+            # moment fails on the primary key and rolls back instead of converting twice
+            conn.execute(insert(migrations).values(name=MONEY_MIGRATION, applied_at=datetime.utcnow()))
+            version = conn.execute(select(func.max(SchemaVersion.version))).scalar()
+            legacy_marker = conn.execute(select(settings.c.id).where(settings.c.setting_key == LEGACY_MONEY_STORAGE_KEY)).first()
+            if legacy_marker or (version is not None and version >= 2):
+                return
+            inspector = inspect(conn)
+            for table in Base.metadata.sorted_tables:
+                stored_types = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if not isinstance(column.type, Money) or isinstance(stored_types.get(column.name), Integer):
+                        # Not money, or created (or converted) as BIGINT cents already
+                        continue
+                    table_name, column_name = quote(table.name), quote(column.name)
+                    if engine.dialect.name == 'postgresql':
+                        conn.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE BIGINT USING ROUND({column_name} * 100)"))
+                    else:
+                        conn.execute(text(f"UPDATE {table_name} SET {column_name} = CAST(ROUND({column_name} * 100) AS INTEGER)"))
+    except IntegrityError:
+        pass
+
+# --- Schema Version ---
+# The schema_version table holds one row per version the database has been brought to.
+# Bump SCHEMA_VERSION whenever a model, index or migration changes, so processes started
+# afterwards run init_db instead of trusting the recorded version.
+#   1: tables and indexes up to production history paging
+#   2: money columns stored as integer cents
+#   3: cache_versions counters
+#   4: stock_movements ledger and stock_checkpoints
+#   5: inventory.stock_shards and the stock_shards table
+#   6: stock_holds, inventory.held and stock_shards.held
+#   7: jobs.recurring and its one-pending-run-per-kind index
+#   8: finance.order_id, unique, linked to existing online order entries
+#   9: schema_migrations, recording the money migration outside the settings table
+
+SCHEMA_VERSION = 9
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+def schema_version():
+    """Returns the database's schema version, or None if it has never been recorded."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(SchemaVersion.version))).scalar()
+    except (OperationalError, ProgrammingError):
+        # No schema_version table yet
+        return None
+
+def record_schema_version():
+    try:
+        with engine.begin() as conn:
+            if not conn.execute(select(SchemaVersion.version).where(SchemaVersion.version == SCHEMA_VERSION)).first():
+                conn.execute(insert(SchemaVersion).values(version=SCHEMA_VERSION, applied_at=datetime.utcnow()))
+    except IntegrityError:
+        # Another process recorded it first
+        pass
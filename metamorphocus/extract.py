@@ -0,0 +1,280 @@
+"""Columnar analytics extract.
+
+Usage:
+    python extract.py run [--full]
+    python extract.py query "SELECT category, SUM(amount_cents) / 100 FROM finance GROUP BY 1"
+
+Copies the analytical tables into Parquet files partitioned by month, so reporting queries
+scan compressed columns on disk instead of the live database.
+"""
+import os
+import json
+import glob
+import shutil
+import argparse
+from datetime import date, datetime
+import pandas as pd
+from sqlalchemy import func, Integer, Float, String, Text, Date, DateTime
+from database import get_db, Finance, Order, OrderItem, Labor, ProductionOrder
+import money
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# --- Extract Layout ---
+# EXTRACT_DIR/<table>/month=YYYY-MM/part-*.parquet, plus _state.json holding each table's
+# watermark (highest id extracted). Each run:
+#   1. rewrites the last REFRESH_MONTHS months of every table in full, so recent edits
+#      (order status changes, corrected transactions, deletions) are picked up;
+#   2. appends rows with an id above the watermark that fall in older months (backdated
+#      entries) as a new part file in their month.
+# Older months are otherwise treated as closed; `run --full` rebuilds everything.
+# Money columns are written as integer cents with a `_cents` suffix.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+EXTRACT_DIR = os.getenv('EXTRACT_DIR', os.path.join(APP_DIR, 'analytics_extract'))
+REFRESH_MONTHS = int(os.getenv('EXTRACT_REFRESH_MONTHS', '2'))
+EXTRACT_INTERVAL_MINUTES = int(os.getenv('EXTRACT_INTERVAL_MINUTES', '60'))
+
+STATE_FILE = '_state.json'
+
+class ExtractTable:
+    """One extracted table: its model, the columns to copy and the date that picks its month."""
+    def __init__(self, name, model, columns, date_column, join=None):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.date_column = date_column
+        self.join = join
+
+    def schema(self):
+        """Arrow schema for the table's files, so every part file agrees on column types."""
+        import pyarrow as pa
+        arrow_types = {Integer: pa.int64(), Float: pa.float64(), String: pa.string(), Text: pa.string(),
+                       Date: pa.date32(), DateTime: pa.timestamp('us')}
+        fields = []
+        for column in self.columns:
+            if isinstance(column.type, money.Money):
+                fields.append(pa.field(f"{column.key}_cents", pa.int64()))
+            else:
+                fields.append(pa.field(column.key, arrow_types[type(column.type)]))
+        return pa.schema(fields)
+
+    def select_columns(self):
+        selected = []
+        for column in self.columns:
+            if isinstance(column.type, money.Money):
+                selected.append(money.cents(column, f"{column.key}_cents"))
+            else:
+                selected.append(column.label(column.key))
+        return selected
+
+TABLES = {table.name: table for table in [
+    ExtractTable('finance', Finance, [Finance.id, Finance.date, Finance.type, Finance.category,
+                                      Finance.description, Finance.amount, Finance.payment_method], Finance.date),
+    ExtractTable('orders', Order, [Order.id, Order.status, Order.total_amount, Order.created_at], Order.created_at),
+    # Line items belong to the month their order was placed in
+    ExtractTable('order_items', OrderItem, [OrderItem.id, OrderItem.order_id, OrderItem.product_id, OrderItem.product_name,
+                                            OrderItem.quantity, OrderItem.price], Order.created_at,
+                 join=(Order, OrderItem.order_id == Order.id)),
+    ExtractTable('labor', Labor, [Labor.id, Labor.product_id, Labor.worker, Labor.hours, Labor.work_date, Labor.notes], Labor.work_date),
+    ExtractTable('production_orders', ProductionOrder, [ProductionOrder.id, ProductionOrder.product_id, ProductionOrder.quantity_produced,
+                                                        ProductionOrder.produced_by, ProductionOrder.production_date,
+                                                        ProductionOrder.material_cost], ProductionOrder.production_date),
+]}
+
+def table_dir(name, extract_dir=None):
+    return os.path.join(extract_dir or EXTRACT_DIR, name)
+
+def load_state(extract_dir=None):
+    path = os.path.join(extract_dir or EXTRACT_DIR, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, extract_dir=None):
+    extract_dir = extract_dir or EXTRACT_DIR
+    path = os.path.join(extract_dir, STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+def refresh_start(today=None, months=REFRESH_MONTHS):
+    """First day of the oldest month that is rewritten on every run."""
+    today = today or date.today()
+    month_index = today.year * 12 + today.month - 1 - (months - 1)
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+# --- Extract Job ---
+
+def _query_frame(db, table, *conditions):
+    query = db.query(*table.select_columns(), table.date_column.label('_partition_date'))
+    if table.join:
+        query = query.join(*table.join)
+    rows = query.filter(*conditions).order_by(table.model.id).all()
+    columns = [column['name'] for column in query.column_descriptions]
+    df = pd.DataFrame(rows, columns=columns)
+    df['_partition_date'] = pd.to_datetime(df['_partition_date'])
+    return df
+
+def _write_partitions(df, schema, path, part_name, replace):
+    """Writes one Parquet file per month of `df`. With `replace`, the month's existing files
+    are swapped out for the new one; otherwise it is added next to them."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    written = []
+    for month, rows in df.groupby(df['_partition_date'].dt.strftime('%Y-%m')):
+        partition = os.path.join(path, f"month={month}")
+        # Staged under a dot name, which readers skip, then swapped in
+        staging = os.path.join(path, f".month={month}") if replace else partition
+        os.makedirs(staging, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(rows.drop(columns='_partition_date'), schema=schema, preserve_index=False),
+                       os.path.join(staging, f"{part_name}.parquet"))
+        if replace:
+            if os.path.exists(partition):
+                shutil.rmtree(partition)
+            os.replace(staging, partition)
+        written.append(month)
+    return written
+
+def extract_table(db, table, state, refresh_from, full=False, extract_dir=None):
+    """Brings one table's extract up to date. Returns the number of rows written."""
+    path = table_dir(table.name, extract_dir)
+    watermark = 0 if full else state.get(table.name, {}).get('last_id', 0)
+    if full or not watermark:
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        refresh_from = date.min
+    os.makedirs(path, exist_ok=True)
+
+    # Rows added after this point are left for the next run
+    last_id = db.query(func.max(table.model.id)).scalar() or 0
+    schema = table.schema()
+
+    # Months that are rewritten in full; drop partitions that no longer have any rows
+    recent = _query_frame(db, table, table.date_column >= refresh_from)
+    refreshed = set(_write_partitions(recent, schema, path, 'part-refresh', replace=True))
+    refresh_month = refresh_from.strftime('%Y-%m') if refresh_from != date.min else ''
+    for entry in os.listdir(path):
+        if not entry.startswith('month='):
+            continue
+        month = entry.partition('=')[2]
+        if month >= refresh_month and month not in refreshed:
+            shutil.rmtree(os.path.join(path, entry))
+
+    # New rows dated before the refresh window
+    backdated = _query_frame(db, table, table.model.id > watermark, table.model.id <= last_id, table.date_column < refresh_from)
+    if not backdated.empty:
+        _write_partitions(backdated, schema, path, f"part-{backdated['id'].iloc[0]}-{backdated['id'].iloc[-1]}", replace=False)
+
+    state[table.name] = {'last_id': max(watermark, last_id), 'extracted_at': datetime.utcnow().isoformat(timespec='seconds')}
+    return len(recent) + len(backdated)
+
+def run_extract(full=False, tables=None, extract_dir=None):
+    """Updates the extract for every table (or `tables`). Returns {table: rows written}."""
+    extract_dir = extract_dir or EXTRACT_DIR
+    os.makedirs(extract_dir, exist_ok=True)
+    state = load_state(extract_dir)
+    refresh_from = refresh_start()
+    written = {}
+    db = get_db()
+    try:
+        for name in tables or TABLES:
+            written[name] = extract_table(db, TABLES[name], state, refresh_from, full=full, extract_dir=extract_dir)
+            save_state(state, extract_dir)
+    finally:
+        db.close()
+    return written
+
+# --- Reading the Extract ---
+
+def available(extract_dir=None):
+    """True once every table has been extracted at least once."""
+    state = load_state(extract_dir)
+    return all(name in state for name in TABLES)
+
+def extracted_at(extract_dir=None):
+    """The oldest per-table extract time (UTC), or None if there is no extract."""
+    times = [entry['extracted_at'] for entry in load_state(extract_dir).values()]
+    return datetime.fromisoformat(min(times)) if times else None
+
+def _parquet_glob(name, extract_dir=None):
+    return os.path.join(table_dir(name, extract_dir), 'month=*', '*.parquet')
+
+def read_table(name, columns, extract_dir=None):
+    """Reads some columns of an extracted table into a DataFrame, with DuckDB if it is
+    installed and pyarrow otherwise."""
+    pattern = _parquet_glob(name, extract_dir)
+    files = sorted(glob.glob(pattern))
+    if not files:
+        return pd.DataFrame(columns=columns)
+    if duckdb is not None:
+        con = duckdb.connect()
+        try:
+            return con.execute(f"SELECT {', '.join(columns)} FROM read_parquet(?)", [pattern]).df()
+        finally:
+            con.close()
+    import pyarrow.dataset as ds
+    return ds.dataset(files, format='parquet').to_table(columns=columns).to_pandas()
+
+def finance_frame(extract_dir=None):
+    """Same shape as cashflow.finance_frame, read from the extract."""
+    df = read_table('finance', ['date', 'type', 'category', 'description', 'amount_cents'], extract_dir)
+    df.columns = ['Date', 'Type', 'Category', 'Description', 'Amount']
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['Amount'] = df['Amount'].astype('int64')
+    return df
+
+def labor_frame(extract_dir=None):
+    """Labor rows (work_date, worker, product_id, hours, notes) read from the extract."""
+    return read_table('labor', ['work_date', 'worker', 'product_id', 'hours', 'notes'], extract_dir)
+
+def query(sql, extract_dir=None):
+    """Runs a SQL query against the extract with DuckDB, each table available as a view.
+
+    The SQL comes from whoever is using the manager, so the connection can only read the
+    extract: the tables are handed to DuckDB as Arrow datasets (read by pyarrow, not DuckDB),
+    then DuckDB's own file access (read_csv, COPY ... TO, ATTACH, extensions) is switched
+    off and locked before the query runs."""
+    if duckdb is None:
+        raise RuntimeError("Ad-hoc queries need DuckDB: pip install duckdb")
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    month = pa.field('month', pa.string())
+    con = duckdb.connect()
+    try:
+        for name, table in TABLES.items():
+            files = sorted(glob.glob(_parquet_glob(name, extract_dir)))
+            if files:
+                con.register(name, ds.dataset(files, format='parquet', partition_base_dir=table_dir(name, extract_dir),
+                                              partitioning=ds.partitioning(pa.schema([month]), flavor='hive')))
+            else:
+                # No rows extracted yet: an empty table with the right columns
+                con.register(name, table.schema().append(month).empty_table())
+        con.execute("SET enable_external_access = false")
+        con.execute("SET lock_configuration = true")
+        return con.execute(sql).df()
+    finally:
+        con.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="metamorphocus analytics extract")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    run = subcommands.add_parser('run', help="Update the Parquet extract")
+    run.add_argument('--full', action='store_true', help="Rebuild every table from scratch")
+    sql = subcommands.add_parser('query', help="Run SQL against the extract (needs DuckDB)")
+    sql.add_argument('sql')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        for name, rows in run_extract(full=args.full).items():
+            print(f"{name:<20} {rows:>8} rows written")
+    else:
+        print(query(args.sql).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from database import Inventory, Material, Order, OrderItem, ProductionOrder, BillOfMaterials
+
+# --- Demand Forecasting ---
+# Daily demand per product (units sold in orders that weren't cancelled) and per material
+# (units consumed by production runs, via each product's bill of materials) is smoothed
+# exponentially across all items at once. Reorder points cover the expected demand over the
+# lead time plus safety stock for its variability; reorder quantities bring stock up to
+# REORDER_COVERAGE_DAYS of demand beyond that. Items without demand history fall back to the
+# previous rule: reorder at the minimum, up to twice the minimum.
+
+HISTORY_DAYS = int(os.getenv('FORECAST_HISTORY_DAYS', '90'))
+SPAN_DAYS = int(os.getenv('FORECAST_SPAN_DAYS', '14'))  # Smoothing span; alpha = 2 / (span + 1)
+PRODUCT_LEAD_TIME_DAYS = float(os.getenv('PRODUCT_LEAD_TIME_DAYS', '7'))
+MATERIAL_LEAD_TIME_DAYS = float(os.getenv('MATERIAL_LEAD_TIME_DAYS', '14'))
+REORDER_COVERAGE_DAYS = float(os.getenv('REORDER_COVERAGE_DAYS', '30'))
+SERVICE_LEVEL_Z = 1.65  # Safety stock for ~95% of lead-time demand
+
+class DemandModel:
+    """Exponentially smoothed daily demand, and its variance, per item over complete days.
+
+    `daily(db, start, end)` returns (item id, day, quantity) rows for days in [start, end] and
+    `fingerprint(db, start, end)` a one-row summary of the same data. The model is built once
+    over HISTORY_DAYS and then advanced by the days completed since, so a refresh normally
+    reads a single day of rows. If the fingerprint of days already folded in changes (a
+    cancelled order, a backdated production run, an edited BOM), it is rebuilt. The state
+    lives in the process and is shared by every session.
+    """
+    def __init__(self, daily, fingerprint, span_days=SPAN_DAYS, history_days=HISTORY_DAYS):
+        self.daily = daily
+        self.fingerprint = fingerprint
+        self.alpha = 2 / (span_days + 1)
+        self.history_days = history_days
+        self.rebuilds = 0
+        self._reset()
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self.item_ids = np.array([], dtype='int64')
+        self.level = np.zeros(0)
+        self.variance = np.zeros(0)
+        self.start = None
+        self.through = None
+        self.summary = None
+
+    def refresh(self, db, today=None):
+        """Brings the model up to yesterday. Returns a DataFrame of rate and std per item id."""
+        today = today or date.today()
+        yesterday = today - timedelta(days=1)
+        with self._lock:
+            if self.through is None or self.fingerprint(db, self.start, self.through) != self.summary:
+                self._reset()
+                self.start = today - timedelta(days=self.history_days)
+                self._fold(db, self.start, yesterday)
+                self.rebuilds += 1
+            elif self.through < yesterday:
+                self._fold(db, self.through + timedelta(days=1), yesterday)
+            return pd.DataFrame({'rate': self.level, 'std': np.sqrt(self.variance)}, index=self.item_ids)
+
+    def _fold(self, db, start, end):
+        # Summarize before reading, so a row that lands in between forces a rebuild next time
+        summary = self.fingerprint(db, self.start, end)
+        rows = pd.DataFrame(self.daily(db, start, end), columns=['item_id', 'day', 'quantity'])
+        rows['day'] = pd.to_datetime(rows['day'])
+        matrix = rows.pivot_table(index='day', columns='item_id', values='quantity', aggfunc='sum', fill_value=0)
+
+        new_ids = np.setdiff1d(matrix.columns.to_numpy(dtype='int64'), self.item_ids)
+        if len(new_ids):
+            self.item_ids = np.concatenate([self.item_ids, new_ids])
+            self.level = np.concatenate([self.level, np.zeros(len(new_ids))])
+            self.variance = np.concatenate([self.variance, np.zeros(len(new_ids))])
+        days = matrix.reindex(index=pd.date_range(start, end, freq='D'), columns=self.item_ids, fill_value=0).to_numpy(dtype='float64')
+
+        # One vectorized update per day across every item (exponentially weighted mean and variance)
+        level, variance, alpha = self.level, self.variance, self.alpha
+        for demand in days:
+            diff = demand - level
+            increment = alpha * diff
+            level = level + increment
+            variance = (1 - alpha) * (variance + diff * increment)
+        self.level, self.variance = level, variance
+        self.through = end
+        self.summary = summary
+
+def _day_bounds(start, end):
+    return datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+
+def _sold(db, start, end):
+    window_start, window_end = _day_bounds(start, end)
+    return db.query(OrderItem).join(Order, OrderItem.order_id == Order.id).filter(
+        Order.status != 'cancelled', Order.created_at >= window_start, Order.created_at < window_end)
+
+def _product_daily(db, start, end):
+    day = func.date(Order.created_at)
+    return _sold(db, start, end).with_entities(OrderItem.product_id, day, func.sum(OrderItem.quantity)).group_by(OrderItem.product_id, day).all()
+
+def _product_fingerprint(db, start, end):
+    return tuple(_sold(db, start, end).with_entities(func.count(OrderItem.id), func.sum(OrderItem.quantity)).one())
+
+def _consumed(db, start, end):
+    return db.query(ProductionOrder).join(BillOfMaterials, BillOfMaterials.product_id == ProductionOrder.product_id).filter(
+        ProductionOrder.production_date >= start, ProductionOrder.production_date <= end)
+
+consumed_quantity = ProductionOrder.quantity_produced * BillOfMaterials.quantity_needed
+
+def _material_daily(db, start, end):
+    return _consumed(db, start, end).with_entities(
+        BillOfMaterials.material_id, ProductionOrder.production_date, func.sum(consumed_quantity)
+    ).group_by(BillOfMaterials.material_id, ProductionOrder.production_date).all()
+
+def _material_fingerprint(db, start, end):
+    runs, total = _consumed(db, start, end).with_entities(func.count(ProductionOrder.id), func.sum(consumed_quantity)).one()
+    # BOM quantities are floats; round so summation order can't change the fingerprint
+    return runs, round(total or 0.0, 6)
+
+product_demand = DemandModel(_product_daily, _product_fingerprint)
+material_demand = DemandModel(_material_daily, _material_fingerprint)
+
+# --- Reorder Recommendations ---
+
+def reorder_plan(stock, minimum, demand, lead_time_days, coverage_days=REORDER_COVERAGE_DAYS, z=SERVICE_LEVEL_Z):
+    """Returns daily demand, days of cover, reorder point and quantity per item.
+
+    `stock` and `minimum` are Series indexed by item id; `demand` is a DemandModel.refresh() result.
+    """
+    rate = demand['rate'].reindex(stock.index, fill_value=0.0)
+    std = demand['std'].reindex(stock.index, fill_value=0.0)
+    reorder_point = np.maximum(rate * lead_time_days + z * std * np.sqrt(lead_time_days), minimum)
+    order_up_to = np.maximum(reorder_point + rate * coverage_days, 2 * minimum)
+    needs_reorder = stock <= reorder_point
+    return pd.DataFrame({
+        'daily_demand': rate,
+        'days_of_cover': stock / rate.where(rate > 0),  # NaN without demand, sorted last
+        'reorder_point': reorder_point,
+        'reorder_quantity': (order_up_to - stock).clip(lower=0).where(needs_reorder, 0),
+        'needs_reorder': needs_reorder,
+    })
+
+def product_reorders(db, today=None):
+    """Products at or below their forecast reorder point, most urgent first."""
+    products = pd.DataFrame(db.query(Inventory.id, Inventory.product_name, Inventory.sku, Inventory.stock_level, Inventory.min_stock).all(),
+                            columns=['id', 'product_name', 'sku', 'stock_level', 'min_stock']).set_index('id')
+    plan = reorder_plan(products['stock_level'], products['min_stock'], product_demand.refresh(db, today), PRODUCT_LEAD_TIME_DAYS)
+    plan['reorder_point'] = np.ceil(plan['reorder_point'])
+    plan['reorder_quantity'] = np.ceil(plan['reorder_quantity']).astype('int64')
+    result = products.join(plan)
+    return result[result['needs_reorder']].sort_values(['days_of_cover', 'stock_level'])
+
+def material_reorders(db, today=None):
+    """Materials at or below their forecast reorder point, most urgent first."""
+    materials = pd.DataFrame(db.query(Material.id, Material.material_name, Material.unit, Material.quantity, Material.reorder_point).all(),
+                             columns=['id', 'material_name', 'unit', 'quantity', 'min_quantity']).set_index('id')
+    plan = reorder_plan(materials['quantity'], materials['min_quantity'], material_demand.refresh(db, today), MATERIAL_LEAD_TIME_DAYS)
+    result = materials.join(plan)
+    return result[result['needs_reorder']].sort_values(['days_of_cover', 'quantity'])
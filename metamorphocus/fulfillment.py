@@ -0,0 +1,76 @@
+from sqlalchemy import delete, func, select, update
+from database import Order, OrderItem, Inventory, Finance
+import jobs
+import stock_ledger
+
+# --- Order Fulfillment ---
+# Moves any number of customer orders to a new status with one set-based UPDATE. Cancelling
+# puts the ordered quantities back into inventory and removes the orders' income entries in
+# the same transaction, so stock and finance never disagree with the order. Cancelled is final:
+# reopening an order would have to take the stock out again, which may no longer be there.
+
+ORDER_STATUSES = ["pending", "processing", "completed", "cancelled"]
+
+def transition_orders(db, order_ids, new_status):
+    """Moves the given orders to `new_status` and commits. Returns the ids that changed.
+
+    Orders that are already cancelled or already in `new_status` are left alone. The UPDATE
+    returns the ids it changed, so two managers cancelling the same order at once can't
+    both restock it or remove its income twice.
+    """
+    if new_status not in ORDER_STATUSES:
+        raise ValueError(f"Unknown order status: {new_status}")
+    if not order_ids:
+        return []
+
+    try:
+        changed = db.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids), Order.status != 'cancelled', Order.status != new_status)
+            .values(status=new_status)
+            .returning(Order.id, Order.created_at)
+        ).all()
+        changed_ids = [row.id for row in changed]
+
+        if new_status == 'cancelled' and changed_ids:
+            restock_orders(db, changed_ids)
+            # The order's sale never happened, so its income entry goes with it
+            db.execute(delete(Finance).where(Finance.order_id.in_(changed_ids)), execution_options={'synchronize_session': False})
+            # Cancelled orders drop out of the daily sales rollup
+            for sales_date in sorted({row.created_at.strftime('%Y-%m-%d') for row in changed}):
+                jobs.enqueue(db, 'refresh_sales_rollup', {'date': sales_date})
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return changed_ids
+
+def restock_orders(db, order_ids):
+    """Adds the items of the given orders back to stock with one UPDATE and records a ledger
+    movement per order line. Does not commit."""
+    returned = (
+        select(func.sum(OrderItem.quantity))
+        .where(OrderItem.order_id.in_(order_ids), OrderItem.product_id == Inventory.id)
+        .scalar_subquery()
+    )
+    restocked_products = select(OrderItem.product_id).where(OrderItem.order_id.in_(order_ids))
+    new_levels = dict(db.execute(
+        update(Inventory)
+        .where(Inventory.id.in_(restocked_products))
+        .values(stock_level=Inventory.stock_level + returned)
+        .returning(Inventory.id, Inventory.current_stock),
+        execution_options={'synchronize_session': False}
+    ).all())
+
+    # Walk each product's lines back from its new level, so every movement gets its running balance
+    lines = db.query(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity).filter(
+        OrderItem.order_id.in_(order_ids), OrderItem.product_id.in_(list(new_levels))
+    ).order_by(OrderItem.product_id, OrderItem.order_id.desc()).all()
+    balances = dict(new_levels)
+    movements = []
+    for order_id, product_id, quantity in lines:
+        movements.append((order_id, product_id, quantity, balances[product_id]))
+        balances[product_id] -= quantity
+    for order_id, product_id, quantity, balance in reversed(movements):
+        stock_ledger.record(db, stock_ledger.PRODUCT, product_id, quantity, balance, 'cancellation', order_id)
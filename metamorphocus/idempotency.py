@@ -0,0 +1,54 @@
+import os
+import json
+import hashlib
+from database import IdempotencyKey
+from cache import LRUCache
+
+# --- Idempotent Requests ---
+# Clients send an `Idempotency-Key` header with each logical checkout. The first successful
+# response is stored in the `idempotency_keys` table in the same transaction as the order,
+# so a retried request (e.g. after a timeout) gets the stored response back instead of
+# creating a second order. Recently used keys are also kept in an in-process LRU so
+# replays don't need a database round trip.
+
+MAX_KEY_LENGTH = 255
+
+class StoredResponse:
+    """A response previously returned for an idempotency key."""
+    def __init__(self, request_hash, status, body):
+        self.request_hash = request_hash
+        self.status = status
+        self.body = body
+
+_recent = LRUCache(int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '10000')))
+
+def fingerprint(data):
+    """Hashes a JSON request body so a reused key with a different payload can be rejected."""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def lookup(db, key):
+    """Returns the StoredResponse for a key, checking the LRU before the database."""
+    stored = _recent.get(key)
+    if stored is not None:
+        return stored
+    row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+    if row is None:
+        return None
+    stored = StoredResponse(row.request_hash, row.response_status, row.response_body)
+    _recent.put(key, stored)
+    return stored
+
+def record(db, key, request_hash, status, payload):
+    """Adds the response for a key to the session; it is persisted when the caller commits.
+
+    Returns the serialized body. A concurrent request with the same key will fail the
+    unique constraint on commit, which callers should treat as a duplicate.
+    """
+    body = json.dumps(payload)
+    db.add(IdempotencyKey(key=key, request_hash=request_hash, response_status=status, response_body=body))
+    return body
+
+def remember(key, request_hash, status, body):
+    """Caches a response after the transaction that recorded it has committed."""
+    _recent.put(key, StoredResponse(request_hash, status, body))
@@ -0,0 +1,175 @@
+import os
+import time
+import heapq
+import logging
+import threading
+import contextlib
+import contextvars
+from collections import Counter
+from sqlalchemy import event
+
+# --- Query Instrumentation ---
+# Hooks into SQLAlchemy's cursor events to record how many queries each Streamlit page
+# or Flask route runs, how long they spend in the database and which statements are slowest.
+# A "run" is one page render or one HTTP request. Statements repeated more than
+# N_PLUS_ONE_THRESHOLD times in a single run are flagged as likely N+1 patterns.
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+MAX_SLOW_QUERIES = 10
+
+logger = logging.getLogger('metamorphocus.sql')
+
+class ScopeStats:
+    """Aggregated query statistics for one page or route."""
+    def __init__(self, name):
+        self.name = name
+        self.runs = 0
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = []  # min-heap of (duration, statement), capped at MAX_SLOW_QUERIES
+        self.n_plus_one = {}  # statement -> highest repeat count seen in a single run
+        self.last_run = None
+
+    def to_dict(self):
+        return {
+            'scope': self.name,
+            'runs': self.runs,
+            'queries': self.queries,
+            'db_time_ms': round(self.db_time * 1000, 3),
+            'avg_queries_per_run': round(self.queries / self.runs, 2) if self.runs else 0,
+            'slowest': [
+                {'duration_ms': round(duration * 1000, 3), 'statement': statement}
+                for duration, statement in sorted(self.slowest, reverse=True)
+            ],
+            'n_plus_one': [
+                {'statement': statement, 'count': count}
+                for statement, count in sorted(self.n_plus_one.items(), key=lambda x: x[1], reverse=True)
+            ],
+            'last_run': self.last_run.to_dict() if self.last_run else None,
+        }
+
+class QueryRun:
+    """Queries executed during a single page render or request."""
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+        self.started = time.perf_counter()
+        self.finished = None
+        self.statement_counts = Counter()
+
+    def to_dict(self):
+        end = self.finished or time.perf_counter()
+        return {
+            'queries': self.queries,
+            'db_time_ms': round(self.db_time * 1000, 3),
+            'duration_ms': round((end - self.started) * 1000, 3),
+        }
+
+_lock = threading.Lock()
+_scopes = {}
+_current_run = contextvars.ContextVar('current_query_run', default=None)
+
+def _get_scope(name):
+    scope = _scopes.get(name)
+    if scope is None:
+        scope = _scopes[name] = ScopeStats(name)
+    return scope
+
+def begin_run(scope_name):
+    """Starts attributing queries on the current thread/context to the given page or route."""
+    run = QueryRun(scope_name)
+    with _lock:
+        scope = _get_scope(scope_name)
+        scope.runs += 1
+        scope.last_run = run
+    _current_run.set(run)
+    return run
+
+def end_run():
+    """Stops attributing queries to the current run and returns it (or None)."""
+    run = _current_run.get()
+    if run is not None:
+        run.finished = time.perf_counter()
+        _current_run.set(None)
+    return run
+
+def current_run():
+    return _current_run.get()
+
+@contextlib.contextmanager
+def scoped_run(scope_name):
+    """Attributes queries inside the block to their own scope, then restores the enclosing run.
+
+    Used for Streamlit fragments, which rerun on their own without the rest of the page.
+    """
+    outer = _current_run.get()
+    run = begin_run(scope_name)
+    try:
+        yield run
+    finally:
+        end_run()
+        _current_run.set(outer)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    run = _current_run.get()
+    scope_name = run.scope if run is not None else '(background)'
+
+    with _lock:
+        scope = _get_scope(scope_name)
+        scope.queries += 1
+        scope.db_time += duration
+
+        if len(scope.slowest) < MAX_SLOW_QUERIES:
+            heapq.heappush(scope.slowest, (duration, statement))
+        elif duration > scope.slowest[0][0]:
+            heapq.heapreplace(scope.slowest, (duration, statement))
+
+        if run is not None:
+            run.queries += 1
+            run.db_time += duration
+            run.statement_counts[statement] += 1
+            count = run.statement_counts[statement]
+            if count > N_PLUS_ONE_THRESHOLD and count > scope.n_plus_one.get(statement, 0):
+                scope.n_plus_one[statement] = count
+
+    if duration * 1000 >= SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms) in %s: %s", duration * 1000, scope_name, statement)
+
+def install(engine):
+    """Registers the cursor event hooks on an engine. Safe to call more than once."""
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def snapshot():
+    """Returns a JSON-serialisable copy of all collected statistics, busiest scopes first."""
+    with _lock:
+        scopes = [scope.to_dict() for scope in _scopes.values()]
+    scopes.sort(key=lambda s: s['db_time_ms'], reverse=True)
+    return {
+        'slow_query_ms': SLOW_QUERY_MS,
+        'n_plus_one_threshold': N_PLUS_ONE_THRESHOLD,
+        'scopes': scopes,
+    }
+
+def scope_snapshot(scope_name):
+    """Returns the statistics for a single page or route, or None if it has not run yet."""
+    with _lock:
+        scope = _scopes.get(scope_name)
+        return scope.to_dict() if scope else None
+
+def reset():
+    """Clears all collected statistics."""
+    with _lock:
+        _scopes.clear()
@@ -0,0 +1,292 @@
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import and_, exists, func, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects import postgresql, sqlite
+from database import engine, get_db, Job, Order, OrderItem, Inventory, Finance, DailySales
+import valuation
+import stock_ledger
+import stock_shards
+
+# --- Background Job Queue ---
+# Work that should happen after an order but doesn't need to delay the customer's response
+# (finance entries, low-stock alerts, analytics rollups) is written to the `jobs` table in the
+# same transaction as the order. A worker thread picks pending jobs up and runs them on a
+# small thread pool, so a crash or restart never loses a job: anything still pending is
+# processed when the worker next starts. Handlers must be safe to run more than once.
+
+POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '5'))
+MAX_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+LEASE_SECONDS = 300  # A job 'running' for longer than this is assumed abandoned and retried
+BATCH_SIZE = 20
+
+logger = logging.getLogger('metamorphocus.jobs')
+
+HANDLERS = {}
+
+def handler(kind):
+    """Registers a function as the handler for a job kind."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+def enqueue(db, kind, payload=None, run_after=None):
+    """Adds a job to the caller's session. It becomes visible to the worker when the caller commits."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, payload=json.dumps(payload or {}), status='pending', run_after=run_after or datetime.utcnow())
+    db.add(job)
+    return job
+
+def schedule(db, kind, payload=None, run_after=None):
+    """Enqueues a run of a recurring job unless one is already pending. The insert skips on
+    the jobs table's one-pending-run-per-kind index, so processes scheduling the same job at
+    once (or duplicates left from before the index) still end up with a single pending run.
+    Does not commit."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    insert_or_skip(db, Job, kind=kind, payload=json.dumps(payload or {}), status='pending', recurring=True,
+                   run_after=run_after or datetime.utcnow())
+
+def insert_or_skip(db, model, **values):
+    """INSERT ... ON CONFLICT DO NOTHING: adds a row unless it would break a unique index.
+    Returns whether it was added. Does not commit."""
+    dialect = postgresql if engine.dialect.name == 'postgresql' else sqlite
+    return db.execute(dialect.insert(model).values(**values).on_conflict_do_nothing()).rowcount == 1
+
+def has_pending_run():
+    """True for jobs of a recurring kind that already has another pending run, so they can't
+    go back to pending themselves."""
+    other = aliased(Job)
+    return and_(Job.recurring.is_(True), exists().where(
+        other.kind == Job.kind, other.status == 'pending', other.recurring.is_(True), other.id != Job.id))
+
+# --- Worker ---
+
+class JobWorker:
+    """Polls the jobs table and runs due jobs on a thread pool."""
+    def __init__(self, max_workers=MAX_WORKERS, poll_interval=POLL_INTERVAL):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the dispatcher thread. Safe to call more than once."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job-worker')
+            self._thread = threading.Thread(target=self._run, name='job-dispatcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, wait=True):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def notify(self):
+        """Wakes the dispatcher immediately, e.g. after committing new jobs."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_due_jobs()
+            except Exception:
+                logger.exception("Job dispatcher failed to poll the queue")
+                claimed = 0
+            # Keep draining while there is work; otherwise sleep until notified or the next poll
+            if claimed < BATCH_SIZE:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def run_due_jobs(self):
+        """Claims up to BATCH_SIZE due jobs, runs them on the pool and waits for them to finish."""
+        job_ids = claim_due_jobs(BATCH_SIZE)
+        if job_ids:
+            list(self._executor.map(run_job, job_ids))
+        return len(job_ids)
+
+def claim_due_jobs(limit):
+    """Atomically marks due jobs as running and returns their ids.
+
+    The conditional UPDATE makes claiming safe when several processes run a worker
+    against the same database: only one of them can move a job out of 'pending'.
+    """
+    now = datetime.utcnow()
+    db = get_db()
+    try:
+        # Return abandoned jobs (worker died mid-run) to the queue, unless a later run of the
+        # same recurring job is already waiting
+        abandoned = (Job.status == 'running', Job.locked_at < now - timedelta(seconds=LEASE_SECONDS))
+        db.execute(
+            update(Job).where(*abandoned, has_pending_run())
+            .values(status='failed', locked_at=None, finished_at=now, last_error='Abandoned; superseded by a pending run'),
+            execution_options={'synchronize_session': False}
+        )
+        db.execute(
+            update(Job).where(*abandoned)
+            .values(status='pending', locked_at=None)
+        )
+        candidates = [row.id for row in db.query(Job.id).filter(Job.status == 'pending', Job.run_after <= now).order_by(Job.id).limit(limit)]
+        claimed = []
+        for job_id in candidates:
+            result = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == 'pending')
+                .values(status='running', locked_at=now, attempts=Job.attempts + 1)
+            )
+            if result.rowcount == 1:
+                claimed.append(job_id)
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+def run_job(job_id):
+    """Runs one claimed job and records the outcome, scheduling a retry with backoff on failure."""
+    db = get_db()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job is None:
+            return
+        try:
+            HANDLERS[job.kind](db, json.loads(job.payload))
+            job.status = 'done'
+            job.finished_at = datetime.utcnow()
+            job.last_error = None
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            job = db.query(Job).filter(Job.id == job_id).first()
+            job.last_error = f"{type(e).__name__}: {e}"
+            job.locked_at = None
+            superseded = db.query(Job.id).filter(Job.id == job_id, has_pending_run()).first() is not None
+            if job.attempts >= MAX_ATTEMPTS or superseded:
+                job.status = 'failed'
+                job.finished_at = datetime.utcnow()
+                logger.error("Job %s (%s) failed permanently: %s", job.id, job.kind, job.last_error)
+            else:
+                job.status = 'pending'
+                job.run_after = datetime.utcnow() + timedelta(seconds=2 ** job.attempts)
+                logger.warning("Job %s (%s) failed, retrying: %s", job.id, job.kind, job.last_error)
+            db.commit()
+    finally:
+        db.close()
+
+def ensure_scheduled(kind, payload=None):
+    """Schedules a recurring job unless a run is already pending or running. Used to seed
+    recurring jobs, which schedule their next run when they run."""
+    db = get_db()
+    try:
+        exists = db.query(Job.id).filter(Job.kind == kind, Job.status.in_(('pending', 'running'))).first()
+        if not exists:
+            schedule(db, kind, payload)
+            db.commit()
+    finally:
+        db.close()
+
+def queue_depth():
+    """Returns the number of jobs in each status, e.g. {'pending': 3, 'done': 120}."""
+    db = get_db()
+    try:
+        return dict(db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+    finally:
+        db.close()
+
+worker = JobWorker()
+
+# --- Order Post-Processing Handlers ---
+
+@handler('order_finance_entry')
+def create_order_finance_entry(db, payload):
+    """Records a Finance income entry for a storefront order (once per order, enforced by the
+    unique finance.order_id). Orders cancelled before the job runs get no entry; the row lock
+    keeps a cancel from committing between the check and the insert."""
+    order = db.query(Order).filter(Order.id == payload['order_id']).with_for_update().first()
+    if not order or order.status == 'cancelled':
+        return
+    insert_or_skip(
+        db, Finance,
+        order_id=order.id,
+        date=order.created_at.date(),
+        type='Income',
+        category='Product Sales',
+        description=f"Online order #{order.id}",
+        amount=order.total_amount,
+        payment_method='Online'
+    )
+
+@handler('low_stock_check')
+def check_low_stock(db, payload):
+    """Logs an alert for ordered products that are at or below their minimum stock level."""
+    low_stock_items = db.query(Inventory).filter(
+        Inventory.id.in_(payload['product_ids']),
+        Inventory.stock_level <= Inventory.min_stock
+    ).all()
+    for item in low_stock_items:
+        logger.warning("Low stock: %s (SKU: %s) has %s left, minimum is %s",
+                       item.product_name, item.sku, item.stock_level, item.min_stock)
+
+@handler('refresh_sales_rollup')
+def refresh_sales_rollup(db, payload):
+    """Recomputes the daily_sales row for one day from the orders table."""
+    sales_date = datetime.strptime(payload['date'], '%Y-%m-%d').date()
+    day_start = datetime.combine(sales_date, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+
+    in_day = (Order.created_at >= day_start, Order.created_at < day_end, Order.status != 'cancelled')
+    order_count, revenue = db.query(func.count(Order.id), func.coalesce(func.sum(Order.total_amount), 0)).filter(*in_day).one()
+    units_sold = db.query(func.coalesce(func.sum(OrderItem.quantity), 0)).join(Order, OrderItem.order_id == Order.id).filter(*in_day).scalar()
+
+    rollup = db.query(DailySales).filter(DailySales.sales_date == sales_date).first()
+    if rollup is None:
+        rollup = DailySales(sales_date=sales_date)
+        db.add(rollup)
+    rollup.order_count = order_count
+    rollup.units_sold = units_sold
+    rollup.revenue = revenue
+
+# --- Recurring Jobs ---
+
+@handler('valuation_snapshot')
+def take_valuation_snapshot(db, payload):
+    """Refreshes today's inventory/materials valuation snapshot, then schedules the next run.
+
+    Runs every SNAPSHOT_REFRESH_MINUTES, so each day's row ends up holding that day's
+    closing values even if nobody opens the Analytics page.
+    """
+    valuation.record_snapshot(db, force=True)
+    schedule(db, 'valuation_snapshot', run_after=datetime.utcnow() + timedelta(minutes=valuation.SNAPSHOT_REFRESH_MINUTES))
+
+@handler('analytics_extract')
+def update_analytics_extract(db, payload):
+    """Brings the Parquet analytics extract up to date, then schedules the next run."""
+    # Imported here so pyarrow is only loaded by the process that runs the job
+    import extract
+    extract.run_extract()
+    schedule(db, 'analytics_extract', run_after=datetime.utcnow() + timedelta(minutes=extract.EXTRACT_INTERVAL_MINUTES))
+
+@handler('stock_checkpoint')
+def take_stock_checkpoint(db, payload):
+    """Reconciles the stock ledger and checkpoints every item's balance, then schedules the next run."""
+    # Sharded products' sales are taken off first, so their ledger balances are exact
+    stock_shards.rebalance(db)
+    db.commit()
+    reconciled = stock_ledger.checkpoint()
+    if reconciled:
+        logger.info("Stock checkpoint recorded %s ledger corrections", reconciled)
+    schedule(db, 'stock_checkpoint', run_after=datetime.utcnow() + timedelta(hours=stock_ledger.CHECKPOINT_HOURS))
@@ -0,0 +1,25 @@
+import importlib
+
+# --- Page Registry ---
+# Sidebar label -> module under manager_pages/. Each module defines render(), and is only
+# imported the first time its page is shown, so a page's heavy dependencies (plotly, pyarrow,
+# forecasting) aren't loaded by a session that never opens it. Imported modules stay in
+# sys.modules, so later reruns only pay for render() itself.
+
+PAGES = {
+    "🏠 Dashboard": 'dashboard',
+    "📈 Analytics": 'analytics',
+    "📦 Inventory": 'inventory',
+    "🔧 Materials": 'materials',
+    "🏭 Production": 'production',
+    "💰 Finance": 'finance',
+    "👷 Labor": 'labor',
+    "🛒 Orders": 'orders',
+    "💡 Ideas": 'ideas',
+    "🧪 Test Data": 'test_data',
+}
+
+def render(label):
+    """Imports the page's module on first use and renders it."""
+    module = importlib.import_module(f"{__name__}.{PAGES[label]}")
+    module.render()
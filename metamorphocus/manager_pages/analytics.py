@@ -0,0 +1,352 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from database import get_db, Inventory, Labor, Settings
+import money
+import valuation
+import charts
+import extract
+from cashflow import cash_flow_series, finance_frame
+from manager_pages.widgets import page_fragment
+
+def render():
+    """Analytics page."""
+    st.title("📈 Advanced Analytics & Insights")
+    st.markdown("Deep dive into your business performance and trends")
+    
+    # Finance and labor rows are the page's full-table scans. Once the Parquet extract has
+    # been built (extract.py, refreshed by a background job) they can be read from it instead
+    # of the live database.
+    use_extract = False
+    if extract.available():
+        source = st.radio("Data source", ["Live database", "Analytics extract"], horizontal=True, key="analytics_source")
+        use_extract = source == "Analytics extract"
+        if use_extract:
+            st.caption(f"Extract as of {extract.extracted_at():%Y-%m-%d %H:%M} UTC")
+    
+    # Get all data from database
+    # Inventory and materials figures are aggregated in SQL; today's valuation snapshot is
+    # refreshed at most hourly so the value-over-time chart builds up as the page is used.
+    db = get_db()
+    try:
+        # Record today's snapshot first: it commits, which expires the objects loaded below
+        valuation.record_snapshot(db)
+        
+        if use_extract:
+            df_finance = extract.finance_frame()
+            labor_rows = extract.labor_frame()
+        else:
+            df_finance = finance_frame(db)
+            labor_rows = pd.DataFrame(db.query(Labor.work_date, Labor.worker, Labor.product_id, Labor.hours, Labor.notes).all(),
+                                      columns=['work_date', 'worker', 'product_id', 'hours', 'notes'])
+        product_names = dict(db.query(Inventory.id, Inventory.product_name).all())
+        
+        inventory_stats = valuation.inventory_summary(db)
+        category_value = valuation.inventory_value_by_category(db)
+        stock_status = valuation.stock_status_counts(db)
+        
+        materials_stats = valuation.materials_summary(db)
+        top_materials = valuation.top_materials_by_value(db)
+        material_status = valuation.material_status_counts(db)
+        
+        valuation_history = valuation.snapshot_history(db)
+    finally:
+        db.close()
+    
+    # Financial Analytics Section
+    st.subheader("💰 Financial Performance")
+    
+    if not df_finance.empty:
+        # Amounts are integer cents: aggregate exactly, convert to dollars for display
+        is_income = df_finance['Type'] == 'Income'
+        is_expense = df_finance['Type'] == 'Expense'
+        
+        # Key Financial Metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            total_income = money.from_cents(df_finance.loc[is_income, 'Amount'].sum())
+            st.metric("Total Revenue", f"${total_income:,.2f}")
+        
+        with col2:
+            total_expenses = money.from_cents(df_finance.loc[is_expense, 'Amount'].sum())
+            st.metric("Total Expenses", f"${total_expenses:,.2f}")
+        
+        with col3:
+            net_profit = total_income - total_expenses
+            profit_margin = (net_profit / total_income * 100) if total_income > 0 else 0
+            st.metric("Net Profit", f"${net_profit:,.2f}", f"{profit_margin:.1f}% margin")
+        
+        with col4:
+            avg_transaction = money.from_cents(df_finance['Amount'].mean())
+            st.metric("Avg Transaction", f"${avg_transaction:,.2f}")
+        
+        st.markdown("---")
+        
+        # Charts Row 1
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Monthly Revenue vs Expenses Trend
+            monthly_data = df_finance.groupby([df_finance['Date'].dt.to_period('M'), 'Type'])['Amount'].sum().reset_index()
+            monthly_data['Date'] = monthly_data['Date'].astype(str)
+            monthly_data['Amount'] = money.from_cents(monthly_data['Amount'])
+            
+            fig = charts.line('analytics.monthly_trend', monthly_data, x='Date', y='Amount', color='Type',
+                              title='Monthly Revenue vs Expenses Trend',
+                              color_discrete_map={'Income': '#10B981', 'Expense': '#EF4444'},
+                              markers=True, layout=dict(hovermode='x unified'))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            # Top Expense Categories
+            expense_data = money.from_cents(df_finance[is_expense].groupby('Category')['Amount'].sum().sort_values(ascending=False).head(10))
+            
+            fig = charts.bar('analytics.top_expenses', x=expense_data.values, y=expense_data.index, orientation='h',
+                             title='Top 10 Expense Categories',
+                             labels={'x': 'Amount ($)', 'y': 'Category'},
+                             color=expense_data.values,
+                             color_continuous_scale='Reds', layout=dict(showlegend=False))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Charts Row 2
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Income Sources Breakdown
+            income_data = money.from_cents(df_finance[is_income].groupby('Category')['Amount'].sum())
+            
+            fig = charts.pie('analytics.income_sources', values=income_data.values, names=income_data.index,
+                             title='Income Sources Breakdown',
+                             color_discrete_sequence=px.colors.sequential.Greens_r, traces=charts.PIE_TRACES)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            # Cash Flow Over Time - vectorized running balance, resampled to fit the selected range
+            # Changing the range reruns only this chart
+            @page_fragment("Cash flow")
+            def cash_flow_chart(df_finance):
+                first_date = df_finance['Date'].min().date()
+                last_date = df_finance['Date'].max().date()
+                cash_flow_range = st.date_input("Cash flow range", value=(first_date, last_date),
+                                                min_value=first_date, max_value=last_date, key="cash_flow_range")
+                # The picker returns a single date while the user is still choosing the end date
+                if isinstance(cash_flow_range, (tuple, list)) and len(cash_flow_range) == 2:
+                    range_start, range_end = cash_flow_range
+                else:
+                    range_start, range_end = first_date, last_date
+            
+                df_cash_flow, resolution = cash_flow_series(df_finance, range_start, range_end)
+                df_cash_flow['Cumulative'] = money.from_cents(df_cash_flow['Cumulative'])
+            
+                fig = charts.area('analytics.cash_flow', df_cash_flow, x='Date', y='Cumulative',
+                                  title=f'Cumulative Cash Flow ({resolution})',
+                                  labels={'Cumulative': 'Cash Flow ($)'},
+                                  traces=dict(line_color='#6366F1', fillcolor='rgba(99, 102, 241, 0.2)'))
+                st.plotly_chart(fig, use_container_width=True)
+            
+            cash_flow_chart(df_finance)
+    else:
+        st.info("No financial data available. Start tracking transactions to see analytics!")
+    
+    st.markdown("---")
+    
+    # Inventory Analytics Section
+    st.subheader("📦 Inventory Insights")
+    
+    if inventory_stats:
+        # Inventory Metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Total Inventory Value", f"${inventory_stats['total_value']:,.2f}")
+        
+        with col2:
+            st.metric("Total Units", f"{inventory_stats['total_units']:,}")
+        
+        with col3:
+            st.metric("Low Stock Items", inventory_stats['low_stock_count'])
+        
+        with col4:
+            st.metric("Avg Product Value", f"${inventory_stats['avg_value']:,.2f}")
+        
+        st.markdown("---")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Inventory by Category
+            category_names = [row[0] for row in category_value]
+            category_totals = [row[1] for row in category_value]
+            
+            fig = charts.bar('analytics.inventory_by_category', x=category_names, y=category_totals,
+                             title='Inventory Value by Category',
+                             labels={'x': 'Category', 'y': 'Total Value ($)'},
+                             color=category_totals,
+                             color_continuous_scale='Blues', layout=dict(showlegend=False))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            # Stock Health Status
+            fig = charts.pie('analytics.stock_health', values=list(stock_status.values()), names=list(stock_status.keys()),
+                             title='Stock Health Status',
+                             color=list(stock_status.keys()),
+                             color_discrete_map={'Healthy': '#10B981', 'Low': '#EF4444'}, traces=charts.PIE_TRACES)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Inventory & Materials Value Over Time (from daily snapshots)
+        if len(valuation_history) > 1:
+            df_valuation = pd.DataFrame({
+                'Date': [v.snapshot_date for v in valuation_history],
+                'Inventory': [v.inventory_value for v in valuation_history],
+                'Materials': [v.materials_value for v in valuation_history]
+            })
+            fig = charts.line('analytics.valuation_history', df_valuation, x='Date', y=['Inventory', 'Materials'],
+                              title='Inventory & Materials Value Over Time',
+                              labels={'value': 'Value ($)', 'variable': ''},
+                              color_discrete_map={'Inventory': '#3B82F6', 'Materials': '#F59E0B'},
+                              markers=True)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.caption("📅 Inventory value over time will appear here once daily snapshots have been collected for more than one day.")
+    else:
+        st.info("No inventory data available. Start adding products to see analytics!")
+    
+    st.markdown("---")
+    
+    # Materials Analytics Section
+    st.subheader("🔧 Materials Cost Analysis")
+    
+    if materials_stats:
+        # Materials Metrics
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Total Materials Value", f"${materials_stats['total_value']:,.2f}")
+        
+        with col2:
+            st.metric("Reorder Needed", materials_stats['reorder_count'])
+        
+        with col3:
+            st.metric("Avg Material Cost", f"${materials_stats['avg_value']:,.2f}")
+        
+        st.markdown("---")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Top Materials by Cost
+            df_top_materials = pd.DataFrame(top_materials, columns=['Material Name', 'Total Cost'])
+            
+            fig = charts.bar('analytics.top_materials', df_top_materials, x='Material Name', y='Total Cost',
+                             title='Top 10 Materials by Total Cost',
+                             color='Total Cost',
+                             color_continuous_scale='Oranges', layout=dict(showlegend=False, xaxis_tickangle=-45))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            # Materials Status
+            fig = charts.pie('analytics.material_status', values=list(material_status.values()), names=list(material_status.keys()),
+                             title='Materials Reorder Status',
+                             color=list(material_status.keys()),
+                             color_discrete_map={'Sufficient': '#10B981', 'Need Reorder': '#F59E0B'}, traces=charts.PIE_TRACES)
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No materials data available. Start tracking materials to see analytics!")
+    
+    st.markdown("---")
+    
+    # Labor Analytics Section
+    st.subheader("👷 Labor Cost Analysis")
+    
+    if not labor_rows.empty:
+        # Get hourly rate from settings
+        db = get_db()
+        try:
+            hourly_rate_setting = db.query(Settings).filter(Settings.setting_key == 'hourly_rate').first()
+            hourly_rate = float(hourly_rate_setting.setting_value) if hourly_rate_setting else 0.0
+        finally:
+            db.close()
+        
+        if hourly_rate > 0:
+            df_labor = pd.DataFrame({
+                'Date': pd.to_datetime(labor_rows['work_date']),
+                'Worker': labor_rows['worker'],
+                'Product ID': labor_rows['product_id'],
+                'Hours': labor_rows['hours'],
+                'Labor Cost': labor_rows['hours'] * hourly_rate,
+                'Notes': labor_rows['notes']
+            })
+            
+            # Add product names
+            df_labor['Product Name'] = df_labor['Product ID'].map(product_names)
+            
+            # Labor Metrics
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                total_labor_cost = df_labor['Labor Cost'].sum()
+                st.metric("Total Labor Cost", f"${total_labor_cost:,.2f}")
+            
+            with col2:
+                total_hours = df_labor['Hours'].sum()
+                st.metric("Total Hours Logged", f"{total_hours:,.1f}")
+            
+            with col3:
+                st.metric("Hourly Rate", f"${hourly_rate:.2f}/hr")
+            
+            with col4:
+                unique_products = df_labor['Product ID'].nunique()
+                st.metric("Products Worked On", unique_products)
+            
+            st.markdown("---")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Labor Distribution by Worker
+                worker_data = df_labor.groupby('Worker')['Labor Cost'].sum().sort_values(ascending=False)
+                
+                fig = charts.pie('analytics.labor_by_worker', values=worker_data.values, names=worker_data.index,
+                                 title='Labor Cost Distribution by Worker',
+                                 color_discrete_sequence=['#3B82F6', '#8B5CF6', '#6366F1'], traces=charts.PIE_TRACES)
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                # Top Products by Labor Cost
+                product_labor = df_labor.groupby('Product Name')['Labor Cost'].sum().sort_values(ascending=False).head(10)
+                
+                fig = charts.bar('analytics.labor_by_product', x=product_labor.index, y=product_labor.values,
+                                 title='Top 10 Products by Labor Cost',
+                                 labels={'x': 'Product', 'y': 'Labor Cost ($)'},
+                                 color=product_labor.values,
+                                 color_continuous_scale='Purples', layout=dict(showlegend=False, xaxis_tickangle=-45))
+                st.plotly_chart(fig, use_container_width=True)
+            
+            # Monthly Labor Trend
+            st.markdown("---")
+            monthly_labor = df_labor.groupby(df_labor['Date'].dt.to_period('M'))['Labor Cost'].sum().reset_index()
+            monthly_labor['Date'] = monthly_labor['Date'].astype(str)
+            
+            fig = charts.line('analytics.monthly_labor', monthly_labor, x='Date', y='Labor Cost',
+                              title='Monthly Labor Cost Trend',
+                              markers=True, traces=dict(line_color='#8B5CF6', marker=dict(size=8)))
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No hourly rate configured. Set the hourly rate in the Labor page to see analytics!")
+    else:
+        st.info("No labor data available. Start logging work hours to see analytics!")
+
+    # Ad-hoc SQL over the extract, run by DuckDB in this process (never touches the live database
+    # or any other file; see extract.query)
+    if use_extract and extract.duckdb is not None:
+        st.markdown("---")
+        with st.expander("🦆 Ad-hoc Query", expanded=False):
+            st.caption(f"Tables: {', '.join(extract.TABLES)}. Money columns are integer cents (`*_cents`); every table has a `month` column.")
+            sql = st.text_area("SQL", key="extract_sql",
+                               value="SELECT category, SUM(amount_cents) / 100.0 AS total\nFROM finance\nWHERE type = 'Expense'\nGROUP BY category\nORDER BY total DESC")
+            if st.button("Run Query", key="run_extract_sql"):
+                try:
+                    st.dataframe(extract.query(sql), use_container_width=True, hide_index=True)
+                except Exception as e:
+                    st.error(f"Query failed: {e}")
@@ -0,0 +1,122 @@
+import streamlit as st
+from sqlalchemy import func
+from database import get_db, Inventory, Material, Finance, Idea
+import money
+import charts
+import forecasting
+from cashflow import finance_frame
+
+def render():
+    """Dashboard page."""
+    st.title("🏠 Dashboard Overview")
+    st.markdown("Welcome to your business management system!")
+    
+    # Get data from database
+    db = get_db()
+    try:
+        total_products = db.query(Inventory).count()
+        low_stock_count = db.query(Inventory).filter(Inventory.stock_level <= Inventory.min_stock).count()
+        total_materials = db.query(Material).count()
+        total_transactions = db.query(Finance).count()
+        
+        income = db.query(func.sum(Finance.amount)).filter(Finance.type == 'Income').scalar() or 0
+        expenses = db.query(func.sum(Finance.amount)).filter(Finance.type == 'Expense').scalar() or 0
+        balance = income - expenses
+        
+        total_ideas = db.query(Idea).count()
+        active_ideas = db.query(Idea).filter(Idea.status == 'In Progress').count()
+    finally:
+        db.close()
+    
+    # Metrics row
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Products", total_products, f"{low_stock_count} low stock" if low_stock_count > 0 else "All good")
+    
+    with col2:
+        st.metric("Materials Tracked", total_materials)
+    
+    with col3:
+        st.metric("Balance", f"${balance:,.2f}", f"{total_transactions} transactions")
+    
+    with col4:
+        st.metric("Active Ideas", active_ideas, f"{total_ideas} total")
+    
+    # Quick insights
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Financial Overview")
+        db = get_db()
+        try:
+            df_finance = finance_frame(db)
+        finally:
+            db.close()
+        
+        if not df_finance.empty:
+            # Amounts are integer cents: sum exactly, convert to dollars for the chart
+            monthly_summary = df_finance.groupby([df_finance['Date'].dt.to_period('M'), 'Type'])['Amount'].sum().reset_index()
+            monthly_summary['Date'] = monthly_summary['Date'].astype(str)
+            monthly_summary['Amount'] = money.from_cents(monthly_summary['Amount'])
+            
+            fig = charts.bar('dashboard.monthly_income_expenses', monthly_summary, x='Date', y='Amount', color='Type',
+                             color_discrete_map={'Income': '#10B981', 'Expense': '#EF4444'},
+                             title="Monthly Income vs Expenses")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No financial data yet. Start tracking in the Finance section!")
+    
+    with col2:
+        st.subheader("⚠️ Low Stock Alerts & Reorder Suggestions")
+        # Reorder points and quantities come from forecast demand and lead times (forecasting.py)
+        db = get_db()
+        try:
+            product_reorders = forecasting.product_reorders(db)
+            material_reorders = forecasting.material_reorders(db)
+        finally:
+            db.close()
+        
+        if not product_reorders.empty or not material_reorders.empty:
+            if not product_reorders.empty:
+                st.markdown("**📦 Inventory Items:**")
+                st.dataframe(
+                    product_reorders[['product_name', 'sku', 'stock_level', 'daily_demand', 'days_of_cover', 'reorder_point', 'reorder_quantity']],
+                    column_config={
+                        'product_name': 'Product',
+                        'sku': 'SKU',
+                        'stock_level': 'Stock',
+                        'daily_demand': st.column_config.NumberColumn("Sold / Day", format="%.2f"),
+                        'days_of_cover': st.column_config.NumberColumn("Days Left", format="%.0f"),
+                        'reorder_point': st.column_config.NumberColumn("Reorder At", format="%d"),
+                        'reorder_quantity': st.column_config.NumberColumn("📈 Suggest", format="%d units"),
+                    },
+                    use_container_width=True,
+                    hide_index=True
+                )
+            
+            if not material_reorders.empty:
+                st.markdown("**🔧 Materials:**")
+                st.dataframe(
+                    material_reorders[['material_name', 'unit', 'quantity', 'daily_demand', 'days_of_cover', 'reorder_point', 'reorder_quantity']],
+                    column_config={
+                        'material_name': 'Material',
+                        'unit': 'Unit',
+                        'quantity': st.column_config.NumberColumn("Current", format="%.1f"),
+                        'daily_demand': st.column_config.NumberColumn("Used / Day", format="%.2f"),
+                        'days_of_cover': st.column_config.NumberColumn("Days Left", format="%.0f"),
+                        'reorder_point': st.column_config.NumberColumn("Reorder At", format="%.1f"),
+                        'reorder_quantity': st.column_config.NumberColumn("📈 Suggest", format="%.1f"),
+                    },
+                    use_container_width=True,
+                    hide_index=True
+                )
+            st.caption(f"Demand is smoothed over the last {forecasting.HISTORY_DAYS} days; reorder points cover "
+                       f"{forecasting.PRODUCT_LEAD_TIME_DAYS:g} days (products) or {forecasting.MATERIAL_LEAD_TIME_DAYS:g} days "
+                       f"(materials) of lead time plus safety stock, never below the minimum you set.")
+        elif total_products > 0:
+            st.success("All inventory & material levels are healthy! ✅")
+        else:
+            st.info("No inventory items yet. Start tracking in the Inventory section!")
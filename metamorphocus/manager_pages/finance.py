@@ -0,0 +1,161 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime, date
+from database import get_db, Finance
+import money
+import charts
+from cashflow import finance_frame
+
+def render():
+    """Finance page."""
+    st.title("💰 Finance Tracking")
+    
+    tab1, tab2, tab3 = st.tabs(["📊 Overview", "📋 Transactions", "➕ Add Transaction"])
+    
+    with tab1:
+        st.subheader("Financial Overview")
+        
+        db = get_db()
+        try:
+            df_finance = finance_frame(db)
+        finally:
+            db.close()
+        
+        if not df_finance.empty:
+            # Amounts are integer cents: aggregate exactly, convert to dollars for display
+            # Summary metrics
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                total_income = money.from_cents(df_finance[df_finance['Type'] == 'Income']['Amount'].sum())
+                st.metric("Total Income", f"${total_income:,.2f}", delta="", delta_color="normal")
+            
+            with col2:
+                total_expenses = money.from_cents(df_finance[df_finance['Type'] == 'Expense']['Amount'].sum())
+                st.metric("Total Expenses", f"${total_expenses:,.2f}", delta="", delta_color="normal")
+            
+            with col3:
+                net_balance = total_income - total_expenses
+                st.metric("Net Balance", f"${net_balance:,.2f}", delta="", delta_color="normal")
+            
+            # Charts
+            st.markdown("---")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Income vs Expense by category
+                category_summary = df_finance.groupby(['Type', 'Category'])['Amount'].sum().reset_index()
+                category_summary['Amount'] = money.from_cents(category_summary['Amount'])
+                fig = charts.pie('finance.by_category', category_summary, values='Amount', names='Category',
+                                 title='Expenses & Income by Category',
+                                 color_discrete_sequence=px.colors.qualitative.Set3)
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                # Monthly trend
+                monthly = df_finance.groupby([df_finance['Date'].dt.to_period('M'), 'Type'])['Amount'].sum().reset_index()
+                monthly['Date'] = monthly['Date'].astype(str)
+                monthly['Amount'] = money.from_cents(monthly['Amount'])
+                fig = charts.line('finance.monthly_trend', monthly, x='Date', y='Amount', color='Type',
+                                  title='Monthly Financial Trend',
+                                  color_discrete_map={'Income': '#10B981', 'Expense': '#EF4444'})
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No financial transactions yet. Add your first transaction in the 'Add Transaction' tab!")
+    
+    with tab2:
+        st.subheader("Transaction History")
+        
+        db = get_db()
+        try:
+            transactions = db.query(Finance).order_by(Finance.date.desc()).all()
+        finally:
+            db.close()
+        
+        if transactions:
+            # Convert to DataFrame for export
+            df_transactions = pd.DataFrame([{
+                'ID': t.id,
+                'Date': t.date,
+                'Type': t.type,
+                'Category': t.category,
+                'Description': t.description,
+                'Amount': t.amount,
+                'Payment Method': t.payment_method
+            } for t in transactions])
+            
+            # Export button
+            csv = df_transactions.to_csv(index=False).encode('utf-8')
+            st.download_button(
+                label="📥 Export Transactions CSV",
+                data=csv,
+                file_name=f"finance_export_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+            st.markdown("---")
+            
+            for trans in transactions:
+                with st.container():
+                    col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 1, 1])
+                    with col1:
+                        st.markdown(f"**{trans.description}**")
+                        st.caption(f"{trans.date} | {trans.category}")
+                    with col2:
+                        type_badge = 'success-badge' if trans.type == 'Income' else 'danger-badge'
+                        st.markdown(f"<span class='{type_badge}'>{trans.type}</span>", unsafe_allow_html=True)
+                    with col3:
+                        amount_color = '#10B981' if trans.type == 'Income' else '#EF4444'
+                        st.markdown(f"<span style='color:{amount_color};font-weight:600;'>${trans.amount:,.2f}</span>", unsafe_allow_html=True)
+                    with col4:
+                        st.write(trans.payment_method)
+                    with col5:
+                        if st.button("🗑️", key=f"del_fin_{trans.id}"):
+                            db = get_db()
+                            try:
+                                fin_to_delete = db.query(Finance).filter(Finance.id == trans.id).first()
+                                if fin_to_delete:
+                                    db.delete(fin_to_delete)
+                                    db.commit()
+                            finally:
+                                db.close()
+                            st.rerun()
+                    st.markdown("---")
+        else:
+            st.info("No transactions recorded yet.")
+    
+    with tab3:
+        st.subheader("Add New Transaction")
+        
+        with st.form("add_transaction_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                trans_date = st.date_input("Date*", value=date.today())
+                trans_type = st.selectbox("Type*", ["Income", "Expense"])
+                category = st.text_input("Category*", placeholder="e.g., Sales, Rent, Supplies")
+            with col2:
+                description = st.text_input("Description*")
+                amount = st.number_input("Amount ($)*", min_value=0.0, value=0.0, step=0.01)
+                payment_method = st.selectbox("Payment Method*", ["Cash", "Credit Card", "Debit Card", "Bank Transfer", "Check"])
+            
+            submitted = st.form_submit_button("➕ Add Transaction", use_container_width=True)
+            
+            if submitted:
+                if description and category and amount > 0:
+                    db = get_db()
+                    try:
+                        new_transaction = Finance(
+                            date=trans_date,
+                            type=trans_type,
+                            category=category,
+                            description=description,
+                            amount=amount,
+                            payment_method=payment_method
+                        )
+                        db.add(new_transaction)
+                        db.commit()
+                        st.success(f"✅ Transaction added successfully!")
+                    finally:
+                        db.close()
+                    st.rerun()
+                else:
+                    st.error("Please fill in all required fields (*) and ensure amount is greater than 0")
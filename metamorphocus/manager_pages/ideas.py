@@ -0,0 +1,216 @@
+import streamlit as st
+from datetime import date
+from database import get_db, Idea
+from manager_pages.widgets import lazy_tabs, tab_is_open, page_fragment
+
+def render():
+    """Ideas page."""
+    st.title("💡 Idea Board")
+    
+    tab1, tab2 = lazy_tabs(["📋 View Ideas", "➕ Add Idea"], key="idea_tabs")
+    
+    @page_fragment("Ideas")
+    def idea_list():
+        st.subheader("Collaborative Ideas & Projects")
+        
+        # Filter by status
+        status_filter = st.selectbox("Filter by Status", ["All", "Brainstorming", "In Progress", "Completed", "On Hold"])
+        
+        db = get_db()
+        try:
+            if status_filter == "All":
+                ideas = db.query(Idea).all()
+            else:
+                ideas = db.query(Idea).filter(Idea.status == status_filter).all()
+        finally:
+            db.close()
+        
+        if ideas:
+            # Display ideas
+            for idea in ideas:
+                with st.container():
+                    col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 0.5, 0.5])
+                    with col1:
+                        st.markdown(f"**{idea.title}**")
+                        st.caption(idea.description)
+                        # Show attachment if exists
+                        if idea.attachment_filename:
+                            st.download_button(
+                                label=f"📎 {idea.attachment_filename}",
+                                data=idea.attachment_data,
+                                file_name=idea.attachment_filename,
+                                mime="application/octet-stream",
+                                key=f"download_{idea.id}"
+                            )
+                    with col2:
+                        # Status badge
+                        status_colors = {
+                            'Brainstorming': 'warning-badge',
+                            'In Progress': 'success-badge',
+                            'Completed': 'success-badge',
+                            'On Hold': 'danger-badge'
+                        }
+                        badge_class = status_colors.get(idea.status, 'warning-badge')
+                        st.markdown(f"<span class='{badge_class}'>{idea.status}</span>", unsafe_allow_html=True)
+                    with col3:
+                        priority_colors = {'High': '#EF4444', 'Medium': '#F59E0B', 'Low': '#10B981'}
+                        priority_color = priority_colors.get(idea.priority, '#6B7280')
+                        st.markdown(f"<span style='color:{priority_color};font-weight:600;'>● {idea.priority}</span>", unsafe_allow_html=True)
+                    with col4:
+                        if st.button("✏️", key=f"edit_idea_{idea.id}"):
+                            if 'editing_idea_id' in st.session_state and st.session_state.editing_idea_id == idea.id:
+                                del st.session_state.editing_idea_id
+                            else:
+                                st.session_state.editing_idea_id = idea.id
+                            st.rerun(scope="fragment")
+                    with col5:
+                        if st.button("🗑️", key=f"del_idea_{idea.id}"):
+                            db = get_db()
+                            try:
+                                idea_to_delete = db.query(Idea).filter(Idea.id == idea.id).first()
+                                if idea_to_delete:
+                                    db.delete(idea_to_delete)
+                                    db.commit()
+                            finally:
+                                db.close()
+                            st.rerun(scope="fragment")
+                    
+                    st.caption(f"👤 {idea.assigned_to} | 📅 {idea.created_date}")
+                    
+                    # Show edit form if this idea is being edited
+                    if 'editing_idea_id' in st.session_state and st.session_state.editing_idea_id == idea.id:
+                        with st.expander("✏️ Edit Idea", expanded=True):
+                            with st.form(f"edit_idea_form_{idea.id}"):
+                                edit_title = st.text_input("Title*", value=idea.title)
+                                edit_description = st.text_area("Description*", value=idea.description, height=100)
+                                
+                                col1, col2, col3 = st.columns(3)
+                                with col1:
+                                    status_options = ["Brainstorming", "In Progress", "Completed", "On Hold"]
+                                    edit_status = st.selectbox("Status*", status_options, index=status_options.index(idea.status))
+                                with col2:
+                                    priority_options = ["High", "Medium", "Low"]
+                                    edit_priority = st.selectbox("Priority*", priority_options, index=priority_options.index(idea.priority))
+                                with col3:
+                                    assigned_options = ["Emily", "Sage", "Both"]
+                                    edit_assigned_to = st.selectbox("Assigned To*", assigned_options, index=assigned_options.index(idea.assigned_to))
+                                
+                                # Attachment handling
+                                st.markdown("**📎 File Attachment**")
+                                if idea.attachment_filename:
+                                    st.info(f"Current attachment: {idea.attachment_filename}")
+                                    remove_attachment = st.checkbox("Remove current attachment", key=f"remove_att_{idea.id}")
+                                else:
+                                    remove_attachment = False
+                                
+                                new_uploaded_file = st.file_uploader(
+                                    "Upload new file (replaces current attachment if any)",
+                                    type=['pdf', 'png', 'jpg', 'jpeg', 'doc', 'docx', 'xls', 'xlsx', 'txt', 'csv'],
+                                    key=f"new_file_{idea.id}",
+                                    label_visibility="collapsed"
+                                )
+                                
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    save_edit = st.form_submit_button("💾 Save Changes", use_container_width=True)
+                                with col2:
+                                    cancel_edit = st.form_submit_button("❌ Cancel", use_container_width=True)
+                                
+                                if save_edit:
+                                    if edit_title and edit_description:
+                                        db = get_db()
+                                        try:
+                                            idea_to_update = db.query(Idea).filter(Idea.id == idea.id).first()
+                                            if idea_to_update:
+                                                idea_to_update.title = edit_title
+                                                idea_to_update.description = edit_description
+                                                idea_to_update.status = edit_status
+                                                idea_to_update.priority = edit_priority
+                                                idea_to_update.assigned_to = edit_assigned_to
+                                                
+                                                # Handle attachment updates
+                                                if new_uploaded_file is not None:
+                                                    # Replace with new file
+                                                    idea_to_update.attachment_filename = new_uploaded_file.name
+                                                    idea_to_update.attachment_data = new_uploaded_file.read()
+                                                elif remove_attachment:
+                                                    # Remove attachment
+                                                    idea_to_update.attachment_filename = None
+                                                    idea_to_update.attachment_data = None
+                                                # else: keep existing attachment
+                                                
+                                                db.commit()
+                                                st.success("✅ Idea updated successfully!")
+                                                del st.session_state.editing_idea_id
+                                        finally:
+                                            db.close()
+                                        st.rerun(scope="fragment")
+                                    else:
+                                        st.error("Please fill in all required fields (*)")
+                                
+                                if cancel_edit:
+                                    del st.session_state.editing_idea_id
+                                    st.rerun(scope="fragment")
+                    
+                    st.markdown("---")
+        else:
+            st.info("No ideas yet. Start brainstorming in the 'Add Idea' tab!")
+    
+    with tab1:
+        if tab_is_open(tab1):
+            idea_list()
+    
+    with tab2:
+        st.subheader("Add New Idea")
+        
+        with st.form("add_idea_form"):
+            title = st.text_input("Title*")
+            description = st.text_area("Description*", height=100)
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                status = st.selectbox("Status*", ["Brainstorming", "In Progress", "Completed", "On Hold"])
+            with col2:
+                priority = st.selectbox("Priority*", ["High", "Medium", "Low"])
+            with col3:
+                assigned_to = st.selectbox("Assigned To*", ["Emily", "Sage", "Both"])
+            
+            # File attachment
+            st.markdown("**📎 Attach File (Optional)**")
+            uploaded_file = st.file_uploader(
+                "Upload supporting documents, images, or files",
+                type=['pdf', 'png', 'jpg', 'jpeg', 'doc', 'docx', 'xls', 'xlsx', 'txt', 'csv'],
+                label_visibility="collapsed"
+            )
+            
+            submitted = st.form_submit_button("➕ Add Idea", use_container_width=True)
+            
+            if submitted:
+                if title and description:
+                    db = get_db()
+                    try:
+                        # Prepare attachment data if file was uploaded
+                        attachment_filename = None
+                        attachment_data = None
+                        if uploaded_file is not None:
+                            attachment_filename = uploaded_file.name
+                            attachment_data = uploaded_file.read()
+                        
+                        new_idea = Idea(
+                            title=title,
+                            description=description,
+                            status=status,
+                            priority=priority,
+                            assigned_to=assigned_to,
+                            created_date=date.today(),
+                            attachment_filename=attachment_filename,
+                            attachment_data=attachment_data
+                        )
+                        db.add(new_idea)
+                        db.commit()
+                        st.success(f"✅ Idea '{title}' added successfully!")
+                    finally:
+                        db.close()
+                    st.rerun()
+                else:
+                    st.error("Please fill in all required fields (*)")
@@ -0,0 +1,416 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
+from database import get_db, Inventory, Material, BillOfMaterials
+import valuation
+import bulk_edit
+import asset_store
+import stock_ledger
+import stock_shards
+from manager_pages.widgets import lazy_tabs, tab_is_open, page_fragment
+
+def render():
+    """Inventory page."""
+    st.title("📦 Inventory Management")
+    
+    tab1, tab2, tab3, tab4 = lazy_tabs(["📋 View Inventory", "➕ Add Product", "✏️ Edit Product", "🔧 Bill of Materials"], key="inventory_tabs")
+    
+    # Grid column -> Inventory attribute, for the editable columns
+    INVENTORY_GRID_COLUMNS = {
+        'Product Name': 'product_name',
+        'SKU': 'sku',
+        'Category': 'category',
+        'Stock Level': 'stock_level',
+        'Min Stock': 'min_stock',
+        'Unit Price': 'unit_price'
+    }
+    
+    @page_fragment("Inventory list")
+    def inventory_list():
+        st.subheader("Current Inventory")
+        
+        db = get_db()
+        try:
+            # Exact stock (less shard sales not yet rebalanced), which saving checks edits against
+            inventory_items = db.query(Inventory).options(undefer(Inventory.current_stock)).all()
+        finally:
+            db.close()
+        
+        if inventory_items:
+            # Convert to DataFrame for filtering
+            df_inventory = pd.DataFrame([{
+                'id': i.id,
+                'Product Name': i.product_name,
+                'SKU': i.sku,
+                'Category': i.category,
+                'Stock Level': i.current_stock,
+                'Min Stock': i.min_stock,
+                'Unit Price': i.unit_price
+            } for i in inventory_items])
+            
+            # Search and filter row
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                search = st.text_input("🔍 Search products", placeholder="Search by name or SKU...")
+            with col2:
+                categories = df_inventory['Category'].unique().tolist()
+                category_filter = st.selectbox("Filter by Category", ["All"] + categories)
+            with col3:
+                # Export button
+                export_df = df_inventory.drop('id', axis=1)
+                csv = export_df.to_csv(index=False).encode('utf-8')
+                st.download_button(
+                    label="📥 Export CSV",
+                    data=csv,
+                    file_name=f"inventory_export_{datetime.now().strftime('%Y%m%d')}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+            
+            # Filter data
+            filtered_df = df_inventory.copy()
+            if search:
+                filtered_df = filtered_df[
+                    filtered_df['Product Name'].str.contains(search, case=False, na=False) |
+                    filtered_df['SKU'].str.contains(search, case=False, na=False)
+                ]
+            if category_filter != "All":
+                filtered_df = filtered_df[filtered_df['Category'] == category_filter]
+            
+            # Material and labor cost per unit for every product, aggregated in SQL
+            db = get_db()
+            try:
+                unit_costs = valuation.product_unit_costs(db)
+            finally:
+                db.close()
+            
+            # Filtering leaves gaps in the index, which the editor would carry into added rows;
+            # saving matches rows on the id column instead
+            grid = filtered_df.reset_index(drop=True)
+            grid['Material Cost'] = grid['id'].map(lambda product_id: unit_costs.get(product_id, (0.0, 0.0))[0])
+            grid['Labor Cost'] = grid['id'].map(lambda product_id: unit_costs.get(product_id, (0.0, 0.0))[1])
+            grid['Profit'] = grid['Unit Price'] - grid['Material Cost'] - grid['Labor Cost']
+            grid['Margin %'] = (grid['Profit'] / grid['Unit Price'].where(grid['Unit Price'] > 0) * 100).fillna(0)
+            
+            # Edits are kept in the grid until saved; saving writes only the changed rows in one transaction
+            st.caption("Edit cells directly, add rows at the bottom, or select rows and press Delete, then save. Deleting a product also deletes its BOM, production and labor records.")
+            edited_grid = st.data_editor(
+                grid,
+                key=f"inventory_grid_{st.session_state.get('inventory_grid_version', 0)}",
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                disabled=['id', 'Material Cost', 'Labor Cost', 'Profit', 'Margin %'],
+                column_config={
+                    'id': None,
+                    'Stock Level': st.column_config.NumberColumn(min_value=0, step=1, format="%d"),
+                    'Min Stock': st.column_config.NumberColumn(min_value=0, step=1, format="%d"),
+                    'Unit Price': st.column_config.NumberColumn(min_value=0.0, format="$%.2f"),
+                    'Material Cost': st.column_config.NumberColumn(format="$%.2f"),
+                    'Labor Cost': st.column_config.NumberColumn(format="$%.2f"),
+                    'Profit': st.column_config.NumberColumn(format="$%.2f"),
+                    'Margin %': st.column_config.NumberColumn(format="%.1f%%"),
+                }
+            )
+            
+            changes = bulk_edit.diff_frames(
+                grid.rename(columns=INVENTORY_GRID_COLUMNS),
+                edited_grid.rename(columns=INVENTORY_GRID_COLUMNS),
+                list(INVENTORY_GRID_COLUMNS.values())
+            )
+            if changes:
+                errors = bulk_edit.validate(changes, ['product_name', 'sku', 'category', 'unit_price'])
+                for error in errors:
+                    st.error(error)
+                if st.button(f"💾 Save changes ({changes.summary()})", disabled=bool(errors), key="save_inventory_grid"):
+                    saved = False
+                    db = get_db()
+                    try:
+                        bulk_edit.apply_changes(db, Inventory, changes)
+                        saved = True
+                    except IntegrityError:
+                        st.error("❌ Could not save: each product needs a unique SKU.")
+                    except bulk_edit.StockChanged as e:
+                        names = grid.set_index('id').loc[e.item_ids, 'Product Name']
+                        st.error(f"❌ Nothing was saved: stock of {', '.join(names)} changed since the grid was loaded. Check the new levels and save again.")
+                    except Exception as e:
+                        st.error(f"❌ Error saving changes: {str(e)}")
+                    finally:
+                        db.close()
+                    if saved:
+                        # A new editor key discards the saved edits
+                        st.session_state.inventory_grid_version = st.session_state.get('inventory_grid_version', 0) + 1
+                        st.rerun()
+        else:
+            st.info("No products in inventory yet. Add your first product in the 'Add Product' tab!")
+    
+    with tab1:
+        if tab_is_open(tab1):
+            inventory_list()
+    
+    with tab2:
+        st.subheader("Add New Product")
+        
+        with st.form("add_product_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                product_name = st.text_input("Product Name*")
+                sku = st.text_input("SKU*")
+                category = st.text_input("Category*")
+                description = st.text_area("Description", placeholder="Describe the product features, materials, size, etc.")
+            with col2:
+                stock_level = st.number_input("Stock Level*", min_value=0, value=0)
+                min_stock = st.number_input("Minimum Stock Level*", min_value=0, value=10)
+                unit_price = st.number_input("Unit Price ($)*", min_value=0.0, value=0.0, step=0.01)
+                uploaded_file = st.file_uploader("Product Image", type=['png', 'jpg', 'jpeg', 'webp'], help="Upload a product image (PNG, JPG, or WEBP)")
+            
+            submitted = st.form_submit_button("➕ Add Product", use_container_width=True)
+            
+            if submitted:
+                if product_name and sku and category:
+                    # Handle image upload
+                    image_url = None
+                    if uploaded_file is not None:
+                        # Name the image after the SKU and save it to the asset store
+                        file_extension = uploaded_file.name.split('.')[-1]
+                        filename = f"{sku.replace(' ', '_')}.{file_extension}"
+                        image_url = asset_store.store.put(filename, uploaded_file.getvalue(), uploaded_file.type)
+                    
+                    db = get_db()
+                    try:
+                        new_product = Inventory(
+                            product_name=product_name,
+                            sku=sku,
+                            category=category,
+                            stock_level=stock_level,
+                            min_stock=min_stock,
+                            unit_price=unit_price,
+                            image_url=image_url,
+                            description=description,
+                            last_updated=datetime.utcnow()
+                        )
+                        db.add(new_product)
+                        db.flush()
+                        stock_ledger.record(db, stock_ledger.PRODUCT, new_product.id, stock_level, stock_level, 'adjustment')
+                        db.commit()
+                        st.success(f"✅ {product_name} added successfully!")
+                    finally:
+                        db.close()
+                    st.rerun()
+                else:
+                    st.error("Please fill in all required fields (*)")
+    
+    with tab3:
+        st.subheader("Edit Existing Product")
+        
+        db = get_db()
+        try:
+            all_products = db.query(Inventory).all()
+        finally:
+            db.close()
+        
+        if not all_products:
+            st.info("No products available to edit. Add products in the 'Add Product' tab first.")
+        else:
+            # Select product to edit
+            product_options = {f"{p.product_name} (SKU: {p.sku})": p.id for p in all_products}
+            selected_product_label = st.selectbox("Select Product to Edit", list(product_options.keys()))
+            selected_product_id = product_options[selected_product_label]
+            
+            # Get selected product
+            db = get_db()
+            try:
+                product = db.query(Inventory).filter(Inventory.id == selected_product_id).first()
+            finally:
+                db.close()
+            
+            if product:
+                # Show current image if exists
+                image_key = asset_store.store.key_for_url(product.image_url)
+                if image_key and asset_store.store.get(image_key):
+                    st.image(asset_store.store.read(image_key), caption="Current Product Image", width=200)
+                elif product.image_url and image_key is None:
+                    st.image(product.image_url, caption="Current Product Image", width=200)
+                
+                with st.form("edit_product_form"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        edit_product_name = st.text_input("Product Name*", value=product.product_name)
+                        edit_sku = st.text_input("SKU*", value=product.sku)
+                        edit_category = st.text_input("Category*", value=product.category)
+                        edit_description = st.text_area("Description", value=product.description or "", placeholder="Describe the product features, materials, size, etc.")
+                    with col2:
+                        edit_stock_level = st.number_input("Stock Level*", min_value=0, value=product.stock_level)
+                        edit_min_stock = st.number_input("Minimum Stock Level*", min_value=0, value=product.min_stock)
+                        edit_unit_price = st.number_input("Unit Price ($)*", min_value=0.0, value=float(product.unit_price), step=0.01)
+                        edit_uploaded_file = st.file_uploader("Update Product Image", type=['png', 'jpg', 'jpeg', 'webp'], help="Upload a new product image (PNG, JPG, or WEBP)")
+                        if product.image_url:
+                            remove_image = st.checkbox("Remove current image")
+                        else:
+                            remove_image = False
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        update_submitted = st.form_submit_button("💾 Update Product", use_container_width=True)
+                    with col2:
+                        cancel_edit = st.form_submit_button("❌ Cancel", use_container_width=True)
+                    
+                    if update_submitted:
+                        if edit_product_name and edit_sku and edit_category:
+                            # Handle image upload/removal
+                            new_image_url = product.image_url
+                            
+                            if remove_image:
+                                new_image_url = None
+                                # Delete old image if it is in the asset store
+                                if product.image_url:
+                                    asset_store.store.delete_url(product.image_url)
+                            
+                            if edit_uploaded_file is not None:
+                                # Name the image after the SKU and save it to the asset store
+                                file_extension = edit_uploaded_file.name.split('.')[-1]
+                                filename = f"{edit_sku.replace(' ', '_')}.{file_extension}"
+                                new_image_url = asset_store.store.put(filename, edit_uploaded_file.getvalue(), edit_uploaded_file.type)
+                                
+                                # Delete old image if it was stored under another name (SKU or format changed)
+                                if product.image_url and product.image_url != new_image_url:
+                                    asset_store.store.delete_url(product.image_url)
+                            
+                            db = get_db()
+                            try:
+                                # Reload in this session (the product shown above is detached), with
+                                # any sales through its stock shards taken off first
+                                stock_shards.rebalance(db, [product.id])
+                                product = db.get(Inventory, product.id)
+                                stock_ledger.record(db, stock_ledger.PRODUCT, product.id, edit_stock_level - product.stock_level, edit_stock_level, 'adjustment')
+                                product.product_name = edit_product_name
+                                product.sku = edit_sku
+                                product.category = edit_category
+                                product.stock_level = edit_stock_level
+                                product.min_stock = edit_min_stock
+                                product.unit_price = edit_unit_price
+                                product.image_url = new_image_url
+                                product.description = edit_description
+                                product.last_updated = datetime.utcnow()
+                                stock_shards.rebalance(db, [product.id])
+                                db.commit()
+                                st.success(f"✅ {edit_product_name} updated successfully!")
+                            finally:
+                                db.close()
+                            st.rerun()
+                        else:
+                            st.error("Please fill in all required fields (*)")
+    
+    with tab4:
+        st.subheader("🔧 Bill of Materials - Product Recipes")
+        st.caption("Define which materials are needed to make each product")
+        
+        db = get_db()
+        try:
+            products = db.query(Inventory).all()
+            materials = db.query(Material).all()
+        finally:
+            db.close()
+        
+        if not products:
+            st.info("Please add products in the 'Add Product' tab first before creating bills of materials.")
+        elif not materials:
+            st.info("Please add materials in the Materials section first before creating bills of materials.")
+        else:
+            # Select product to manage BOM
+            product_options = {f"{p.product_name} (SKU: {p.sku})": p.id for p in products}
+            selected_product_label = st.selectbox("Select Product", list(product_options.keys()))
+            selected_product_id = product_options[selected_product_label]
+            
+            # Get current BOM for selected product
+            db = get_db()
+            try:
+                current_bom = db.query(BillOfMaterials).filter(BillOfMaterials.product_id == selected_product_id).all()
+                selected_product = db.query(Inventory).filter(Inventory.id == selected_product_id).first()
+            finally:
+                db.close()
+            
+            # Display current BOM
+            if current_bom:
+                st.markdown("**Current Materials for this Product:**")
+                total_material_cost = 0
+                for bom_item in current_bom:
+                    db = get_db()
+                    try:
+                        material = db.query(Material).filter(Material.id == bom_item.material_id).first()
+                    finally:
+                        db.close()
+                    
+                    if material:
+                        item_cost = material.cost_per_unit * bom_item.quantity_needed
+                        total_material_cost += item_cost
+                        
+                        col1, col2, col3, col4 = st.columns([3, 1, 1, 0.5])
+                        with col1:
+                            st.write(f"**{material.material_name}**")
+                        with col2:
+                            st.write(f"{bom_item.quantity_needed} {material.unit}")
+                        with col3:
+                            st.write(f"${item_cost:.2f}")
+                        with col4:
+                            if st.button("🗑️", key=f"del_bom_{bom_item.id}"):
+                                db = get_db()
+                                try:
+                                    bom_to_delete = db.query(BillOfMaterials).filter(BillOfMaterials.id == bom_item.id).first()
+                                    if bom_to_delete:
+                                        db.delete(bom_to_delete)
+                                        db.commit()
+                                finally:
+                                    db.close()
+                                st.rerun()
+                
+                st.markdown(f"**Total Material Cost per Unit:** ${total_material_cost:.2f}")
+                if selected_product:
+                    profit = selected_product.unit_price - total_material_cost
+                    margin = (profit / selected_product.unit_price * 100) if selected_product.unit_price > 0 else 0
+                    st.markdown(f"**Profit per Unit:** ${profit:.2f} ({margin:.1f}% margin)")
+                st.markdown("---")
+            else:
+                st.info("No materials defined for this product yet. Add materials below.")
+            
+            # Add new material to BOM
+            st.markdown("**Add Material to Product:**")
+            with st.form(f"add_bom_form_{selected_product_id}"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    material_options = {f"{m.material_name} (${m.cost_per_unit:.2f}/{m.unit})": m.id for m in materials}
+                    selected_material_label = st.selectbox("Material*", list(material_options.keys()))
+                    selected_material_id = material_options[selected_material_label]
+                with col2:
+                    # Get material unit for display
+                    selected_material = next((m for m in materials if m.id == selected_material_id), None)
+                    unit_label = selected_material.unit if selected_material else "units"
+                    quantity_needed = st.number_input(f"Quantity Needed ({unit_label})*", min_value=0.01, value=1.0, step=0.1)
+                
+                submitted = st.form_submit_button("➕ Add to BOM", use_container_width=True)
+                
+                if submitted:
+                    # Check if material already exists in BOM
+                    db = get_db()
+                    try:
+                        existing = db.query(BillOfMaterials).filter(
+                            BillOfMaterials.product_id == selected_product_id,
+                            BillOfMaterials.material_id == selected_material_id
+                        ).first()
+                        
+                        if existing:
+                            st.error("This material is already in the BOM. Delete it first if you want to change the quantity.")
+                        else:
+                            new_bom = BillOfMaterials(
+                                product_id=selected_product_id,
+                                material_id=selected_material_id,
+                                quantity_needed=quantity_needed
+                            )
+                            db.add(new_bom)
+                            db.commit()
+                            st.success("✅ Material added to BOM!")
+                    finally:
+                        db.close()
+                    st.rerun()
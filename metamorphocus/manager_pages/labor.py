@@ -0,0 +1,210 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, date
+from database import get_db, Inventory, Labor, Settings
+
+def render():
+    """Labor page."""
+    st.title("👷 Labor Tracking")
+    st.markdown("Track hours worked and calculate labor costs per product.")
+    
+    tab1, tab2, tab3 = st.tabs(["📝 Log Hours", "📊 Labor History", "⚙️ Settings"])
+    
+    with tab1:
+        st.subheader("Log Work Hours")
+        
+        # Get hourly rate
+        db = get_db()
+        try:
+            hourly_rate_setting = db.query(Settings).filter(Settings.setting_key == 'hourly_rate').first()
+            if hourly_rate_setting:
+                current_hourly_rate = float(hourly_rate_setting.setting_value)
+            else:
+                current_hourly_rate = 0.0
+        finally:
+            db.close()
+        
+        if current_hourly_rate == 0:
+            st.warning("⚠️ Please set your hourly rate in the Settings tab before logging hours.")
+        
+        st.info(f"💵 Current hourly rate: **${current_hourly_rate:.2f}/hour**")
+        
+        with st.form("log_labor_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                work_date = st.date_input("Date*", value=date.today())
+                worker = st.selectbox("Worker*", ["Emily", "Sage", "Both"])
+            with col2:
+                hours = st.number_input("Hours Worked*", min_value=0.0, value=0.0, step=0.25)
+                
+                # Get products for selection
+                db = get_db()
+                try:
+                    products = db.query(Inventory).all()
+                    product_options = {f"{p.product_name} ({p.sku})": p.id for p in products}
+                finally:
+                    db.close()
+                
+                if product_options:
+                    selected_product = st.selectbox("Product*", list(product_options.keys()))
+                else:
+                    st.warning("No products available. Please add products first.")
+                    selected_product = None
+            
+            notes = st.text_area("Notes (Optional)", placeholder="e.g., Made 20 candles, Applied labels, Packaging")
+            
+            submitted = st.form_submit_button("➕ Log Hours", use_container_width=True)
+            
+            if submitted:
+                if selected_product and hours > 0:
+                    product_id = product_options[selected_product]
+                    labor_cost = hours * current_hourly_rate
+                    
+                    db = get_db()
+                    try:
+                        new_labor = Labor(
+                            product_id=product_id,
+                            worker=worker,
+                            hours=hours,
+                            work_date=work_date,
+                            notes=notes
+                        )
+                        db.add(new_labor)
+                        db.commit()
+                        st.success(f"✅ Logged {hours} hours for {selected_product.split(' (')[0]}! Labor cost: ${labor_cost:.2f}")
+                    finally:
+                        db.close()
+                    st.rerun()
+                else:
+                    st.error("Please select a product and enter hours greater than 0")
+    
+    with tab2:
+        st.subheader("Labor History")
+        
+        # Filter options
+        col1, col2 = st.columns(2)
+        with col1:
+            worker_filter = st.selectbox("Filter by Worker", ["All", "Emily", "Sage", "Both"])
+        with col2:
+            # Get products for filter
+            db = get_db()
+            try:
+                products = db.query(Inventory).all()
+                product_filter_options = ["All"] + [f"{p.product_name} ({p.sku})" for p in products]
+                product_filter = st.selectbox("Filter by Product", product_filter_options)
+            finally:
+                db.close()
+        
+        # Get labor records
+        db = get_db()
+        try:
+            query = db.query(Labor)
+            if worker_filter != "All":
+                query = query.filter(Labor.worker == worker_filter)
+            
+            labor_records = query.all()
+        finally:
+            db.close()
+        
+        if labor_records:
+            # Get current hourly rate
+            db = get_db()
+            try:
+                hourly_rate_setting = db.query(Settings).filter(Settings.setting_key == 'hourly_rate').first()
+                hourly_rate = float(hourly_rate_setting.setting_value) if hourly_rate_setting else 0.0
+            finally:
+                db.close()
+            
+            # Build dataframe
+            labor_data = []
+            for labor in labor_records:
+                db = get_db()
+                try:
+                    product = db.query(Inventory).filter(Inventory.id == labor.product_id).first()
+                    product_name = f"{product.product_name} ({product.sku})" if product else "Unknown"
+                finally:
+                    db.close()
+                
+                # Apply product filter if needed
+                if product_filter != "All" and product_name != product_filter:
+                    continue
+                
+                labor_cost = labor.hours * hourly_rate
+                labor_data.append({
+                    'Date': labor.work_date,
+                    'Product': product_name,
+                    'Worker': labor.worker,
+                    'Hours': labor.hours,
+                    'Cost': labor_cost,
+                    'Notes': labor.notes or '-'
+                })
+            
+            if labor_data:
+                df_labor = pd.DataFrame(labor_data)
+                
+                # Summary metrics
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total Hours", f"{df_labor['Hours'].sum():.2f}")
+                with col2:
+                    st.metric("Total Labor Cost", f"${df_labor['Cost'].sum():.2f}")
+                with col3:
+                    st.metric("Entries", len(df_labor))
+                
+                st.markdown("---")
+                
+                # Display table
+                st.dataframe(df_labor, use_container_width=True, hide_index=True)
+                
+                # Export option
+                csv = df_labor.to_csv(index=False).encode('utf-8')
+                st.download_button(
+                    "📥 Download Labor History CSV",
+                    csv,
+                    f"labor_history_{datetime.now().strftime('%Y%m%d')}.csv",
+                    "text/csv",
+                    use_container_width=True
+                )
+            else:
+                st.info("No labor records match the selected filters.")
+        else:
+            st.info("No labor hours logged yet. Start tracking in the 'Log Hours' tab!")
+    
+    with tab3:
+        st.subheader("⚙️ Labor Settings")
+        
+        # Get current hourly rate
+        db = get_db()
+        try:
+            hourly_rate_setting = db.query(Settings).filter(Settings.setting_key == 'hourly_rate').first()
+            current_rate = float(hourly_rate_setting.setting_value) if hourly_rate_setting else 0.0
+        finally:
+            db.close()
+        
+        st.markdown(f"**Current Hourly Rate:** ${current_rate:.2f}/hour")
+        
+        with st.form("hourly_rate_form"):
+            new_rate = st.number_input("Set Hourly Rate ($)*", min_value=0.0, value=current_rate, step=0.50)
+            st.caption("This rate will be used to calculate labor costs across all products.")
+            
+            submitted = st.form_submit_button("💾 Save Hourly Rate", use_container_width=True)
+            
+            if submitted:
+                db = get_db()
+                try:
+                    # Check if setting exists
+                    existing_setting = db.query(Settings).filter(Settings.setting_key == 'hourly_rate').first()
+                    if existing_setting:
+                        existing_setting.setting_value = str(new_rate)
+                        existing_setting.updated_at = datetime.now()
+                    else:
+                        new_setting = Settings(
+                            setting_key='hourly_rate',
+                            setting_value=str(new_rate)
+                        )
+                        db.add(new_setting)
+                    db.commit()
+                    st.success(f"✅ Hourly rate updated to ${new_rate:.2f}/hour")
+                finally:
+                    db.close()
+                st.rerun()
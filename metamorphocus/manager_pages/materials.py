@@ -0,0 +1,154 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from database import get_db, Material
+import bulk_edit
+import stock_ledger
+from manager_pages.widgets import lazy_tabs, tab_is_open, page_fragment
+
+def render():
+    """Materials page."""
+    st.title("🔧 Material Tracking")
+    
+    tab1, tab2 = lazy_tabs(["📋 View Materials", "➕ Add Material"], key="materials_tabs")
+    
+    MATERIAL_UNITS = ["kg", "lbs", "pcs", "meters", "liters", "gallons", "boxes"]
+    # Grid column -> Material attribute, for the editable columns
+    MATERIAL_GRID_COLUMNS = {
+        'Material Name': 'material_name',
+        'Category': 'category',
+        'Quantity': 'quantity',
+        'Unit': 'unit',
+        'Supplier': 'supplier',
+        'Reorder Point': 'reorder_point',
+        'Cost per Unit': 'cost_per_unit'
+    }
+    
+    @page_fragment("Materials grid")
+    def materials_grid():
+        st.subheader("Raw Materials & Supplies")
+        
+        db = get_db()
+        try:
+            materials = db.query(Material).all()
+        finally:
+            db.close()
+        
+        if materials:
+            # Convert to DataFrame for export
+            df_materials = pd.DataFrame([{
+                'ID': m.id,
+                'Material Name': m.material_name,
+                'Category': m.category,
+                'Quantity': m.quantity,
+                'Unit': m.unit,
+                'Supplier': m.supplier,
+                'Reorder Point': m.reorder_point,
+                'Cost per Unit': m.cost_per_unit
+            } for m in materials])
+            
+            # Export button
+            csv = df_materials.to_csv(index=False).encode('utf-8')
+            st.download_button(
+                label="📥 Export Materials CSV",
+                data=csv,
+                file_name=f"materials_export_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+            
+            # Edits are kept in the grid until saved; saving writes only the changed rows in one transaction
+            grid = df_materials.rename(columns={'ID': 'id'})
+            grid['Status'] = (grid['Quantity'] <= grid['Reorder Point']).map({True: '⚠️ Reorder', False: '✅ OK'})
+            units = sorted(set(MATERIAL_UNITS) | set(grid['Unit'].dropna()))
+            
+            st.caption("Edit cells directly, add rows at the bottom, or select rows and press Delete, then save.")
+            edited_grid = st.data_editor(
+                grid,
+                key=f"materials_grid_{st.session_state.get('materials_grid_version', 0)}",
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                disabled=['id', 'Status'],
+                column_config={
+                    'id': None,
+                    'Unit': st.column_config.SelectboxColumn(options=units),
+                    'Quantity': st.column_config.NumberColumn(min_value=0.0, step=0.1),
+                    'Reorder Point': st.column_config.NumberColumn(min_value=0.0, step=0.1),
+                    'Cost per Unit': st.column_config.NumberColumn(min_value=0.0, format="$%.2f"),
+                }
+            )
+            
+            changes = bulk_edit.diff_frames(
+                grid.rename(columns=MATERIAL_GRID_COLUMNS),
+                edited_grid.rename(columns=MATERIAL_GRID_COLUMNS),
+                list(MATERIAL_GRID_COLUMNS.values())
+            )
+            if changes:
+                errors = bulk_edit.validate(changes, ['material_name', 'category', 'unit', 'supplier', 'cost_per_unit'])
+                for error in errors:
+                    st.error(error)
+                if st.button(f"💾 Save changes ({changes.summary()})", disabled=bool(errors), key="save_materials_grid"):
+                    saved = False
+                    db = get_db()
+                    try:
+                        bulk_edit.apply_changes(db, Material, changes)
+                        saved = True
+                    except bulk_edit.StockChanged as e:
+                        names = grid.set_index('id').loc[e.item_ids, 'Material Name']
+                        st.error(f"❌ Nothing was saved: quantity of {', '.join(names)} changed since the grid was loaded. Check the new quantities and save again.")
+                    except Exception as e:
+                        st.error(f"❌ Error saving changes: {str(e)}")
+                    finally:
+                        db.close()
+                    if saved:
+                        # A new editor key discards the saved edits
+                        st.session_state.materials_grid_version = st.session_state.get('materials_grid_version', 0) + 1
+                        st.rerun()
+        else:
+            st.info("No materials tracked yet. Add your first material in the 'Add Material' tab!")
+    
+    with tab1:
+        if tab_is_open(tab1):
+            materials_grid()
+    
+    with tab2:
+        st.subheader("Add New Material")
+        
+        with st.form("add_material_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                material_name = st.text_input("Material Name*")
+                category = st.text_input("Category*")
+                supplier = st.text_input("Supplier*")
+                unit = st.selectbox("Unit*", MATERIAL_UNITS)
+            with col2:
+                quantity = st.number_input("Current Quantity*", min_value=0.0, value=0.0, step=0.1)
+                reorder_point = st.number_input("Reorder Point*", min_value=0.0, value=10.0, step=0.1)
+                cost_per_unit = st.number_input("Cost per Unit ($)*", min_value=0.0, value=0.0, step=0.01)
+            
+            submitted = st.form_submit_button("➕ Add Material", use_container_width=True)
+            
+            if submitted:
+                if material_name and category and supplier:
+                    db = get_db()
+                    try:
+                        new_material = Material(
+                            material_name=material_name,
+                            category=category,
+                            quantity=quantity,
+                            unit=unit,
+                            supplier=supplier,
+                            reorder_point=reorder_point,
+                            cost_per_unit=cost_per_unit,
+                            last_updated=datetime.utcnow()
+                        )
+                        db.add(new_material)
+                        db.flush()
+                        stock_ledger.record(db, stock_ledger.MATERIAL, new_material.id, quantity, quantity, 'adjustment')
+                        db.commit()
+                        st.success(f"✅ {material_name} added successfully!")
+                    finally:
+                        db.close()
+                    st.rerun()
+                else:
+                    st.error("Please fill in all required fields (*)")
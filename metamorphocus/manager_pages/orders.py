@@ -0,0 +1,283 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from database import get_db, Order, OrderItem
+import charts
+import fulfillment
+from fulfillment import ORDER_STATUSES
+from manager_pages.widgets import lazy_tabs, tab_is_open, page_fragment
+
+def render():
+    """Orders page."""
+    st.title("🛒 Customer Orders")
+    
+    tab1, tab2 = lazy_tabs(["📋 All Orders", "📊 Order Stats"], key="order_tabs")
+    
+    # Each order is its own fragment: picking a status only reruns that order's card
+    @page_fragment("Order card")
+    def order_card(order, order_items):
+        with st.expander(f"Order #{order.id} - {order.customer_name} - ${order.total_amount:.2f}", expanded=False):
+            col1, col2, col3 = st.columns([2, 2, 1])
+            
+            with col1:
+                st.markdown(f"**Customer:** {order.customer_name}")
+                st.markdown(f"**Email:** {order.customer_email}")
+                if order.customer_phone:
+                    st.markdown(f"**Phone:** {order.customer_phone}")
+                st.markdown(f"**Order Date:** {order.created_at.strftime('%Y-%m-%d %H:%M')}")
+            
+            with col2:
+                st.markdown(f"**Total Amount:** ${order.total_amount:.2f}")
+                st.markdown(f"**Status:** {order.status.upper()}")
+                if order.notes:
+                    st.markdown(f"**Notes:** {order.notes}")
+            
+            with col3:
+                # Status update (cancelled orders have been restocked and stay cancelled)
+                is_cancelled = order.status == 'cancelled'
+                new_status = st.selectbox(
+                    "Update Status",
+                    ORDER_STATUSES,
+                    index=ORDER_STATUSES.index(order.status),
+                    key=f"status_{order.id}",
+                    disabled=is_cancelled
+                )
+                
+                if st.button("Update", key=f"update_{order.id}", disabled=is_cancelled):
+                    db = get_db()
+                    try:
+                        fulfillment.transition_orders(db, [order.id], new_status)
+                    finally:
+                        db.close()
+                    st.success(f"✅ Status updated to {new_status}")
+                    st.rerun()
+            
+            st.markdown("---")
+            st.markdown("**Order Items:**")
+            
+            # Display order items
+            items_df = pd.DataFrame([{
+                'Product': item.product_name,
+                'Quantity': item.quantity,
+                'Price': f"${item.price:.2f}",
+                'Subtotal': f"${item.price * item.quantity:.2f}"
+            } for item in order_items])
+            
+            st.dataframe(items_df, use_container_width=True, hide_index=True)
+
+    # Moves the checked orders (or every order matching the filter) in one UPDATE
+    @page_fragment("Batch fulfillment")
+    def batch_fulfillment(orders):
+        with st.expander("📦 Batch Fulfillment", expanded=False):
+            select_all = st.checkbox(f"Select all {len(orders)} orders matching the filter", key="batch_select_all")
+
+            selection_df = pd.DataFrame([{
+                'Select': select_all,
+                'Order #': o.id,
+                'Date': o.created_at.strftime('%Y-%m-%d %H:%M'),
+                'Customer': o.customer_name,
+                'Total': o.total_amount,
+                'Status': o.status
+            } for o in orders])
+
+            # Toggling "select all" or applying a batch starts a fresh selection
+            version = st.session_state.get('batch_version', 0)
+            edited = st.data_editor(
+                selection_df,
+                key=f"batch_orders_{select_all}_{version}",
+                disabled=['Order #', 'Date', 'Customer', 'Total', 'Status'],
+                column_config={'Total': st.column_config.NumberColumn(format="$%.2f")},
+                use_container_width=True,
+                hide_index=True
+            )
+            selected_ids = [int(order_id) for order_id in edited.loc[edited['Select'], 'Order #']]
+
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                target_status = st.selectbox("Move selected orders to", ORDER_STATUSES, key="batch_target_status")
+            with col2:
+                st.write("")
+                apply = st.button(f"Apply to {len(selected_ids)} orders", key="apply_batch", disabled=not selected_ids)
+
+            if target_status == 'cancelled':
+                st.warning("⚠️ Cancelling returns the ordered quantities to stock. Cancelled orders can't be reopened.")
+
+            if apply:
+                db = get_db()
+                try:
+                    changed = fulfillment.transition_orders(db, selected_ids, target_status)
+                finally:
+                    db.close()
+                st.session_state['batch_version'] = version + 1
+                skipped = len(selected_ids) - len(changed)
+                message = f"✅ Moved {len(changed)} orders to {target_status}"
+                if skipped:
+                    message += f" ({skipped} already {target_status} or cancelled)"
+                st.toast(message)
+                st.rerun()
+
+    with tab1:
+        st.subheader("Recent Orders")
+        
+        # Filter options
+        col1, col2 = st.columns(2)
+        with col1:
+            status_filter = st.selectbox("Filter by Status", ["All"] + ORDER_STATUSES)
+        with col2:
+            sort_by = st.selectbox("Sort by", ["Newest First", "Oldest First", "Highest Value", "Lowest Value"])
+        
+        if tab_is_open(tab1):
+            db = get_db()
+            try:
+                # Get orders with filters
+                query = db.query(Order)
+                if status_filter != "All":
+                    query = query.filter(Order.status == status_filter)
+                
+                # Apply sorting
+                if sort_by == "Newest First":
+                    query = query.order_by(Order.created_at.desc())
+                elif sort_by == "Oldest First":
+                    query = query.order_by(Order.created_at.asc())
+                elif sort_by == "Highest Value":
+                    query = query.order_by(Order.total_amount.desc())
+                else:
+                    query = query.order_by(Order.total_amount.asc())
+                
+                orders = query.all()
+                
+                # Load the items for every listed order in one query
+                items_by_order = {}
+                if orders:
+                    for item in db.query(OrderItem).filter(OrderItem.order_id.in_([o.id for o in orders])).order_by(OrderItem.id):
+                        items_by_order.setdefault(item.order_id, []).append(item)
+            finally:
+                db.close()
+            
+            if orders:
+                batch_fulfillment(orders)
+                
+                for order in orders:
+                    order_card(order, items_by_order.get(order.id, []))
+                
+                # Export button
+                st.markdown("---")
+                export_df = pd.DataFrame([{
+                    'Order ID': o.id,
+                    'Date': o.created_at.strftime('%Y-%m-%d %H:%M'),
+                    'Customer Name': o.customer_name,
+                    'Customer Email': o.customer_email,
+                    'Total Amount': o.total_amount,
+                    'Status': o.status
+                } for o in orders])
+                
+                csv = export_df.to_csv(index=False).encode('utf-8')
+                st.download_button(
+                    label="📥 Export Orders CSV",
+                    data=csv,
+                    file_name=f"orders_export_{datetime.now().strftime('%Y%m%d')}.csv",
+                    mime="text/csv",
+                )
+            else:
+                st.info("No orders found matching your filters.")
+    
+    def order_stats():
+        st.subheader("Order Statistics")
+        
+        db = get_db()
+        try:
+            all_orders = db.query(Order).all()
+            
+            if all_orders:
+                # Key Metrics
+                col1, col2, col3, col4 = st.columns(4)
+                
+                total_orders = len(all_orders)
+                total_revenue = sum(o.total_amount for o in all_orders)
+                avg_order = total_revenue / total_orders if total_orders > 0 else 0
+                pending_orders = len([o for o in all_orders if o.status == 'pending'])
+                
+                with col1:
+                    st.metric("Total Orders", f"{total_orders:,}")
+                
+                with col2:
+                    st.metric("Total Revenue", f"${total_revenue:,.2f}")
+                
+                with col3:
+                    st.metric("Avg Order Value", f"${avg_order:.2f}")
+                
+                with col4:
+                    st.metric("Pending Orders", pending_orders)
+                
+                st.markdown("---")
+                
+                # Charts
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Orders by Status
+                    status_counts = {}
+                    for order in all_orders:
+                        status_counts[order.status] = status_counts.get(order.status, 0) + 1
+                    
+                    fig = charts.pie(
+                        'orders.by_status',
+                        values=list(status_counts.values()),
+                        names=list(status_counts.keys()),
+                        title='Orders by Status',
+                        color_discrete_sequence=['#6366F1', '#10B981', '#F59E0B', '#EF4444']
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                with col2:
+                    # Top Products Sold
+                    order_items = db.query(OrderItem).all()
+                    product_sales = {}
+                    for item in order_items:
+                        product_sales[item.product_name] = product_sales.get(item.product_name, 0) + item.quantity
+                    
+                    if product_sales:
+                        sorted_products = sorted(product_sales.items(), key=lambda x: x[1], reverse=True)[:10]
+                        
+                        fig = charts.bar(
+                            'orders.top_products',
+                            x=[p[1] for p in sorted_products],
+                            y=[p[0] for p in sorted_products],
+                            orientation='h',
+                            title='Top 10 Products Sold',
+                            labels={'x': 'Quantity', 'y': 'Product'},
+                            color=[p[1] for p in sorted_products],
+                            color_continuous_scale='Blues',
+                            layout=dict(showlegend=False)
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.info("No order items data available yet.")
+                
+                # Revenue over time
+                st.markdown("---")
+                df_orders = pd.DataFrame([{
+                    'Date': o.created_at.date(),
+                    'Amount': o.total_amount
+                } for o in all_orders])
+                
+                daily_revenue = df_orders.groupby('Date')['Amount'].sum().reset_index()
+                
+                fig = charts.line(
+                    'orders.daily_revenue',
+                    daily_revenue,
+                    x='Date',
+                    y='Amount',
+                    title='Daily Revenue',
+                    markers=True,
+                    traces=dict(line_color='#6366F1', marker=dict(size=8))
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No orders yet. Orders will appear here when customers make purchases.")
+        finally:
+            db.close()
+    
+    with tab2:
+        if tab_is_open(tab2):
+            order_stats()
@@ -0,0 +1,283 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, date
+from sqlalchemy import func
+from database import get_db, Inventory, Material, BillOfMaterials, ProductionOrder
+import production_history
+import stock_ledger
+import stock_shards
+import charts
+from manager_pages.widgets import lazy_tabs, tab_is_open, page_fragment
+
+def render():
+    """Production page."""
+    st.title("🏭 Production Management")
+    # A full rerun may follow a new production order; page turns only rerun the history
+    # fragment and keep its monthly summary
+    st.session_state.pop('production_history_summary', None)
+    
+    tab1, tab2 = lazy_tabs(["📋 Production History", "➕ New Production Order"], key="production_tabs")
+    
+    @page_fragment("Production history")
+    def production_history_list():
+        st.subheader("Production History")
+        
+        db = get_db()
+        try:
+            history_products = db.query(Inventory.id, Inventory.product_name, Inventory.sku).order_by(Inventory.product_name).all()
+            producers = [row[0] for row in db.query(ProductionOrder.produced_by).filter(ProductionOrder.produced_by.isnot(None)).distinct().order_by(ProductionOrder.produced_by).all()]
+            first_production_date = db.query(func.min(ProductionOrder.production_date)).scalar()
+        finally:
+            db.close()
+        
+        if first_production_date is None:
+            st.info("No production orders yet. Create your first production order in the 'New Production Order' tab!")
+        else:
+            # Filters are applied in SQL; pagination restarts whenever they change
+            col1, col2, col3 = st.columns([2, 2, 1])
+            with col1:
+                history_range = st.date_input("Date Range", value=(first_production_date, date.today()), key="production_history_range")
+            with col2:
+                history_product_options = {"All Products": None}
+                history_product_options.update({f"{name} (SKU: {sku})": product_id for product_id, name, sku in history_products})
+                history_product_label = st.selectbox("Product", list(history_product_options.keys()), key="production_history_product")
+            with col3:
+                history_producer = st.selectbox("Produced By", ["All"] + producers, key="production_history_producer")
+            
+            if isinstance(history_range, (tuple, list)) and len(history_range) == 2:
+                history_start, history_end = history_range
+            else:
+                # Only the first date has been picked so far
+                history_start = history_range[0] if isinstance(history_range, (tuple, list)) and history_range else history_range
+                history_end = None
+            history_product_id = history_product_options[history_product_label]
+            history_producer_value = None if history_producer == "All" else history_producer
+            
+            filter_state = (history_start, history_end, history_product_id, history_producer_value)
+            if st.session_state.get('production_history_filters') != filter_state:
+                st.session_state.production_history_filters = filter_state
+                # Cursors of the pages visited so far; the last one is the page being shown
+                st.session_state.production_history_cursors = [None]
+                st.session_state.pop('production_history_summary', None)
+            
+            conditions = production_history.history_filters(
+                start_date=history_start,
+                end_date=history_end,
+                product_id=history_product_id,
+                producer=history_producer_value
+            )
+            cursors = st.session_state.production_history_cursors
+            
+            db = get_db()
+            try:
+                history_rows, next_cursor = production_history.fetch_page(db, conditions, cursor=cursors[-1])
+                # The summary covers every page, so it is aggregated once per filter change
+                if 'production_history_summary' not in st.session_state:
+                    st.session_state.production_history_summary = production_history.monthly_summary(db, conditions)
+                history_summary = st.session_state.production_history_summary
+            finally:
+                db.close()
+            
+            if history_summary:
+                summary_df = pd.DataFrame([{
+                    'Month': f"{int(row.year)}-{int(row.month):02d}",
+                    'Produced By': row.produced_by or "Unknown",
+                    'Runs': row.runs,
+                    'Units': int(row.units or 0),
+                    'Material Cost': float(row.material_cost or 0)
+                } for row in history_summary])
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Production Runs", f"{summary_df['Runs'].sum():,}")
+                with col2:
+                    st.metric("Units Produced", f"{summary_df['Units'].sum():,}")
+                with col3:
+                    st.metric("Material Cost", f"${summary_df['Material Cost'].sum():,.2f}")
+                
+                with st.expander("📊 Monthly Summary by Producer"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        fig = charts.bar('production.monthly_units', summary_df, x='Month', y='Units', color='Produced By', title="Units Produced by Month")
+                        st.plotly_chart(fig, use_container_width=True)
+                    with col2:
+                        fig = charts.bar('production.monthly_material_cost', summary_df, x='Month', y='Material Cost', color='Produced By', title="Material Cost by Month")
+                        st.plotly_chart(fig, use_container_width=True)
+                    st.dataframe(summary_df, use_container_width=True, hide_index=True)
+            
+            if history_rows:
+                st.caption(f"Page {len(cursors)}")
+                for order in history_rows:
+                    with st.container():
+                        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+                        with col1:
+                            st.markdown(f"**{order.product_name}**")
+                            st.caption(f"SKU: {order.sku}")
+                            if order.notes:
+                                st.caption(f"Notes: {order.notes}")
+                        with col2:
+                            st.write(f"Qty: {order.quantity_produced}")
+                            st.caption(f"By: {order.produced_by}")
+                        with col3:
+                            st.write(f"${order.material_cost:.2f}")
+                            st.caption("Material Cost")
+                        with col4:
+                            st.write(f"{order.production_date}")
+                            st.caption("Production Date")
+                        st.markdown("---")
+                
+                col1, col2, col3 = st.columns([1, 4, 1])
+                with col1:
+                    if st.button("← Newer", disabled=len(cursors) == 1, key="production_history_prev"):
+                        cursors.pop()
+                        st.rerun(scope="fragment")
+                with col3:
+                    if st.button("Older →", disabled=next_cursor is None, key="production_history_next"):
+                        cursors.append(next_cursor)
+                        st.rerun(scope="fragment")
+            else:
+                st.info("No production orders match these filters.")
+    
+    with tab1:
+        if tab_is_open(tab1):
+            production_history_list()
+    
+    with tab2:
+        st.subheader("Create New Production Order")
+        
+        db = get_db()
+        try:
+            products = db.query(Inventory).all()
+        finally:
+            db.close()
+        
+        if not products:
+            st.info("Please add products in the Inventory section first before creating production orders.")
+        else:
+            # Select product
+            product_options = {f"{p.product_name} (SKU: {p.sku})": p.id for p in products}
+            selected_product_label = st.selectbox("Select Product to Produce*", list(product_options.keys()))
+            selected_product_id = product_options[selected_product_label]
+            
+            # Get BOM for selected product
+            db = get_db()
+            try:
+                bom_items = db.query(BillOfMaterials).filter(BillOfMaterials.product_id == selected_product_id).all()
+                selected_product = db.query(Inventory).filter(Inventory.id == selected_product_id).first()
+            finally:
+                db.close()
+            
+            if not bom_items:
+                st.warning("⚠️ This product has no Bill of Materials defined. Please define the materials needed in the Inventory > Bill of Materials tab first.")
+            else:
+                # Display BOM and check material availability
+                st.markdown("**Materials Required per Unit:**")
+                
+                total_cost_per_unit = 0
+                materials_available = True
+                material_details = []
+                
+                for bom_item in bom_items:
+                    db = get_db()
+                    try:
+                        material = db.query(Material).filter(Material.id == bom_item.material_id).first()
+                    finally:
+                        db.close()
+                    
+                    if material:
+                        cost = material.cost_per_unit * bom_item.quantity_needed
+                        total_cost_per_unit += cost
+                        material_details.append({
+                            'material': material,
+                            'quantity_needed': bom_item.quantity_needed,
+                            'cost': cost
+                        })
+                        
+                        col1, col2, col3 = st.columns([2, 1, 1])
+                        with col1:
+                            st.write(f"**{material.material_name}**")
+                        with col2:
+                            st.write(f"{bom_item.quantity_needed} {material.unit}")
+                        with col3:
+                            st.write(f"${cost:.2f}")
+                
+                st.markdown(f"**Total Material Cost per Unit:** ${total_cost_per_unit:.2f}")
+                st.markdown("---")
+                
+                # Production form
+                with st.form("production_order_form"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        quantity_to_produce = st.number_input("Quantity to Produce*", min_value=1, value=1)
+                        produced_by = st.selectbox("Produced By*", ["Emily", "Sage", "Both"])
+                    with col2:
+                        production_date = st.date_input("Production Date*", value=date.today())
+                        notes = st.text_area("Notes (Optional)", height=50)
+                    
+                    # Calculate total materials needed
+                    st.markdown(f"**Materials Needed for {quantity_to_produce} units:**")
+                    all_materials_sufficient = True
+                    
+                    for detail in material_details:
+                        total_needed = detail['quantity_needed'] * quantity_to_produce
+                        available = detail['material'].quantity
+                        
+                        col1, col2, col3 = st.columns([2, 1, 1])
+                        with col1:
+                            st.write(f"{detail['material'].material_name}")
+                        with col2:
+                            st.write(f"{total_needed} {detail['material'].unit}")
+                        with col3:
+                            if available >= total_needed:
+                                st.markdown(f"<span class='success-badge'>✓ Available ({available} {detail['material'].unit})</span>", unsafe_allow_html=True)
+                            else:
+                                st.markdown(f"<span class='danger-badge'>✗ Insufficient ({available}/{total_needed} {detail['material'].unit})</span>", unsafe_allow_html=True)
+                                all_materials_sufficient = False
+                    
+                    total_material_cost = total_cost_per_unit * quantity_to_produce
+                    st.markdown(f"**Total Production Cost:** ${total_material_cost:.2f}")
+                    
+                    submitted = st.form_submit_button("🏭 Complete Production", use_container_width=True)
+                    
+                    if submitted:
+                        if not all_materials_sufficient:
+                            st.error("❌ Cannot complete production - insufficient materials. Please restock before producing.")
+                        else:
+                            # Execute production
+                            db = get_db()
+                            try:
+                                # Create production order record (its id is the ledger reference)
+                                new_order = ProductionOrder(
+                                    product_id=selected_product_id,
+                                    quantity_produced=quantity_to_produce,
+                                    produced_by=produced_by,
+                                    production_date=production_date,
+                                    material_cost=total_material_cost,
+                                    notes=notes
+                                )
+                                db.add(new_order)
+                                db.flush()
+                                
+                                # Deduct materials
+                                for detail in material_details:
+                                    total_needed = detail['quantity_needed'] * quantity_to_produce
+                                    material = db.query(Material).filter(Material.id == detail['material'].id).first()
+                                    if material:
+                                        material.quantity -= total_needed
+                                        material.last_updated = datetime.utcnow()
+                                        stock_ledger.record(db, stock_ledger.MATERIAL, material.id, -total_needed, material.quantity, 'production', new_order.id)
+                                
+                                # Add finished products to inventory (and to its stock shards, if it has any)
+                                stock_shards.rebalance(db, [selected_product_id])
+                                product = db.query(Inventory).filter(Inventory.id == selected_product_id).first()
+                                if product:
+                                    product.stock_level += quantity_to_produce
+                                    product.last_updated = datetime.utcnow()
+                                    stock_ledger.record(db, stock_ledger.PRODUCT, product.id, quantity_to_produce, product.stock_level, 'production', new_order.id)
+                                    stock_shards.rebalance(db, [product.id])
+                                
+                                db.commit()
+                                st.success(f"✅ Production completed! Added {quantity_to_produce} units of {selected_product.product_name} to inventory.")
+                            finally:
+                                db.close()
+                            st.rerun()
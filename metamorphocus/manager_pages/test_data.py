@@ -0,0 +1,418 @@
+import streamlit as st
+from datetime import datetime, date
+from database import get_db, Inventory, Material, Finance, Idea, BillOfMaterials, ProductionOrder, Labor, Settings, Order, OrderItem, Job, DailySales, IdempotencyKey, ValuationSnapshot, StockMovement, StockCheckpoint, StockShard, StockHold
+
+def render():
+    """Test Data page."""
+    st.title("🧪 Test Data Generator")
+    st.markdown("Quickly populate your database with sample data for testing purposes.")
+    
+    st.warning("⚠️ **Warning:** This will add test data to your database. Use the 'Clear All Data' option to remove everything.")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Current Data Count")
+        db = get_db()
+        try:
+            inventory_count = db.query(Inventory).count()
+            materials_count = db.query(Material).count()
+            finance_count = db.query(Finance).count()
+            ideas_count = db.query(Idea).count()
+            bom_count = db.query(BillOfMaterials).count()
+            production_count = db.query(ProductionOrder).count()
+            labor_count = db.query(Labor).count()
+            
+            # Get hourly rate
+            hourly_rate_setting = db.query(Settings).filter(Settings.setting_key == 'hourly_rate').first()
+            hourly_rate = float(hourly_rate_setting.setting_value) if hourly_rate_setting else 0.0
+        finally:
+            db.close()
+        
+        st.metric("Products", inventory_count)
+        st.metric("Materials", materials_count)
+        st.metric("Finance Transactions", finance_count)
+        st.metric("Ideas", ideas_count)
+        st.metric("BOM Entries", bom_count)
+        st.metric("Production Orders", production_count)
+        st.metric("Labor Entries", labor_count)
+        st.metric("Hourly Rate", f"${hourly_rate:.2f}")
+    
+    with col2:
+        st.subheader("🎲 Generate Test Data")
+        
+        if st.button("➕ Generate Sample Products (5)", use_container_width=True):
+            db = get_db()
+            try:
+                sample_products = [
+                    {"sku": "CANDLE-001", "product_name": "Lavender Soy Candle", "category": "Candles", 
+                     "stock_level": 45, "unit_price": 24.99, "min_stock": 20},
+                    {"sku": "SOAP-001", "product_name": "Eucalyptus Mint Soap", "category": "Soaps", 
+                     "stock_level": 78, "unit_price": 8.99, "min_stock": 30},
+                    {"sku": "BALM-001", "product_name": "Healing Lip Balm", "category": "Skincare", 
+                     "stock_level": 15, "unit_price": 5.99, "min_stock": 25},
+                    {"sku": "DIFFUSER-001", "product_name": "Reed Diffuser Set", "category": "Home Fragrance", 
+                     "stock_level": 32, "unit_price": 34.99, "min_stock": 15},
+                    {"sku": "SCRUB-001", "product_name": "Coffee Body Scrub", "category": "Skincare", 
+                     "stock_level": 22, "unit_price": 18.99, "min_stock": 20}
+                ]
+                
+                for prod in sample_products:
+                    # Check if SKU already exists
+                    existing = db.query(Inventory).filter(Inventory.sku == prod["sku"]).first()
+                    if not existing:
+                        new_product = Inventory(**prod, last_updated=datetime.now())
+                        db.add(new_product)
+                
+                db.commit()
+                st.success("✅ Sample products added!")
+            finally:
+                db.close()
+            st.rerun()
+        
+        if st.button("➕ Generate Sample Materials (8)", use_container_width=True):
+            db = get_db()
+            try:
+                sample_materials = [
+                    {"material_name": "Soy Wax Flakes", "category": "Raw Materials", "quantity": 500, 
+                     "unit": "lbs", "cost_per_unit": 4.50, "supplier": "Wax Supply Co", "reorder_point": 100},
+                    {"material_name": "Lavender Essential Oil", "category": "Fragrance", "quantity": 32, 
+                     "unit": "oz", "cost_per_unit": 12.00, "supplier": "Essential Oils Inc", "reorder_point": 10},
+                    {"material_name": "Glass Jars 8oz", "category": "Packaging", "quantity": 200, 
+                     "unit": "units", "cost_per_unit": 1.25, "supplier": "Container World", "reorder_point": 50},
+                    {"material_name": "Cotton Wicks", "category": "Components", "quantity": 500, 
+                     "unit": "units", "cost_per_unit": 0.15, "supplier": "Candle Supplies", "reorder_point": 100},
+                    {"material_name": "Shea Butter", "category": "Raw Materials", "quantity": 25, 
+                     "unit": "lbs", "cost_per_unit": 8.75, "supplier": "Natural Ingredients", "reorder_point": 10},
+                    {"material_name": "Coconut Oil", "category": "Raw Materials", "quantity": 15, 
+                     "unit": "gallons", "cost_per_unit": 22.50, "supplier": "Bulk Oils", "reorder_point": 5},
+                    {"material_name": "Beeswax", "category": "Raw Materials", "quantity": 8, 
+                     "unit": "lbs", "cost_per_unit": 15.00, "supplier": "Local Apiaries", "reorder_point": 5},
+                    {"material_name": "Labels Custom", "category": "Packaging", "quantity": 300, 
+                     "unit": "units", "cost_per_unit": 0.35, "supplier": "Print Shop", "reorder_point": 75}
+                ]
+                
+                for mat in sample_materials:
+                    # Check if material already exists
+                    existing = db.query(Material).filter(Material.material_name == mat["material_name"]).first()
+                    if not existing:
+                        new_material = Material(**mat, last_updated=datetime.now())
+                        db.add(new_material)
+                
+                db.commit()
+                st.success("✅ Sample materials added!")
+            finally:
+                db.close()
+            st.rerun()
+        
+        if st.button("➕ Generate Finance Transactions (12)", use_container_width=True):
+            db = get_db()
+            try:
+                import random
+                sample_transactions = [
+                    {"date": date(2024, 11, 1), "type": "Income", "category": "Product Sales", 
+                     "amount": 450.00, "payment_method": "Credit Card", "description": "Online order #1234"},
+                    {"date": date(2024, 11, 3), "type": "Expense", "category": "Supplies", 
+                     "amount": 225.00, "payment_method": "Bank Transfer", "description": "Wax supply order"},
+                    {"date": date(2024, 11, 5), "type": "Income", "category": "Product Sales", 
+                     "amount": 680.50, "payment_method": "PayPal", "description": "Market booth sales"},
+                    {"date": date(2024, 11, 8), "type": "Expense", "category": "Marketing", 
+                     "amount": 150.00, "payment_method": "Credit Card", "description": "Social media ads"},
+                    {"date": date(2024, 11, 10), "type": "Income", "category": "Wholesale", 
+                     "amount": 1200.00, "payment_method": "Check", "description": "Bulk order - Gift shop"},
+                    {"date": date(2024, 11, 12), "type": "Expense", "category": "Utilities", 
+                     "amount": 85.00, "payment_method": "Auto-pay", "description": "Electric bill"},
+                    {"date": date(2024, 11, 14), "type": "Income", "category": "Product Sales", 
+                     "amount": 320.75, "payment_method": "Credit Card", "description": "Website orders"},
+                    {"date": date(2024, 11, 15), "type": "Expense", "category": "Supplies", 
+                     "amount": 340.00, "payment_method": "Credit Card", "description": "Essential oils restock"},
+                    {"date": date(2024, 11, 16), "type": "Income", "category": "Custom Orders", 
+                     "amount": 275.00, "payment_method": "Venmo", "description": "Wedding favors"},
+                    {"date": date(2024, 11, 17), "type": "Expense", "category": "Packaging", 
+                     "amount": 120.00, "payment_method": "Credit Card", "description": "Jar and label order"},
+                    {"date": date(2024, 11, 18), "type": "Income", "category": "Product Sales", 
+                     "amount": 580.00, "payment_method": "Cash", "description": "Craft fair sales"},
+                    {"date": date(2024, 11, 18), "type": "Expense", "category": "Business Services", 
+                     "amount": 50.00, "payment_method": "Credit Card", "description": "Accounting software"}
+                ]
+                
+                for trans in sample_transactions:
+                    new_transaction = Finance(**trans)
+                    db.add(new_transaction)
+                
+                db.commit()
+                st.success("✅ Sample finance transactions added!")
+            finally:
+                db.close()
+            st.rerun()
+        
+        if st.button("➕ Generate Sample Ideas (4)", use_container_width=True):
+            db = get_db()
+            try:
+                sample_ideas = [
+                    {"title": "Launch Holiday Gift Sets", "description": "Create themed gift bundles for the holiday season with curated product combinations. Include special packaging and holiday-themed scents.", 
+                     "status": "In Progress", "priority": "High", "assigned_to": "Both", "created_date": date(2024, 11, 1)},
+                    {"title": "Expand to Farmer's Markets", "description": "Research and apply to local farmer's markets for spring/summer season. Create portable booth setup.", 
+                     "status": "Brainstorming", "priority": "Medium", "assigned_to": "Emily", "created_date": date(2024, 11, 5)},
+                    {"title": "Subscription Box Service", "description": "Monthly subscription model with rotating product selections. Need to calculate pricing and logistics.", 
+                     "status": "On Hold", "priority": "Low", "assigned_to": "Sage", "created_date": date(2024, 10, 20)},
+                    {"title": "Instagram Reels Content Strategy", "description": "Develop a content calendar for daily/weekly reels showing behind-the-scenes production, product tips, and customer testimonials.", 
+                     "status": "In Progress", "priority": "High", "assigned_to": "Both", "created_date": date(2024, 11, 10)}
+                ]
+                
+                for idea in sample_ideas:
+                    new_idea = Idea(**idea)
+                    db.add(new_idea)
+                
+                db.commit()
+                st.success("✅ Sample ideas added!")
+            finally:
+                db.close()
+            st.rerun()
+        
+        if st.button("➕ Generate Sample BOMs (3)", use_container_width=True):
+            db = get_db()
+            try:
+                # Get existing products and materials
+                products = db.query(Inventory).all()
+                materials = db.query(Material).all()
+                
+                if not products or not materials:
+                    st.error("⚠️ Please generate products and materials first!")
+                else:
+                    # Create BOMs for first 3 products if they exist
+                    bom_data = []
+                    
+                    # Lavender Soy Candle BOM
+                    if len(products) >= 1:
+                        candle = products[0]
+                        soy_wax = next((m for m in materials if "Soy Wax" in m.material_name), None)
+                        lavender_oil = next((m for m in materials if "Lavender" in m.material_name), None)
+                        jar = next((m for m in materials if "Glass Jar" in m.material_name), None)
+                        wick = next((m for m in materials if "Wick" in m.material_name), None)
+                        
+                        if soy_wax and lavender_oil and jar and wick:
+                            bom_data.extend([
+                                {"product_id": candle.id, "material_id": soy_wax.id, "quantity_needed": 0.5},
+                                {"product_id": candle.id, "material_id": lavender_oil.id, "quantity_needed": 0.3},
+                                {"product_id": candle.id, "material_id": jar.id, "quantity_needed": 1},
+                                {"product_id": candle.id, "material_id": wick.id, "quantity_needed": 1}
+                            ])
+                    
+                    # Soap BOM
+                    if len(products) >= 2:
+                        soap = products[1]
+                        shea = next((m for m in materials if "Shea" in m.material_name), None)
+                        coconut = next((m for m in materials if "Coconut" in m.material_name), None)
+                        
+                        if shea and coconut:
+                            bom_data.extend([
+                                {"product_id": soap.id, "material_id": shea.id, "quantity_needed": 0.25},
+                                {"product_id": soap.id, "material_id": coconut.id, "quantity_needed": 0.1}
+                            ])
+                    
+                    # Lip Balm BOM
+                    if len(products) >= 3:
+                        balm = products[2]
+                        beeswax = next((m for m in materials if "Beeswax" in m.material_name), None)
+                        shea = next((m for m in materials if "Shea" in m.material_name), None)
+                        
+                        if beeswax and shea:
+                            bom_data.extend([
+                                {"product_id": balm.id, "material_id": beeswax.id, "quantity_needed": 0.15},
+                                {"product_id": balm.id, "material_id": shea.id, "quantity_needed": 0.1}
+                            ])
+                    
+                    added_count = 0
+                    for bom in bom_data:
+                        # Check if BOM entry already exists
+                        existing = db.query(BillOfMaterials).filter(
+                            BillOfMaterials.product_id == bom["product_id"],
+                            BillOfMaterials.material_id == bom["material_id"]
+                        ).first()
+                        if not existing:
+                            new_bom = BillOfMaterials(**bom)
+                            db.add(new_bom)
+                            added_count += 1
+                    
+                    db.commit()
+                    if added_count > 0:
+                        st.success(f"✅ {added_count} BOM entries added!")
+                    else:
+                        st.info("ℹ️ All BOMs already exist!")
+            finally:
+                db.close()
+            st.rerun()
+        
+        if st.button("➕ Generate Sample Production Orders (3)", use_container_width=True):
+            db = get_db()
+            try:
+                products = db.query(Inventory).all()
+                
+                if not products:
+                    st.error("⚠️ Please generate products first!")
+                else:
+                    sample_orders = []
+                    
+                    if len(products) >= 1:
+                        sample_orders.append({
+                            "product_id": products[0].id,
+                            "quantity_produced": 20,
+                            "production_date": date(2024, 11, 10),
+                            "produced_by": "Emily",
+                            "material_cost": 95.00,
+                            "notes": "First batch of holiday season candles"
+                        })
+                    
+                    if len(products) >= 2:
+                        sample_orders.append({
+                            "product_id": products[1].id,
+                            "quantity_produced": 30,
+                            "production_date": date(2024, 11, 12),
+                            "produced_by": "Sage",
+                            "material_cost": 42.50,
+                            "notes": "Eucalyptus mint soap batch for market"
+                        })
+                    
+                    if len(products) >= 3:
+                        sample_orders.append({
+                            "product_id": products[2].id,
+                            "quantity_produced": 50,
+                            "production_date": date(2024, 11, 15),
+                            "produced_by": "Both",
+                            "material_cost": 28.75,
+                            "notes": "Lip balm production for wholesale order"
+                        })
+                    
+                    added_count = 0
+                    for order in sample_orders:
+                        new_order = ProductionOrder(**order)
+                        db.add(new_order)
+                        added_count += 1
+                    
+                    db.commit()
+                    if added_count > 0:
+                        st.success(f"✅ {added_count} production orders added!")
+                    else:
+                        st.warning("⚠️ Not enough products to generate production orders!")
+            finally:
+                db.close()
+            st.rerun()
+        
+        if st.button("💵 Set Hourly Rate ($15/hour)", use_container_width=True):
+            db = get_db()
+            try:
+                # Check if setting exists
+                existing_setting = db.query(Settings).filter(Settings.setting_key == 'hourly_rate').first()
+                if existing_setting:
+                    st.info(f"ℹ️ Hourly rate already set to ${existing_setting.setting_value}/hour")
+                else:
+                    new_setting = Settings(
+                        setting_key='hourly_rate',
+                        setting_value='15.00'
+                    )
+                    db.add(new_setting)
+                    db.commit()
+                    st.success("✅ Hourly rate set to $15.00/hour")
+            finally:
+                db.close()
+            st.rerun()
+        
+        if st.button("➕ Generate Sample Labor Entries (6)", use_container_width=True):
+            db = get_db()
+            try:
+                products = db.query(Inventory).all()
+                
+                if not products:
+                    st.error("⚠️ Please generate products first!")
+                else:
+                    sample_labor = []
+                    
+                    # Labor for candles
+                    if len(products) >= 1:
+                        sample_labor.extend([
+                            {"product_id": products[0].id, "worker": "Emily", "hours": 3.0, 
+                             "work_date": date(2024, 11, 10), "notes": "Melted wax and poured candles"},
+                            {"product_id": products[0].id, "worker": "Sage", "hours": 2.5, 
+                             "work_date": date(2024, 11, 11), "notes": "Applied labels and packaged"}
+                        ])
+                    
+                    # Labor for soap
+                    if len(products) >= 2:
+                        sample_labor.extend([
+                            {"product_id": products[1].id, "worker": "Both", "hours": 4.0, 
+                             "work_date": date(2024, 11, 12), "notes": "Made soap batch"},
+                            {"product_id": products[1].id, "worker": "Emily", "hours": 1.5, 
+                             "work_date": date(2024, 11, 13), "notes": "Cut and wrapped soaps"}
+                        ])
+                    
+                    # Labor for lip balm
+                    if len(products) >= 3:
+                        sample_labor.extend([
+                            {"product_id": products[2].id, "worker": "Sage", "hours": 2.0, 
+                             "work_date": date(2024, 11, 15), "notes": "Mixed and filled lip balm tubes"},
+                            {"product_id": products[2].id, "worker": "Emily", "hours": 1.0, 
+                             "work_date": date(2024, 11, 15), "notes": "Labeled and quality checked"}
+                        ])
+                    
+                    added_count = 0
+                    for labor in sample_labor:
+                        new_labor = Labor(**labor)
+                        db.add(new_labor)
+                        added_count += 1
+                    
+                    db.commit()
+                    if added_count > 0:
+                        st.success(f"✅ {added_count} labor entries added!")
+                    else:
+                        st.warning("⚠️ Not enough products to generate labor entries!")
+            finally:
+                db.close()
+            st.rerun()
+    
+    st.markdown("---")
+    
+    # Danger zone
+    st.subheader("🗑️ Danger Zone")
+    
+    with st.expander("⚠️ Clear All Data", expanded=False):
+        st.error("**Warning:** This will permanently delete ALL data from your database. This action cannot be undone!")
+        
+        confirm_text = st.text_input("Type 'DELETE ALL DATA' to confirm:")
+        
+        if st.button("🗑️ Clear All Data", type="primary", use_container_width=True):
+            if confirm_text == "DELETE ALL DATA":
+                db = get_db()
+                try:
+                    # Delete in proper order to respect foreign keys
+                    # First delete all child records that reference parent tables
+                    db.query(Labor).delete()
+                    db.query(ProductionOrder).delete()
+                    db.query(BillOfMaterials).delete()
+                    db.query(OrderItem).delete() # Added OrderItem delete
+                    db.query(Order).delete()     # Added Order delete
+                    # Then delete independent tables
+                    db.query(Finance).delete()
+                    db.query(Idea).delete()
+                    db.query(Settings).delete()
+                    db.query(Job).delete()
+                    db.query(DailySales).delete()
+                    db.query(IdempotencyKey).delete()
+                    db.query(ValuationSnapshot).delete()
+                    db.query(StockMovement).delete()
+                    db.query(StockCheckpoint).delete()
+                    db.query(StockShard).delete()
+                    db.query(StockHold).delete()
+                    # Finally delete parent tables
+                    db.query(Inventory).delete()
+                    db.query(Material).delete()
+                    db.commit()
+                    st.success("✅ All data has been cleared!")
+                except Exception as e:
+                    db.rollback()
+                    st.error(f"❌ Error clearing data: {str(e)}")
+                finally:
+                    db.close()
+                st.rerun()
+            else:
+                st.error("Please type 'DELETE ALL DATA' exactly to confirm.")
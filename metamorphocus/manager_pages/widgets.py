@@ -0,0 +1,35 @@
+import inspect
+import functools
+import streamlit as st
+import instrumentation
+
+# --- Partial Reruns ---
+# Heavy sections are wrapped in fragments so a widget inside them reruns only that section
+# instead of the whole script. Tabs only run the selected tab's body where Streamlit supports
+# lazy tabs; on older versions every tab is rendered as before.
+
+LAZY_TABS = 'on_change' in inspect.signature(st.tabs).parameters
+
+def lazy_tabs(labels, key):
+    """Creates tabs that rerun the page when switched, so only the open tab has to be rendered."""
+    if LAZY_TABS:
+        return st.tabs(labels, key=key, on_change="rerun")
+    return st.tabs(labels)
+
+def tab_is_open(tab):
+    """True for the selected tab (and for every tab when tabs aren't lazy)."""
+    return getattr(tab, 'open', None) is not False
+
+def page_fragment(name):
+    """Runs the decorated function as an st.fragment. Its queries and timings are reported
+    under "<page> › <name>" in the performance panel and by bench.py."""
+    # The page is whatever this rerun was attributed to by app.py's begin_run
+    run = instrumentation.current_run()
+    scope_name = f"{run.scope} › {name}" if run else name
+    def decorate(func):
+        @functools.wraps(func)
+        def run_section(*args, **kwargs):
+            with instrumentation.scoped_run(scope_name):
+                return func(*args, **kwargs)
+        return st.fragment(run_section)
+    return decorate
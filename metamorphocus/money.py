@@ -0,0 +1,55 @@
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import BigInteger, Integer, Float, cast
+from sqlalchemy.sql import operators
+from sqlalchemy.types import TypeDecorator
+
+# --- Money ---
+# Prices, costs and amounts are stored as integer cents, so SQL SUMs are exact integer
+# additions instead of floating-point ones that drift over many rows. The ORM still reads and
+# writes dollars: Money converts on the way in and out, so forms, templates and f-strings keep
+# working with 19.99. Analytics code that wants the raw values selects `cents(column)` and
+# gets int64 columns in pandas, converting back with `from_cents` only for display.
+
+def to_cents(dollars):
+    """Converts a dollar amount (float, int, Decimal or numpy scalar) to integer cents."""
+    return int((Decimal(str(dollars)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def from_cents(cents):
+    """Converts cents to dollars. Works on ints, numpy arrays and pandas Series."""
+    return cents / 100
+
+def cents(column, name=None):
+    """SQL expression selecting a Money column's stored cents as an integer, labelled `name` (default: its key)."""
+    return cast(column, BigInteger).label(name or column.key)
+
+class Money(TypeDecorator):
+    """A dollar amount stored as BIGINT cents.
+
+    Comparisons and + / - bind their operand as dollars (`Order.total_amount > 100` compares
+    against 10000 cents); * and / take plain numbers and keep the result in Money, so
+    `func.sum(Inventory.unit_price * Inventory.stock_level)` comes back in dollars. Put the
+    Money column on the left of arithmetic: `Float * Money` is typed as Float by SQLAlchemy
+    and would return raw cents.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    class Comparator(TypeDecorator.Comparator):
+        def _adapt_expression(self, op, other_comparator):
+            if op in (operators.add, operators.sub, operators.mul, operators.truediv):
+                return op, self.type
+            return super()._adapt_expression(op, other_comparator)
+
+    comparator_factory = Comparator
+
+    def coerce_compared_value(self, op, value):
+        if op in (operators.mul, operators.truediv):
+            return Integer() if isinstance(value, int) else Float()
+        return self
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        # Databases migrated in place may still hand back REAL values (1999.0)
+        return None if value is None else from_cents(value)
@@ -0,0 +1,72 @@
+from sqlalchemy import func, extract, and_, or_
+from database import ProductionOrder, Inventory
+
+# --- Production History Queries ---
+# The Production History tab is served from a single ProductionOrder JOIN Inventory query
+# with the date, product and producer filters applied in SQL, paged with keyset pagination
+# on (production_date, id) so later pages cost the same as the first. Monthly totals per
+# producer are aggregated in SQL over the same filtered rows, in a query of their own: the
+# page is an index range read, while folding the summary into it would read and sort every
+# filtered row for each page. The page keeps the summary while the user pages through.
+
+PAGE_SIZE = 25
+
+def history_filters(start_date=None, end_date=None, product_id=None, producer=None):
+    """Builds the WHERE conditions shared by the page query and the summary."""
+    conditions = []
+    if start_date is not None:
+        conditions.append(ProductionOrder.production_date >= start_date)
+    if end_date is not None:
+        conditions.append(ProductionOrder.production_date <= end_date)
+    if product_id is not None:
+        conditions.append(ProductionOrder.product_id == product_id)
+    if producer is not None:
+        conditions.append(ProductionOrder.produced_by == producer)
+    return conditions
+
+def fetch_page(db, conditions, cursor=None, page_size=PAGE_SIZE):
+    """Returns (rows, next_cursor) for one page, newest first.
+
+    `cursor` is the (production_date, id) of the last row on the previous page; next_cursor
+    is None on the last page. Each row has id, production_date, quantity_produced,
+    produced_by, material_cost, notes, product_name and sku.
+    """
+    query = db.query(
+        ProductionOrder.id,
+        ProductionOrder.production_date,
+        ProductionOrder.quantity_produced,
+        ProductionOrder.produced_by,
+        ProductionOrder.material_cost,
+        ProductionOrder.notes,
+        Inventory.product_name,
+        Inventory.sku
+    ).join(Inventory, ProductionOrder.product_id == Inventory.id).filter(*conditions)
+
+    if cursor is not None:
+        cursor_date, cursor_id = cursor
+        query = query.filter(or_(
+            ProductionOrder.production_date < cursor_date,
+            and_(ProductionOrder.production_date == cursor_date, ProductionOrder.id < cursor_id)
+        ))
+
+    # Fetch one extra row to find out whether there is a next page
+    rows = query.order_by(ProductionOrder.production_date.desc(), ProductionOrder.id.desc()).limit(page_size + 1).all()
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, (rows[-1].production_date, rows[-1].id)
+    return rows, None
+
+def monthly_summary(db, conditions):
+    """Returns rows of (year, month, produced_by, runs, units, material_cost) for the filtered history."""
+    year = extract('year', ProductionOrder.production_date)
+    month = extract('month', ProductionOrder.production_date)
+    return db.query(
+        year.label('year'),
+        month.label('month'),
+        ProductionOrder.produced_by,
+        func.count(ProductionOrder.id).label('runs'),
+        func.sum(ProductionOrder.quantity_produced).label('units'),
+        func.sum(ProductionOrder.material_cost).label('material_cost')
+    ).join(Inventory, ProductionOrder.product_id == Inventory.id).filter(*conditions).group_by(
+        year, month, ProductionOrder.produced_by
+    ).order_by(year, month, ProductionOrder.produced_by).all()
@@ -1,11 +1,31 @@
 import os
-import requests
+import click
+import mimetypes
 import urllib.parse
-from flask import Flask, render_template, jsonify, request, send_from_directory, redirect, url_for, session
+import time
+import threading
+from flask import Flask, Blueprint, Response, abort, current_app, render_template, jsonify, request, send_file, send_from_directory, redirect, url_for, g
+from werkzeug.http import is_resource_modified
 from flask_cors import CORS
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from database import get_db, init_db, Inventory, Order, OrderItem
-from datetime import datetime
+from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user
+import database
+from database import engine, get_db, Inventory, Order, OrderItem
+from metrics import Registry, CONTENT_TYPE
+from cache import CachedValue
+from sqlalchemy.exc import IntegrityError
+import asset_store
+import bundle
+import cache_bus
+import idempotency
+import instrumentation
+import jobs
+import money
+import stock_holds
+import stock_ledger
+import stock_shards
+from changefeed import stock_feed, StockWatcher, stream_stock_events
+from collections import defaultdict
+from datetime import datetime, timezone
 
 def create_svg_placeholder(text):
     """Generates an SVG data URI placeholder image."""
@@ -14,14 +34,12 @@ def create_svg_placeholder(text):
     svg = f'<svg width="400" height="500" viewBox="0 0 400 500" xmlns="http://www.w3.org/2000/svg" preserveAspectRatio="xMidYMid slice"><rect width="100%" height="100%" fill="#272b33"></rect><text x="50%" y="50%" fill="#e2e8f0" dy=".3em" font-family="Arial, sans-serif" font-size="24" text-anchor="middle">{escaped_text}</text></svg>'
     return f"data:image/svg+xml,{urllib.parse.quote(svg)}"
 
-app = Flask(__name__)
-app.secret_key = os.getenv('SESSION_SECRET', 'dev-secret-key-change-in-production')
-CORS(app)
+# Routes live on a blueprint; create_app() builds the Flask app around it
+storefront = Blueprint('storefront', __name__)
 
-# Flask-Login setup
+# Flask-Login setup (bound to the app in create_app)
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+login_manager.login_view = 'storefront.login'
 
 # Simple user class for manager access
 class User(UserMixin):
@@ -37,16 +55,133 @@ def load_user(user_id):
 # --- Unified Database Setup ---
 # The database engine and session management are now imported from the centralized database.py.
 # This ensures the Flask app uses the same settings, including the SQLite fallback.
+#
+# Importing this module and calling create_app() don't touch the database, so a new worker
+# boots without schema checks. The first request in each process checks the schema version
+# (one query) and starts the job worker. Migrations run there too unless SCHEMA_AUTO_MIGRATE=0,
+# in which case they are left to the deployment step, `flask --app sales init-db`, run once
+# per release, and a worker facing an outdated schema refuses to serve instead.
 
-# Initialize database tables on startup
-init_db()
+AUTO_MIGRATE = os.getenv('SCHEMA_AUTO_MIGRATE', '1') != '0'
 
-@app.route('/')
+_startup_lock = threading.Lock()
+_started = False
+
+def start_services():
+    """Checks the schema and starts the background worker that processes order side effects
+    (finance entries, low-stock alerts, sales rollups), the daily valuation snapshot, the
+    analytics extract and the stock ledger checkpoint, plus the cache version watcher, the
+    stock shard rebalancer and the cart hold sweeper. Runs once per process; jobs left over
+    from a previous run are picked up too."""
+    global _started
+    if _started:
+        return
+    with _startup_lock:
+        if _started:
+            return
+        database.bootstrap(migrate=AUTO_MIGRATE)
+        jobs.worker.start()
+        cache_bus.watcher.start(engine)
+        stock_shards.rebalancer.start()
+        hold_sweeper.start()
+        jobs.ensure_scheduled('valuation_snapshot')
+        jobs.ensure_scheduled('analytics_extract')
+        jobs.ensure_scheduled('stock_checkpoint')
+        _started = True
+
+# --- Operational Metrics ---
+# Request counts and latency histograms per route, checkout outcomes, DB pool usage and
+# catalog cache efficiency, exposed at /metrics in the Prometheus text format.
+# Every query issued while handling a request is also attributed to its route rule
+# (e.g. 'GET /api/products') by the query instrumentation.
+registry = Registry()
+http_requests = registry.counter('metamorphocus_http_requests_total', 'HTTP requests handled.', ('route', 'method', 'status'))
+http_latency = registry.histogram('metamorphocus_http_request_duration_seconds', 'HTTP request latency.', ('route', 'method'))
+checkout_outcomes = registry.counter('metamorphocus_checkout_total', 'Checkout attempts by outcome.', ('outcome',))
+cart_holds = registry.counter('metamorphocus_cart_holds_total', 'Cart stock hold requests by outcome.', ('outcome',))
+
+def _pool_stats():
+    pool = engine.pool
+    stats = {}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[(name,)] = method()
+    return stats
+
+registry.gauge('metamorphocus_db_pool_connections', 'Database connection pool state.', ('state',), _pool_stats)
+
+def _query_stats(field, scale=1):
+    return lambda: {(s['scope'],): s[field] * scale for s in instrumentation.snapshot()['scopes']}
+
+registry.gauge('metamorphocus_jobs', 'Background jobs by status.', ('status',),
+               lambda: {(status,): count for status, count in jobs.queue_depth().items()})
+registry.gauge('metamorphocus_route_db_queries', 'Queries executed per route since startup.', ('route',), _query_stats('queries'))
+registry.gauge('metamorphocus_route_db_time_seconds', 'Time spent in the database per route since startup.', ('route',), _query_stats('db_time_ms', 0.001))
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule else '(unmatched)'
+
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    instrumentation.begin_run(f"{request.method} {_route_label()}")
+
+def record_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+def finish_request_metrics(exc):
+    instrumentation.end_run()
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    route = _route_label()
+    http_requests.inc(route, request.method, str(g.pop('response_status', 500)))
+    http_latency.observe(time.perf_counter() - started, route, request.method)
+
+@storefront.route('/metrics')
+def metrics_endpoint():
+    """Prometheus-style metrics for the storefront"""
+    return registry.render(), 200, {'Content-Type': CONTENT_TYPE}
+
+@storefront.route('/metrics/queries')
+def query_metrics():
+    """Per-route query counts, DB time, slowest statements and N+1 warnings"""
+    return jsonify(instrumentation.snapshot())
+
+@storefront.route('/')
 def index():
-    """Serve the sales page"""
-    return render_template('index.html')
+    """Serve the sales page, with the first page of the catalog embedded"""
+    products = catalog_cache.get()
+    catalog = {
+        'products': products[:CATALOG_EMBED_LIMIT],
+        'total': len(products),
+        # Lets the client subscribe to the stock stream from the point this catalog reflects
+        'stock_seq': stock_feed.last_seq,
+    }
+    return render_template('index.html', catalog=catalog)
+
+# --- Storefront Assets ---
+# The page's CSS and JS come from the bundle built by `python bundle.py`. Bundle files are
+# named after their content hash, so browsers and CDNs may cache them for good; without a
+# bundle the sources under assets/ are served instead and revalidated on every load.
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
 
-@app.route('/login', methods=['GET', 'POST'])
+def asset_url(name):
+    """URL of a storefront asset: its hashed bundle file if one has been built, else the source."""
+    return url_for('storefront.asset', filename=current_app.config['ASSET_MANIFEST'].get(name, name))
+
+@storefront.route('/assets/<path:filename>')
+def asset(filename):
+    """Serve storefront CSS/JS"""
+    if bundle.HASHED_FILE.fullmatch(filename):
+        response = send_from_directory(bundle.DIST_DIR, filename, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+        return response
+    return send_from_directory(bundle.SOURCE_DIR, filename, max_age=0)
+
+@storefront.route('/login', methods=['GET', 'POST'])
 def login():
     """Manager login page"""
     if request.method == 'POST':
@@ -57,20 +192,20 @@ def login():
         if password == manager_password:
             user = User('manager')
             login_user(user)
-            return redirect(url_for('manager'))
+            return redirect(url_for('storefront.manager'))
         else:
             return render_template('login.html', error='Invalid password')
     
     return render_template('login.html')
 
-@app.route('/logout')
+@storefront.route('/logout')
 @login_required
 def logout():
     """Logout from manager"""
     logout_user()
-    return redirect(url_for('index'))
+    return redirect(url_for('storefront.index'))
 
-@app.route('/manager')
+@storefront.route('/manager')
 @login_required
 def manager():
     """Redirect to the Streamlit manager backend."""
@@ -82,32 +217,69 @@ def manager():
     return redirect(streamlit_url)
 
 
-@app.route('/static/product_images/<path:filename>')
+# --- Product Images ---
+# IMAGE_SERVING picks who copies image bytes to the client:
+#   python      (default) the worker, via send_file: byte ranges are supported, and WSGI
+#               servers that implement wsgi.file_wrapper (gunicorn) use sendfile()
+#   x-sendfile  Apache (mod_xsendfile) or lighttpd: the response only carries the file's path
+#               in an X-Sendfile header
+#   x-accel     nginx: the response carries X-Accel-Redirect to IMAGE_ACCEL_PREFIX + file name,
+#               which an `internal` location maps to ASSET_DIR
+# In every mode the ETag and Last-Modified come from the asset manifest, so a matching
+# If-None-Match / If-Modified-Since is answered with 304 before the file is opened. The
+# offload modes apply to the local backend; S3 images are always sent by the worker.
+
+IMAGE_SERVING = os.getenv('IMAGE_SERVING', 'python')
+IMAGE_ACCEL_PREFIX = os.getenv('IMAGE_ACCEL_PREFIX', '/_product_images/')
+IMAGE_MAX_AGE = int(os.getenv('IMAGE_MAX_AGE', '300'))
+
+def image_validators(info):
+    """(ETag, Last-Modified) of an asset from its manifest entry."""
+    return f"{info.size:x}-{int(info.modified * 1_000_000):x}", datetime.fromtimestamp(info.modified, timezone.utc)
+
+@storefront.route('/static/product_images/<path:filename>')
 def serve_product_image(filename):
     """Serve product images"""
-    return send_from_directory('static/product_images', filename)
+    store = asset_store.store
+    info = store.get(filename)
+    if info is None:
+        abort(404)
+    etag, last_modified = image_validators(info)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    local = isinstance(store.backend, asset_store.LocalBackend)
 
-@app.route('/api/products', methods=['GET'])
-def get_products():
-    """Get all available products with stock > 0"""
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    elif local and IMAGE_SERVING == 'x-accel':
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = IMAGE_ACCEL_PREFIX + filename
+    elif local and IMAGE_SERVING == 'x-sendfile':
+        response = Response(mimetype=mimetype)
+        response.headers['X-Sendfile'] = os.path.abspath(store.backend.path(filename))
+    elif local:
+        response = send_file(store.backend.path(filename), mimetype=mimetype, etag=etag, last_modified=last_modified, max_age=IMAGE_MAX_AGE)
+    else:
+        data = store.read(filename)
+        response = Response(data, mimetype=mimetype)
+        response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = IMAGE_MAX_AGE
+    return response
+
+def load_catalog():
+    """Builds the storefront catalog: all products with stock > 0"""
     db = get_db()
     try:
-        products = db.query(Inventory).filter(Inventory.stock_level > 0).all()
+        products = db.query(Inventory, Inventory.available_stock).filter(Inventory.available_stock > 0).all()
         
         products_data = []
-        for p in products:
-            image_url = p.image_url
-            # Check if the image_url is valid and if the file actually exists on disk.
-            # This prevents the frontend from trying to load a broken image link.
-            if image_url:
-                # image_url is stored as '/static/product_images/filename.jpg'.
-                # To ensure the path is correct regardless of the working directory,
-                # we join the app's root path with the relative image path.
-                relative_path = image_url.lstrip('/')
-                # we join the app's root path with the relative image path.
-                filepath = os.path.join(app.root_path, relative_path)
-                if not os.path.exists(filepath):
-                    image_url = None # Set to None to trigger the placeholder image
+        for p, stock_level in products:
+            # Images missing from the asset store get a placeholder instead of a broken link.
+            # This is a lookup in the store's in-memory manifest, not a filesystem check.
+            image_url = asset_store.store.resolve(p.image_url)
 
             products_data.append({
                 'id': p.id,
@@ -116,38 +288,193 @@ def get_products():
                 'price': p.unit_price,
                 'image': image_url or create_svg_placeholder(p.category),
                 'desc': p.description or f'{p.product_name} - {p.category}',
-                'stock': p.stock_level
+                'stock': stock_level
             })
         
-        return jsonify(products_data)
+        return products_data
+    finally:
+        db.close()
+
+# The catalog is read on every page view but only changes on orders and manager edits.
+# Orders placed here invalidate it immediately; writes from other processes (the manager,
+# other storefront workers) through the cache bus within CACHE_POLL_INTERVAL. Other workers'
+# checkouts and cart holds only use the bus when a product sells out or comes back, so
+# their stock counts reach this cache through the stock watcher, or at worst the TTL.
+catalog_cache = CachedValue(load_catalog, ttl=float(os.getenv('CATALOG_CACHE_TTL', '60')))
+cache_bus.watcher.subscribe('inventory', catalog_cache.invalidate)
+# Products embedded in the sales page itself; the rest are fetched from /api/products
+CATALOG_EMBED_LIMIT = int(os.getenv('CATALOG_EMBED_LIMIT', '24'))
+
+registry.gauge('metamorphocus_catalog_cache_lookups', 'Catalog cache lookups by result since startup.', ('result',),
+               lambda: {('hit',): catalog_cache.hits, ('miss',): catalog_cache.misses})
+registry.gauge('metamorphocus_catalog_cache_hit_ratio', 'Fraction of catalog lookups served from cache.', (), catalog_cache.hit_ratio)
+
+# Stock changes made by the manager app are picked up by polling and pushed to listeners
+stock_watcher = StockWatcher(stock_feed, on_change=lambda changes: catalog_cache.invalidate())
+
+@storefront.route('/api/products', methods=['GET'])
+def get_products():
+    """Get all available products with stock > 0"""
+    response = jsonify(catalog_cache.get())
+    # Lets the client subscribe to the stock stream from the point this catalog reflects
+    response.headers['X-Stock-Seq'] = str(stock_feed.last_seq)
+    return response
+
+def publish_available(db, product_ids):
+    """Pushes what shoppers can still buy of these products to the stock stream. Returns {product_id: units}."""
+    levels = dict(db.query(Inventory.id, Inventory.available_stock).filter(Inventory.id.in_(list(product_ids))).all())
+    stock_feed.publish(levels)
+    stock_watcher.note(levels)
+    return levels
+
+@storefront.route('/api/stock/stream')
+def stock_stream():
+    """Server-sent events with stock-level changes, so carts stay valid without polling"""
+    stock_watcher.start()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        last_seq = int(last_event_id)
+    except (TypeError, ValueError):
+        last_seq = stock_feed.last_seq
+    return Response(
+        stream_stock_events(stock_feed, last_seq),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# --- Cart Holds ---
+# Adding to the bag holds the units for the cart (see stock_holds.py); checkout with the
+# cart's id then sells exactly what was held.
+
+def stock_returned(product_ids):
+    """Called by the hold sweeper when expired holds put units back on sale."""
+    catalog_cache.invalidate()
+    db = get_db()
+    try:
+        publish_available(db, product_ids)
     finally:
         db.close()
 
-@app.route('/api/orders', methods=['POST'])
+hold_sweeper = stock_holds.HoldSweeper(on_release=stock_returned)
+
+@storefront.route('/api/cart/<cart_id>/items/<int:product_id>', methods=['PUT'])
+def hold_cart_item(cart_id, product_id):
+    """Sets how many units of a product a cart holds, e.g. {"qty": 2}"""
+    if len(cart_id) > stock_holds.MAX_CART_ID_LENGTH:
+        return jsonify({'error': 'Cart id is too long'}), 400
+    quantity = (request.get_json(silent=True) or {}).get('qty')
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 0:
+        return jsonify({'error': 'qty must be a whole number'}), 400
+    db = get_db()
+    try:
+        product = db.get(Inventory, product_id)
+        if product is None:
+            return jsonify({'error': f'Product {product_id} not found'}), 404
+        expires_at = stock_holds.set_quantity(db, cart_id, product, quantity)
+        if expires_at is None:
+            db.rollback()
+            cart_holds.inc('insufficient_stock')
+            # What this cart could have: its current hold plus what nobody holds
+            available = stock_holds.held_quantity(db, cart_id, product_id) + max(
+                db.query(Inventory.available_stock).filter(Inventory.id == product_id).scalar(), 0)
+            return jsonify({'error': f'Only {available} {product.product_name} available', 'available': available}), 409
+        db.commit()
+        catalog_cache.invalidate()
+        levels = publish_available(db, [product_id])
+        cart_holds.inc('held')
+        return jsonify({
+            'product_id': product_id,
+            'qty': quantity,
+            'expires_at': expires_at.replace(tzinfo=timezone.utc).isoformat(),
+            'stock': levels.get(product_id)
+        })
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        db.close()
+
+@storefront.route('/api/cart/<cart_id>/items/<int:product_id>', methods=['DELETE'])
+def release_cart_item(cart_id, product_id):
+    """Returns a cart's hold on a product"""
+    db = get_db()
+    try:
+        released = stock_holds.release_cart(db, cart_id, product_id)
+        db.commit()
+        if released:
+            catalog_cache.invalidate()
+            publish_available(db, released)
+        cart_holds.inc('released')
+        return jsonify({'product_id': product_id, 'qty': 0})
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        db.close()
+
+def replay_response(stored, request_hash):
+    """Returns the stored response for a repeated Idempotency-Key, or 422 if the payload differs"""
+    if stored.request_hash != request_hash:
+        checkout_outcomes.inc('validation_error')
+        return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+    checkout_outcomes.inc('duplicate')
+    response = current_app.response_class(stored.body, status=stored.status, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+@storefront.route('/api/orders', methods=['POST'])
 def create_order():
     """Create a new order"""
     db = get_db()
+    idempotency_key = request.headers.get('Idempotency-Key')
+    request_hash = None
     try:
         data = request.json
         
+        # A retried request with a known Idempotency-Key gets the original response back
+        if idempotency_key:
+            if len(idempotency_key) > idempotency.MAX_KEY_LENGTH:
+                checkout_outcomes.inc('validation_error')
+                return jsonify({'error': 'Idempotency-Key is too long'}), 400
+            request_hash = idempotency.fingerprint(data)
+            stored = idempotency.lookup(db, idempotency_key)
+            if stored:
+                return replay_response(stored, request_hash)
+        
         # Validate request
         if not data.get('customer_name') or not data.get('customer_email'):
+            checkout_outcomes.inc('validation_error')
             return jsonify({'error': 'Name and email required'}), 400
         
         if not data.get('items') or len(data['items']) == 0:
+            checkout_outcomes.inc('validation_error')
             return jsonify({'error': 'Cart is empty'}), 400
         
-        # Calculate total and check stock
-        total_amount = 0
+        for item in data['items']:
+            quantity = item.get('qty')
+            if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+                checkout_outcomes.inc('validation_error')
+                return jsonify({'error': 'Each item needs a qty of at least 1'}), 400
+        
+        # A checkout with a cart id sells the stock the cart holds, without checking each line's stock
+        cart_id = data.get('cart_id')
+        if cart_id is not None and (not isinstance(cart_id, str) or len(cart_id) > stock_holds.MAX_CART_ID_LENGTH):
+            checkout_outcomes.inc('validation_error')
+            return jsonify({'error': 'Invalid cart id'}), 400
+        
+        # Calculate total (in cents, so it matches the sum of the stored line items) and check stock
+        total_cents = 0
         order_items = []
         
         for item in data['items']:
             product = db.query(Inventory).filter(Inventory.id == item['id']).first()
             
             if not product:
+                checkout_outcomes.inc('validation_error')
                 return jsonify({'error': f'Product {item["id"]} not found'}), 404
             
-            if product.stock_level < item['qty']:
+            if not cart_id and product.stock_level < item['qty']:
+                checkout_outcomes.inc('insufficient_stock')
                 return jsonify({'error': f'Insufficient stock for {product.product_name}'}), 400
             
             order_items.append({
@@ -157,7 +484,9 @@ def create_order():
                 'price': product.unit_price
             })
             
-            total_amount += product.unit_price * item['qty']
+            total_cents += money.to_cents(product.unit_price) * item['qty']
+        
+        total_amount = money.from_cents(total_cents)
         
         # Create order
         order = Order(
@@ -171,7 +500,7 @@ def create_order():
         db.add(order)
         db.flush()  # Get order ID
         
-        # Create order items and update stock
+        # Create order items
         for item_data in order_items:
             order_item = OrderItem(
                 order_id=order.id,
@@ -181,25 +510,126 @@ def create_order():
                 price=item_data['price']
             )
             db.add(order_item)
-            
-            # Update stock
-            product = db.query(Inventory).filter(Inventory.id == item_data['product_id']).first()
-            product.stock_level -= item_data['quantity']
         
-        db.commit()
+        # Update stock
+        new_stock_levels = {}
+        if cart_id:
+            # The units were held when they went into the cart, so its holds become the sale as they are
+            quantities = defaultdict(int)
+            for item_data in order_items:
+                quantities[item_data['product_id']] += item_data['quantity']
+            new_stock_levels = stock_holds.convert(db, cart_id, quantities, order.id)
+            if new_stock_levels is None:
+                db.rollback()
+                checkout_outcomes.inc('reservation_expired')
+                return jsonify({'error': 'Your bag is no longer reserved, please review it and try again',
+                                'code': 'reservation_expired'}), 409
+        else:
+            for item_data in order_items:
+                # A conditional decrement (or one of the product's shards), so concurrent
+                # checkouts can't both sell the last units
+                product = db.query(Inventory).filter(Inventory.id == item_data['product_id']).first()
+                stock_level = stock_shards.take(db, product, item_data['quantity'])
+                if stock_level is None:
+                    db.rollback()
+                    checkout_outcomes.inc('insufficient_stock')
+                    return jsonify({'error': f'Insufficient stock for {product.product_name}'}), 400
+                new_stock_levels[product.id] = stock_level
+                stock_ledger.record(db, stock_ledger.PRODUCT, product.id, -item_data['quantity'], stock_level, 'order', order.id)
         
-        return jsonify({
+        response_data = {
             'success': True,
             'order_id': order.id,
             'total': total_amount,
             'message': 'Order placed successfully!'
-        })
+        }
+        
+        # Queue post-processing in the same transaction so it is never lost
+        jobs.enqueue(db, 'order_finance_entry', {'order_id': order.id})
+        jobs.enqueue(db, 'low_stock_check', {'product_ids': [item['product_id'] for item in order_items]})
+        jobs.enqueue(db, 'refresh_sales_rollup', {'date': datetime.utcnow().strftime('%Y-%m-%d')})
+        
+        # Store the response in the same transaction as the order
+        if idempotency_key:
+            body = idempotency.record(db, idempotency_key, request_hash, 200, response_data)
         
+        db.commit()
+        catalog_cache.invalidate()
+        publish_available(db, new_stock_levels)
+        jobs.worker.notify()
+        checkout_outcomes.inc('success')
+        if idempotency_key:
+            idempotency.remember(idempotency_key, request_hash, 200, body)
+        
+        return jsonify(response_data)
+        
+    except IntegrityError:
+        db.rollback()
+        # A concurrent request with the same key committed first; replay its response
+        stored = idempotency.lookup(db, idempotency_key) if idempotency_key else None
+        if stored:
+            return replay_response(stored, request_hash)
+        checkout_outcomes.inc('exception')
+        return jsonify({'error': 'Could not place order'}), 500
     except Exception as e:
         db.rollback()
+        checkout_outcomes.inc('exception')
         return jsonify({'error': str(e)}), 500
     finally:
         db.close()
 
+# --- App Factory ---
+
+def init_db_command():
+    """Creates or migrates the database schema."""
+    database.init_db()
+    print(f"Database schema is at version {database.SCHEMA_VERSION}")
+
+@click.argument('sku')
+@click.argument('shards', type=int)
+def shard_stock_command(sku, shards):
+    """Sells a hot product's stock from SHARDS counters during a drop (0 turns sharding off)."""
+    db = get_db()
+    try:
+        product = db.query(Inventory).filter(Inventory.sku == sku).first()
+        if product is None:
+            raise click.ClickException(f"No product with SKU {sku}")
+        stock_shards.set_shards(db, product, shards)
+        db.commit()
+        print(f"{product.product_name} ({sku}): {shards or 'no'} stock shards, {product.stock_level} in stock")
+    finally:
+        db.close()
+
+def cooperative_database():
+    """Under gevent workers (`gunicorn -k gevent`, from the `gevent` extra), lets psycopg2 wait
+    for PostgreSQL without blocking the worker's other connections."""
+    try:
+        from gevent import monkey
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        return
+    if monkey.is_module_patched('socket') and engine.dialect.name == 'postgresql':
+        patch_psycopg()
+
+def create_app():
+    """Builds the storefront app. Serve it with e.g. `gunicorn 'sales:create_app()'`."""
+    cooperative_database()
+    app = Flask(__name__)
+    app.secret_key = os.getenv('SESSION_SECRET', 'dev-secret-key-change-in-production')
+    CORS(app)
+    login_manager.init_app(app)
+    # Read once per process: a new bundle is picked up by restarting after `python bundle.py`
+    app.config['ASSET_MANIFEST'] = bundle.load_manifest()
+    app.context_processor(lambda: {'asset_url': asset_url, 'bundle_built': bool(app.config['ASSET_MANIFEST'])})
+
+    app.before_request(start_services)
+    app.before_request(start_request_metrics)
+    app.after_request(record_response_status)
+    app.teardown_request(finish_request_metrics)
+    app.register_blueprint(storefront)
+    app.cli.command('init-db')(init_db_command)
+    app.cli.command('shard-stock')(shard_stock_command)
+    return app
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
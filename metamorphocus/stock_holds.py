@@ -0,0 +1,185 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select, update
+from database import get_db, StockHold
+import stock_ledger
+import stock_shards
+
+# --- Cart Holds ---
+# Stock used to be checked only at checkout, so during a drop shoppers filled carts with items
+# that were already gone. Now adding to the cart sets the units aside for HOLD_SECONDS
+# (STOCK_HOLD_SECONDS, default 15 minutes):
+#   - a hold takes the units out of what checkout can sell (stock_shards.hold) and records a
+#     stock_holds row per cart, product and shard; stock_level keeps the physical stock and
+#     Inventory.available_stock is what's left for everyone else;
+#   - every change to a cart renews all of its holds;
+#   - checkout with the cart's id turns its holds into the sale in one statement, with no
+#     per-line stock checks, since the units are already set aside (see convert());
+#   - a sweeper thread in each storefront process returns expired holds, oldest first off the
+#     expires_at index, then sleeps until the next one expires.
+# Holds are claimed with DELETE ... RETURNING before their units are moved, so a hold that a
+# checkout, a cart change and a sweeper all reach at once is still only returned once.
+
+HOLD_SECONDS = float(os.getenv('STOCK_HOLD_SECONDS', '900'))
+SWEEP_BATCH = 200
+# Longest the sweeper sleeps, so holds placed by other processes are returned on time too
+SWEEP_MAX_SECONDS = float(os.getenv('STOCK_HOLD_SWEEP_SECONDS', '30'))
+MAX_CART_ID_LENGTH = 64
+
+logger = logging.getLogger(__name__)
+
+def _claim(db, condition):
+    """Deletes the holds matching `condition` and returns [(id, product_id, shard, quantity)] of
+    those this transaction actually deleted."""
+    return db.execute(
+        delete(StockHold).where(condition)
+        .returning(StockHold.id, StockHold.product_id, StockHold.shard, StockHold.quantity),
+        execution_options={'synchronize_session': False}
+    ).all()
+
+def _by_counter(claimed):
+    """Sums claimed holds per (product_id, shard), in the order the rebalancer locks them
+    (a product's inventory row, then its shards), so concurrent sweeps can't deadlock."""
+    units = defaultdict(int)
+    for _, product_id, shard, quantity in claimed:
+        units[product_id, shard] += quantity
+    return sorted(units.items(), key=lambda item: (item[0][0], -1 if item[0][1] is None else item[0][1]))
+
+def _return(db, claimed):
+    """Puts claimed holds' units back on sale. Returns {product_id: units}."""
+    released = defaultdict(int)
+    for (product_id, shard), units in _by_counter(claimed):
+        stock_shards.release(db, product_id, shard, units)
+        released[product_id] += units
+    return dict(released)
+
+def held_quantity(db, cart_id, product_id):
+    return db.query(func.coalesce(func.sum(StockHold.quantity), 0)).filter(
+        StockHold.cart_id == cart_id, StockHold.product_id == product_id).scalar()
+
+def set_quantity(db, cart_id, product, quantity):
+    """Holds exactly `quantity` units of a product for a cart, holding more or returning some
+    as needed, and renews the cart's other holds. Returns the new expiry, or None if there
+    aren't enough units, in which case the caller must roll back. Does not commit."""
+    holds = db.query(StockHold).filter(StockHold.cart_id == cart_id, StockHold.product_id == product.id).order_by(StockHold.id.desc()).all()
+    change = quantity - sum(hold.quantity for hold in holds)
+    expires_at = datetime.utcnow() + timedelta(seconds=HOLD_SECONDS)
+    if change > 0:
+        placed = stock_shards.hold(db, product, change)
+        if placed is None:
+            return None
+        db.add_all([StockHold(cart_id=cart_id, product_id=product.id, shard=shard, quantity=units, expires_at=expires_at)
+                    for shard, units in placed])
+    elif change < 0:
+        excess = -change
+        returned = []
+        for hold in holds:
+            if not excess:
+                break
+            if hold.quantity <= excess:
+                claimed = _claim(db, StockHold.id == hold.id)
+                returned += claimed
+                excess -= sum(units for _, _, _, units in claimed)
+            elif db.execute(update(StockHold).where(StockHold.id == hold.id, StockHold.quantity > excess)
+                            .values(quantity=StockHold.quantity - excess),
+                            execution_options={'synchronize_session': False}).rowcount:
+                returned.append((hold.id, product.id, hold.shard, excess))
+                excess = 0
+        _return(db, returned)
+    db.execute(update(StockHold).where(StockHold.cart_id == cart_id).values(expires_at=expires_at),
+               execution_options={'synchronize_session': False})
+    return expires_at
+
+def release_cart(db, cart_id, product_id=None):
+    """Returns a cart's holds (or just those on one product). Returns {product_id: units}. Does not commit."""
+    condition = StockHold.cart_id == cart_id
+    if product_id is not None:
+        condition &= StockHold.product_id == product_id
+    return _return(db, _claim(db, condition))
+
+def convert(db, cart_id, quantities, order_id):
+    """Sells a cart's holds for an order of {product_id: units}, recording the stock movements,
+    and returns any held units the order doesn't include. Returns {product_id: stock level},
+    or None if the cart no longer holds enough of some product (its holds expired), in which
+    case the caller must roll back. Does not commit."""
+    held = _claim(db, (StockHold.cart_id == cart_id) & (StockHold.expires_at > datetime.utcnow()))
+    totals = defaultdict(int)
+    for _, product_id, _, units in held:
+        totals[product_id] += units
+    # Every product in the order must come from this cart's holds
+    if any(product_id not in totals or totals[product_id] < units for product_id, units in quantities.items()):
+        return None
+    remaining = dict(quantities)
+    stock_levels = {}
+    for (product_id, shard), units in _by_counter(held):
+        sold = min(units, remaining.get(product_id, 0))
+        if sold:
+            stock_levels[product_id] = stock_shards.sell_held(db, product_id, shard, sold)
+            remaining[product_id] -= sold
+        if units > sold:
+            stock_shards.release(db, product_id, shard, units - sold)
+    for product_id, stock_level in stock_levels.items():
+        stock_ledger.record(db, stock_ledger.PRODUCT, product_id, -quantities[product_id], stock_level, 'order', order_id)
+    return stock_levels
+
+# --- Expiry ---
+
+def sweep(db, limit=SWEEP_BATCH):
+    """Returns up to `limit` expired holds to stock, oldest first. Returns {product_id: units}.
+    Does not commit."""
+    expired = (select(StockHold.id).where(StockHold.expires_at <= datetime.utcnow())
+               .order_by(StockHold.expires_at).limit(limit).with_for_update(skip_locked=True))
+    return _return(db, _claim(db, StockHold.id.in_(expired)))
+
+def next_expiry(db):
+    return db.query(func.min(StockHold.expires_at)).scalar()
+
+class HoldSweeper:
+    """Returns expired holds in the background and calls `on_release` with the products whose
+    stock came back."""
+    def __init__(self, on_release=None, max_interval=SWEEP_MAX_SECONDS):
+        self.on_release = on_release
+        self.max_interval = max_interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='stock-hold-sweeper', daemon=True)
+            self._thread.start()
+
+    def sweep_once(self):
+        """Returns expired holds in batches; returns the seconds until the next hold expires."""
+        db = get_db()
+        try:
+            while True:
+                released = sweep(db)
+                db.commit()
+                if not released:
+                    break
+                if self.on_release is not None:
+                    self.on_release(list(released))
+            upcoming = next_expiry(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if upcoming is None:
+            return self.max_interval
+        return min(max((upcoming - datetime.utcnow()).total_seconds(), 0.05), self.max_interval)
+
+    def _run(self):
+        while True:
+            try:
+                delay = self.sweep_once()
+            except Exception:
+                logger.exception("Returning expired stock holds failed")
+                delay = self.max_interval
+            time.sleep(delay)
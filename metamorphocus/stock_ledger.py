@@ -0,0 +1,125 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from database import engine, get_db, Inventory, Material, StockMovement, StockCheckpoint
+
+# --- Stock Movement Ledger ---
+# stock_level and quantity hold the current stock; stock_movements keeps how it got there.
+# Every change appends one row with the delta, the balance right after it and its source:
+#   order           checkout (reference: order id)
+#   cancellation    stock returned by a cancelled order (reference: order id)
+#   production      finished goods added and materials used (reference: production order id)
+#   adjustment      manual edits and newly added items
+#   reconciliation  a difference found by a checkpoint, i.e. a write that bypassed the ledger
+#   opening         an item's stock when the ledger first saw it
+#   rebalance       no change, just the exact balance of a product with stock shards: its
+#                   checkouts don't lock the product, so their balances can miss orders
+#                   committing at the same moment (see stock_shards.py)
+# Movements are added to the caller's session, so they commit or roll back with the stock
+# change itself. A recurring job checkpoints every item's balance (see checkpoint()), which
+# also reconciles the ledger with the stock columns.
+# With the running balance on each row, stock at any moment is the newest movement up to it,
+# and consumption over a period is a sum over one index range.
+
+PRODUCT = 'product'
+MATERIAL = 'material'
+# Item type -> (model, stock column)
+ITEMS = {PRODUCT: (Inventory, Inventory.stock_level), MATERIAL: (Material, Material.quantity)}
+LEDGERED_MODELS = {model: item_type for item_type, (model, _) in ITEMS.items()}
+# Item type -> its exact stock, including units sold through shards but not yet rebalanced
+CURRENT_STOCK = {PRODUCT: Inventory.current_stock, MATERIAL: Material.quantity}
+
+CHECKPOINT_HOURS = float(os.getenv('STOCK_CHECKPOINT_HOURS', '24'))
+# Movements committed just before a checkpoint may carry a slightly earlier timestamp than
+# ones it already saw; the next checkpoint rereads this much of the ledger behind the last one
+CHECKPOINT_OVERLAP = timedelta(minutes=5)
+
+def record(db, item_type, item_id, delta, balance, source, reference_id=None):
+    """Adds a movement to the caller's session (no-op for a zero delta). Does not commit."""
+    if not delta:
+        return
+    db.add(StockMovement(item_type=item_type, item_id=item_id, delta=delta, balance=balance,
+                         source=source, reference_id=reference_id, created_at=datetime.utcnow()))
+
+def record_balance(db, item_type, item_id, balance, source):
+    """Adds a zero-delta movement that only re-states an item's balance. Does not commit."""
+    db.add(StockMovement(item_type=item_type, item_id=item_id, delta=0, balance=balance,
+                         source=source, created_at=datetime.utcnow()))
+
+# --- Queries ---
+
+def stock_at(db, item_type, item_id, when):
+    """An item's stock at `when`, or None if the ledger has no record of it by then."""
+    balance = db.query(StockMovement.balance).filter(
+        StockMovement.item_type == item_type, StockMovement.item_id == item_id, StockMovement.created_at <= when
+    ).order_by(StockMovement.created_at.desc(), StockMovement.id.desc()).limit(1).scalar()
+    if balance is None:
+        # Older movements may have been archived; the checkpoints still have the balance
+        balance = db.query(StockCheckpoint.balance).filter(
+            StockCheckpoint.item_type == item_type, StockCheckpoint.item_id == item_id, StockCheckpoint.taken_at <= when
+        ).order_by(StockCheckpoint.taken_at.desc()).limit(1).scalar()
+    return balance
+
+def consumption(db, item_type, since, until=None, sources=None):
+    """{item_id: units taken out of stock} between `since` and `until` (default now), optionally
+    only by some sources, e.g. materials used by ('production',) or products sold by ('order',)."""
+    query = db.query(StockMovement.item_id, func.sum(-StockMovement.delta)).filter(
+        StockMovement.item_type == item_type, StockMovement.created_at >= since, StockMovement.delta < 0)
+    if until is not None:
+        query = query.filter(StockMovement.created_at < until)
+    if sources:
+        query = query.filter(StockMovement.source.in_(sources))
+    return dict(query.group_by(StockMovement.item_id).all())
+
+def daily_consumption(db, item_type, days=30, sources=None):
+    """{item_id: average units taken out of stock per day} over the last `days` days."""
+    used = consumption(db, item_type, datetime.utcnow() - timedelta(days=days), sources=sources)
+    return {item_id: amount / days for item_id, amount in used.items()}
+
+def ledger_balances(db, item_type):
+    """{item_id: balance} according to the ledger: the last checkpoint plus the newest
+    movement of each item since then."""
+    last_checkpoint = db.query(func.max(StockCheckpoint.taken_at)).filter(StockCheckpoint.item_type == item_type).scalar()
+    balances = {}
+    latest = db.query(func.max(StockMovement.id)).filter(StockMovement.item_type == item_type)
+    if last_checkpoint is not None:
+        balances = dict(db.query(StockCheckpoint.item_id, StockCheckpoint.balance).filter(
+            StockCheckpoint.item_type == item_type, StockCheckpoint.taken_at == last_checkpoint).all())
+        latest = latest.filter(StockMovement.created_at >= last_checkpoint - CHECKPOINT_OVERLAP)
+    latest = latest.group_by(StockMovement.item_id)
+    balances.update(db.query(StockMovement.item_id, StockMovement.balance).filter(StockMovement.id.in_(latest.scalar_subquery())).all())
+    return balances
+
+def reconcile(db, item_type):
+    """[(item_id, ledger balance or None, actual stock)] for items whose stock doesn't match the ledger."""
+    model, _ = ITEMS[item_type]
+    ledger = ledger_balances(db, item_type)
+    return [(item_id, ledger.get(item_id), actual) for item_id, actual in db.query(model.id, CURRENT_STOCK[item_type]).all()
+            if abs((ledger.get(item_id) or 0) - actual) > 1e-9]
+
+# --- Checkpoints ---
+
+def checkpoint():
+    """Reconciles the ledger with current stock, recording a movement for every difference,
+    then checkpoints every item's balance, in one transaction of its own. Returns the number
+    of items reconciled."""
+    db = get_db()
+    try:
+        if engine.dialect.name == 'postgresql':
+            # Read stock and ledger from one snapshot, so concurrent orders don't look like drift
+            db.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+        now = datetime.utcnow()
+        reconciled = 0
+        for item_type, (model, _) in ITEMS.items():
+            for item_id, ledger_balance, actual in reconcile(db, item_type):
+                source = 'opening' if ledger_balance is None else 'reconciliation'
+                record(db, item_type, item_id, actual - (ledger_balance or 0), actual, source)
+                reconciled += 1
+            db.flush()
+            last_movement = db.query(func.max(StockMovement.id)).scalar()
+            db.add_all([StockCheckpoint(item_type=item_type, item_id=item_id, balance=actual, movement_id=last_movement, taken_at=now)
+                        for item_id, actual in db.query(model.id, CURRENT_STOCK[item_type]).all()])
+        db.commit()
+        return reconciled
+    finally:
+        db.close()
@@ -0,0 +1,253 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import false, func, or_, select, update
+from database import engine, get_db, Inventory, StockShard, StockHold
+import stock_ledger
+import cache_bus
+
+# --- Sharded Stock Counters ---
+# Every checkout for a product updates its inventory row, so during a drop all checkouts for
+# one SKU queue on that row's lock. A product flagged as hot (inventory.stock_shards = N)
+# sells from N stock_shards rows instead:
+#   - each shard holds an allowance of units it may sell (`available`) and the units it has
+#     sold since the last rebalance (`sold`);
+#   - checkout takes units from a random shard with enough left that no other checkout
+#     holds (FOR UPDATE SKIP LOCKED on PostgreSQL), with a conditional UPDATE, so concurrent
+#     checkouts lock different rows and can never oversell;
+#   - the rebalancer takes the units sold through the shards off stock_level and splits the
+#     remaining stock evenly across them again, every STOCK_SHARD_REBALANCE_SECONDS in the
+#     storefront and right away after manager edits, production and sharding changes.
+# Until the next rebalance stock_level still counts units sold through the shards, so
+# Inventory.current_stock subtracts them where the exact figure matters (catalog, checkout,
+# the stock ledger); other readers of stock_level lag by at most one rebalance. Each
+# rebalance that takes sales off also re-states the exact balance in the stock ledger.
+# Enable with `flask --app sales shard-stock <sku> <shards>` (0 turns it off again).
+#
+# Units held for carts (see stock_holds.py) are taken the same way, but counted in `held`
+# instead of `sold`: on the inventory row for unsharded products, or on the shard they came
+# from. The rebalancer leaves holds where they are and only splits the rest of the stock.
+#
+# These writes only move stock, so they don't bump the catalog's cache version (see
+# cache_bus.py) unless a product goes on or off sale: STOCK_ONLY marks their statements and
+# _note_on_sale bumps when what shoppers can buy crosses zero.
+
+REBALANCE_SECONDS = float(os.getenv('STOCK_SHARD_REBALANCE_SECONDS', '2'))
+# Products the rebalancer looks after, including ones whose sharding was just turned off
+SHARDED = or_(Inventory.stock_shards > 0, Inventory.shards.any())
+STOCK_ONLY = {'synchronize_session': False, 'cache_bus': False}
+
+logger = logging.getLogger(__name__)
+
+def _note_on_sale(db, before, after):
+    """Bumps the inventory cache version if a product's available units went from some to
+    none or back."""
+    if (before > 0) != (after > 0):
+        cache_bus.note_written(db, 'inventory')
+
+def _available(db, product_id):
+    return db.execute(select(Inventory.available_stock).where(Inventory.id == product_id)).scalar()
+
+def _take_from_shard(db, product_id, shard, quantity, into):
+    result = db.execute(
+        update(StockShard)
+        .where(StockShard.product_id == product_id, StockShard.shard == shard, StockShard.available >= quantity)
+        .values({StockShard.available: StockShard.available - quantity, into: into + quantity})
+    )
+    return result.rowcount == 1
+
+def _take_from_shards(db, product_id, quantity, into):
+    """Moves units from the product's shards' `available` to `into` (sold or held). Returns
+    [(shard, units)], or None if there aren't enough."""
+    shard = db.query(StockShard.shard).filter(
+        StockShard.product_id == product_id, StockShard.available >= quantity
+    ).order_by(func.random()).limit(1).with_for_update(skip_locked=True).scalar()
+    if shard is not None and _take_from_shard(db, product_id, shard, quantity, into):
+        return [(shard, quantity)]
+    # No free shard has enough left: take what each has, waiting for the ones in use. Always
+    # in shard order, like the rebalancer, since PostgreSQL keeps a row locked even when an
+    # UPDATE that waited for it then finds the row no longer matches
+    taken = []
+    remaining = quantity
+    allowances = db.query(StockShard.shard, StockShard.available).filter(
+        StockShard.product_id == product_id, StockShard.available > 0).order_by(StockShard.shard).all()
+    for shard, available in allowances:
+        portion = min(available, remaining)
+        if _take_from_shard(db, product_id, shard, portion, into):
+            taken.append((shard, portion))
+            remaining -= portion
+        if not remaining:
+            return taken
+    return None
+
+def take(db, product, quantity):
+    """Takes `quantity` units of a product out of stock for an order. Returns the new stock
+    level, or None if there isn't enough, in which case the caller must roll back. Does not commit."""
+    if not product.stock_shards:
+        taken = db.execute(
+            update(Inventory)
+            .where(Inventory.id == product.id, Inventory.stock_level - Inventory.held >= quantity)
+            .values(stock_level=Inventory.stock_level - quantity, last_updated=datetime.utcnow())
+            .returning(Inventory.stock_level, Inventory.stock_level - Inventory.held),
+            execution_options=STOCK_ONLY
+        ).first()
+        if taken is None:
+            return None
+        stock_level, available = taken
+    else:
+        if _take_from_shards(db, product.id, quantity, StockShard.sold) is None:
+            return None
+        stock_level, available = db.execute(
+            select(Inventory.current_stock, Inventory.available_stock).where(Inventory.id == product.id)).one()
+    _note_on_sale(db, available + quantity, available)
+    return stock_level
+
+# --- Held Units ---
+
+def hold(db, product, quantity):
+    """Sets `quantity` units of a product aside for a cart. Returns [(shard or None, units)]
+    saying where they are held, or None if there aren't enough, in which case the caller must
+    roll back. Does not commit."""
+    if product.stock_shards:
+        placed = _take_from_shards(db, product.id, quantity, StockShard.held)
+        if placed is None:
+            return None
+        available = _available(db, product.id)
+    else:
+        available = db.execute(
+            update(Inventory)
+            .where(Inventory.id == product.id, Inventory.stock_level - Inventory.held >= quantity)
+            .values(held=Inventory.held + quantity, last_updated=datetime.utcnow())
+            .returning(Inventory.stock_level - Inventory.held),
+            execution_options=STOCK_ONLY
+        ).scalar()
+        if available is None:
+            return None
+        placed = [(None, quantity)]
+    _note_on_sale(db, available + quantity, available)
+    return placed
+
+def release(db, product_id, shard, quantity):
+    """Puts held units back on sale. Does not commit."""
+    if shard is None:
+        available = db.execute(
+            update(Inventory).where(Inventory.id == product_id)
+            .values(held=Inventory.held - quantity, last_updated=datetime.utcnow())
+            .returning(Inventory.stock_level - Inventory.held),
+            execution_options=STOCK_ONLY
+        ).scalar()
+    else:
+        db.execute(update(StockShard).where(StockShard.product_id == product_id, StockShard.shard == shard)
+                   .values(held=StockShard.held - quantity, available=StockShard.available + quantity))
+        available = _available(db, product_id)
+    if available is not None:
+        _note_on_sale(db, available - quantity, available)
+
+def sell_held(db, product_id, shard, quantity):
+    """Turns held units into sold ones. Returns the new stock level. Does not commit."""
+    if shard is None:
+        return db.execute(
+            update(Inventory).where(Inventory.id == product_id)
+            .values(held=Inventory.held - quantity, stock_level=Inventory.stock_level - quantity, last_updated=datetime.utcnow())
+            .returning(Inventory.stock_level),
+            execution_options=STOCK_ONLY
+        ).scalar()
+    db.execute(update(StockShard).where(StockShard.product_id == product_id, StockShard.shard == shard)
+               .values(held=StockShard.held - quantity, sold=StockShard.sold + quantity))
+    return db.execute(select(Inventory.current_stock).where(Inventory.id == product_id)).scalar()
+
+# --- Rebalancing ---
+
+def rebalance(db, product_ids=None):
+    """Takes units sold through shards off stock_level and splits the remaining stock, less
+    held units, evenly across each product's shards, adding or removing shard rows to match
+    stock_shards. Holds on removed shards move to the inventory row.
+
+    Covers every product with shards (including ones whose sharding was just turned off), or
+    just those among `product_ids`. Locks each product's row and shards while it runs. Does not commit.
+    """
+    # Pending changes first: the query below reloads the products from the database
+    db.flush()
+    if engine.dialect.name == 'sqlite':
+        # SQLite ignores FOR UPDATE; a write takes its database-wide write lock instead, so no
+        # checkout commits between reading the shards and writing them back
+        db.execute(update(StockShard).where(false()).values(sold=StockShard.sold))
+    query = db.query(Inventory).filter(SHARDED)
+    if product_ids is not None:
+        query = query.filter(Inventory.id.in_(list(product_ids)))
+    # FOR NO KEY UPDATE, which still lets checkouts insert order items referencing the product
+    query = query.order_by(Inventory.id).with_for_update(key_share=True).populate_existing()
+    for product in query:
+        shards = db.query(StockShard).filter(StockShard.product_id == product.id).order_by(StockShard.shard).with_for_update(key_share=True).all()
+        if not shards and not product.stock_shards:
+            continue
+        sold = sum(shard.sold for shard in shards)
+        stock = product.stock_level - sold
+        free = max(stock - product.held - sum(shard.held for shard in shards), 0)
+        if not sold and sum(shard.available for shard in shards) == free and len(shards) == product.stock_shards:
+            continue
+        moved = {}
+        if sold:
+            moved.update(stock_level=stock, last_updated=datetime.utcnow())
+            stock_ledger.record_balance(db, stock_ledger.PRODUCT, product.id, stock, 'rebalance')
+        removed = shards[product.stock_shards:]
+        if any(shard.held for shard in removed):
+            moved['held'] = product.held + sum(shard.held for shard in removed)
+            db.execute(update(StockHold).where(StockHold.product_id == product.id, StockHold.shard >= product.stock_shards)
+                       .values(shard=None), execution_options={'synchronize_session': False})
+        if moved:
+            # Moving units between the row and its shards doesn't change what's on sale; the
+            # UPDATE also sets them on the loaded product
+            db.execute(update(Inventory).where(Inventory.id == product.id).values(moved), execution_options={'cache_bus': False})
+        for shard in removed:
+            db.delete(shard)
+        shards = shards[:product.stock_shards]
+        shards += [StockShard(product_id=product.id, shard=number, held=0) for number in range(len(shards), product.stock_shards)]
+        for number, shard in enumerate(shards):
+            shard.available = free // len(shards) + (1 if number < free % len(shards) else 0)
+            shard.sold = 0
+            db.add(shard)
+    db.flush()
+
+def set_shards(db, product, shards):
+    """Turns sharding on (with `shards` counters) or off (0) for a product. Does not commit."""
+    rebalance(db, [product.id])
+    product.stock_shards = shards
+    rebalance(db, [product.id])
+
+# --- Rebalancer ---
+
+class ShardRebalancer:
+    """Rebalances every sharded product in the background."""
+    def __init__(self, interval=REBALANCE_SECONDS):
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='stock-shard-rebalancer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            db = get_db()
+            try:
+                product_ids = [product_id for (product_id,) in db.query(Inventory.id).filter(SHARDED)]
+                # A transaction per product, so it never holds one product's shards while
+                # waiting for a checkout that holds another's
+                for product_id in product_ids:
+                    rebalance(db, [product_id])
+                    db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception("Rebalancing stock shards failed")
+            finally:
+                db.close()
+
+rebalancer = ShardRebalancer()
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# The app's modules import each other by name and read DATABASE_URL when `database` is first
+# imported, so the tests run against a scratch SQLite file set up before anything imports it
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='metamorphocus-tests-'), 'test.db')
+os.environ.setdefault('SQL_INSTRUMENTATION', '0')
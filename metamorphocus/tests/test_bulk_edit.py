@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+from sqlalchemy import update
+from database import init_db, get_db, Inventory, StockMovement
+import bulk_edit
+
+COLUMNS = ['product_name', 'sku', 'category', 'stock_level', 'min_stock', 'unit_price']
+
+def add_products(db, *skus):
+    products = [Inventory(product_name=sku.title(), sku=sku, category='Prints', stock_level=10, min_stock=2, unit_price=5.00) for sku in skus]
+    db.add_all(products)
+    db.commit()
+    return products
+
+def load_grid(db, products):
+    return pd.DataFrame([{'id': p.id, **{column: getattr(p, column) for column in COLUMNS}} for p in products])
+
+def sell(db, product, quantity):
+    db.execute(update(Inventory).where(Inventory.id == product.id).values(stock_level=Inventory.stock_level - quantity))
+    db.commit()
+
+def movements(db, product):
+    return [delta for (delta,) in db.query(StockMovement.delta).filter(StockMovement.item_id == product.id).order_by(StockMovement.id)]
+
+@pytest.fixture
+def db():
+    init_db()
+    session = get_db()
+    yield session
+    session.close()
+
+def test_only_changed_cells_are_written(db):
+    product, = add_products(db, 'GRID-1')
+    grid = load_grid(db, [product])
+    edited = grid.copy()
+    edited.loc[0, 'min_stock'] = 4
+
+    changes = bulk_edit.diff_frames(grid, edited, COLUMNS)
+    assert changes.updates == [{'id': product.id, 'min_stock': 4}]
+
+    # A sale after the grid was loaded is kept
+    sell(db, product, 3)
+    bulk_edit.apply_changes(db, Inventory, changes)
+
+    db.expire_all()
+    assert (product.stock_level, product.min_stock) == (7, 4)
+    assert movements(db, product) == []
+
+def test_stock_edit_is_recorded(db):
+    product, = add_products(db, 'GRID-2')
+    grid = load_grid(db, [product])
+    edited = grid.copy()
+    edited.loc[0, 'stock_level'] = 15.0
+
+    bulk_edit.apply_changes(db, Inventory, bulk_edit.diff_frames(grid, edited, COLUMNS))
+
+    db.expire_all()
+    assert product.stock_level == 15
+    assert movements(db, product) == [5]
+
+def test_stock_edit_fails_if_stock_moved_on(db):
+    product, = add_products(db, 'GRID-3')
+    grid = load_grid(db, [product])
+    edited = grid.copy()
+    edited.loc[0, ['stock_level', 'min_stock']] = [20, 5]
+    changes = bulk_edit.diff_frames(grid, edited, COLUMNS)
+
+    sell(db, product, 3)
+    with pytest.raises(bulk_edit.StockChanged) as raised:
+        bulk_edit.apply_changes(db, Inventory, changes)
+
+    assert raised.value.item_ids == [product.id]
+    db.expire_all()
+    assert (product.stock_level, product.min_stock) == (7, 2)
+    assert movements(db, product) == []
+
+def test_filtered_grid_rows_match_on_id(db):
+    first, second, third = add_products(db, 'GRID-4', 'GRID-5', 'GRID-6')
+    # The Inventory page shows a filtered grid with a fresh index
+    grid = load_grid(db, [first, second, third]).iloc[[0, 2]].reset_index(drop=True)
+    edited = pd.concat([grid, pd.DataFrame([{'product_name': 'New', 'sku': 'GRID-7', 'category': 'Prints',
+                                             'stock_level': 1, 'min_stock': 0, 'unit_price': 2.50}])], ignore_index=True)
+    edited.loc[1, 'unit_price'] = 6.00
+
+    changes = bulk_edit.diff_frames(grid, edited, COLUMNS)
+
+    assert changes.updates == [{'id': third.id, 'unit_price': 6.00}]
+    assert [row['sku'] for row in changes.inserts] == ['GRID-7']
+    assert changes.deletes == []
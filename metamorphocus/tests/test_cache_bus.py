@@ -0,0 +1,33 @@
+from database import init_db, get_db, CacheVersion, Inventory
+import stock_shards
+
+def inventory_version(db):
+    return db.query(CacheVersion.version).filter(CacheVersion.name == 'inventory').scalar()
+
+def test_stock_moves_bump_only_when_a_product_goes_on_or_off_sale():
+    init_db()
+    db = get_db()
+    try:
+        product = Inventory(product_name='Print', sku='BUS-1', category='Prints', stock_level=3, min_stock=0, unit_price=5.00)
+        db.add(product)
+        db.commit()
+        version = inventory_version(db)
+
+        def after(change):
+            change()
+            db.commit()
+            return inventory_version(db) - version
+
+        assert after(lambda: stock_shards.take(db, product, 1)) == 0
+        assert after(lambda: stock_shards.hold(db, product, 1)) == 0
+        # The last available unit goes into a cart: the product is off sale
+        assert after(lambda: stock_shards.hold(db, product, 1)) == 1
+        assert after(lambda: stock_shards.sell_held(db, product.id, None, 1)) == 1
+        # ... and back on sale when the other hold is returned
+        assert after(lambda: stock_shards.release(db, product.id, None, 1)) == 2
+
+        # Manager edits always bump
+        product.min_stock = 1
+        assert after(lambda: None) == 3
+    finally:
+        db.close()
@@ -0,0 +1,52 @@
+from sqlalchemy import func
+from database import init_db, get_db, Inventory, Order, OrderItem, Finance
+import fulfillment
+import jobs
+
+def place_order(db, sku):
+    product = Inventory(product_name='Print', sku=sku, category='Prints', stock_level=5, min_stock=0, unit_price=12.50)
+    db.add(product)
+    db.flush()
+    order = Order(customer_name='Ada', customer_email='ada@example.com', total_amount=25.00,
+                  items=[OrderItem(product_id=product.id, product_name='Print', quantity=2, price=12.50)])
+    db.add(order)
+    db.flush()
+    product.stock_level -= 2
+    db.commit()
+    return product, order
+
+def order_income(db, order_id):
+    return db.query(func.coalesce(func.sum(Finance.amount), 0)).filter(Finance.order_id == order_id).scalar()
+
+def test_cancel_removes_order_income():
+    init_db()
+    db = get_db()
+    try:
+        product, order = place_order(db, 'CANCEL-1')
+        jobs.create_order_finance_entry(db, {'order_id': order.id})
+        db.commit()
+        assert order_income(db, order.id) == 25.00
+
+        assert fulfillment.transition_orders(db, [order.id], 'cancelled') == [order.id]
+        # A second cancel changes nothing
+        assert fulfillment.transition_orders(db, [order.id], 'cancelled') == []
+
+        db.expire_all()
+        assert order_income(db, order.id) == 0
+        assert product.stock_level == 5
+    finally:
+        db.close()
+
+def test_finance_job_skips_cancelled_orders():
+    init_db()
+    db = get_db()
+    try:
+        _, order = place_order(db, 'CANCEL-2')
+        fulfillment.transition_orders(db, [order.id], 'cancelled')
+
+        jobs.create_order_finance_entry(db, {'order_id': order.id})
+        db.commit()
+
+        assert order_income(db, order.id) == 0
+    finally:
+        db.close()
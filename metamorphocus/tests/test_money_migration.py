@@ -0,0 +1,54 @@
+import os
+import pytest
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.orm import Session
+import database
+from database import init_db, get_db, Inventory, Settings, SchemaMigration, SchemaVersion
+
+def unit_price(engine, sku):
+    with Session(engine) as db:
+        return db.execute(select(Inventory.unit_price).where(Inventory.sku == sku)).scalar()
+
+@pytest.mark.parametrize('wiped', [
+    # "Delete all data" on the Test Data page clears settings
+    (Settings,),
+    # ... on a database migrated before schema_migrations existed
+    (Settings, SchemaMigration),
+    # ... and one with no recorded schema version either
+    (Settings, SchemaMigration, SchemaVersion),
+])
+def test_money_is_not_converted_again(wiped):
+    init_db()
+    sku = f"MONEY-{len(wiped)}"
+    db = get_db()
+    try:
+        db.add(Inventory(product_name='Print', sku=sku, category='Prints', stock_level=1, min_stock=0, unit_price=19.99))
+        db.commit()
+    finally:
+        db.close()
+    with database.engine.begin() as conn:
+        for model in wiped:
+            conn.execute(delete(model))
+
+    init_db()
+
+    assert unit_price(database.engine, sku) == 19.99
+
+def test_dollar_columns_are_converted_once(monkeypatch, tmp_path):
+    # A database from before money was stored in cents: FLOAT dollars, no schema version
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE inventory (id INTEGER PRIMARY KEY, product_name VARCHAR NOT NULL, sku VARCHAR NOT NULL UNIQUE, "
+                          "category VARCHAR NOT NULL, stock_level INTEGER NOT NULL, min_stock INTEGER NOT NULL, unit_price FLOAT NOT NULL)"))
+        conn.execute(text("INSERT INTO inventory VALUES (1, 'Print', 'LEGACY-1', 'Prints', 1, 0, 19.99)"))
+    monkeypatch.setattr(database, 'engine', engine)
+
+    init_db()
+    assert unit_price(engine, 'LEGACY-1') == 19.99
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT unit_price FROM inventory")).scalar() == 1999
+
+    with engine.begin() as conn:
+        conn.execute(delete(Settings))
+    init_db()
+    assert unit_price(engine, 'LEGACY-1') == 19.99
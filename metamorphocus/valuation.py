@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, case
+from sqlalchemy.exc import IntegrityError
+from database import Inventory, Material, ValuationSnapshot, BillOfMaterials, Labor, ProductionOrder, Settings
+
+# --- Inventory & Materials Valuation ---
+# Computes the Analytics page's inventory and materials aggregates in SQL rather than loading
+# every row into a DataFrame, and keeps one ValuationSnapshot row per day so the value of
+# stock on hand can be charted over time.
+
+SNAPSHOT_REFRESH_MINUTES = 60
+TOP_MATERIALS_LIMIT = 10
+
+# Money on the left so the products come back in dollars (see money.Money)
+inventory_value = Inventory.unit_price * Inventory.stock_level
+material_value = Material.cost_per_unit * Material.quantity
+is_low_stock = Inventory.stock_level <= Inventory.min_stock
+needs_reorder = Material.quantity <= Material.reorder_point
+
+def inventory_summary(db):
+    """Returns totals for the Inventory Insights metrics, or None if there are no products."""
+    count, total_value, total_units, low_stock_count = db.query(
+        func.count(Inventory.id),
+        func.coalesce(func.sum(inventory_value), 0.0),
+        func.coalesce(func.sum(Inventory.stock_level), 0),
+        func.coalesce(func.sum(case((is_low_stock, 1), else_=0)), 0),
+    ).one()
+    if not count:
+        return None
+    return {
+        'product_count': count,
+        'total_value': float(total_value),
+        'total_units': int(total_units),
+        'low_stock_count': int(low_stock_count),
+        'avg_value': float(total_value) / count,
+    }
+
+def inventory_value_by_category(db):
+    """Returns [(category, total value)] sorted by value, highest first."""
+    total = func.sum(inventory_value)
+    return db.query(Inventory.category, total).group_by(Inventory.category).order_by(total.desc()).all()
+
+def stock_status_counts(db):
+    """Returns {'Healthy': n, 'Low': n} for products."""
+    status = case((is_low_stock, 'Low'), else_='Healthy')
+    return dict(db.query(status, func.count(Inventory.id)).group_by(status).all())
+
+def materials_summary(db):
+    """Returns totals for the Materials Cost Analysis metrics, or None if there are no materials."""
+    count, total_value, reorder_count = db.query(
+        func.count(Material.id),
+        func.coalesce(func.sum(material_value), 0.0),
+        func.coalesce(func.sum(case((needs_reorder, 1), else_=0)), 0),
+    ).one()
+    if not count:
+        return None
+    return {
+        'material_count': count,
+        'total_value': float(total_value),
+        'reorder_count': int(reorder_count),
+        'avg_value': float(total_value) / count,
+    }
+
+def top_materials_by_value(db, limit=TOP_MATERIALS_LIMIT):
+    """Returns [(material name, total cost)] for the most valuable materials on hand."""
+    return db.query(Material.material_name, material_value).order_by(material_value.desc()).limit(limit).all()
+
+def material_status_counts(db):
+    """Returns {'Sufficient': n, 'Need Reorder': n} for materials."""
+    status = case((needs_reorder, 'Need Reorder'), else_='Sufficient')
+    return dict(db.query(status, func.count(Material.id)).group_by(status).all())
+
+def product_unit_costs(db):
+    """Returns {product_id: (material cost per unit, labor cost per unit)} from BOMs and logged labor.
+
+    Labor cost per unit is total hours x the hourly rate setting / total quantity produced,
+    and 0 when either is missing.
+    """
+    material_costs = dict(db.query(
+        BillOfMaterials.product_id,
+        func.sum(Material.cost_per_unit * BillOfMaterials.quantity_needed)
+    ).join(Material, BillOfMaterials.material_id == Material.id).group_by(BillOfMaterials.product_id).all())
+
+    hourly_rate_setting = db.query(Settings.setting_value).filter(Settings.setting_key == 'hourly_rate').scalar()
+    hourly_rate = float(hourly_rate_setting) if hourly_rate_setting else 0.0
+    labor_hours = dict(db.query(Labor.product_id, func.sum(Labor.hours)).group_by(Labor.product_id).all())
+    quantities = dict(db.query(ProductionOrder.product_id, func.sum(ProductionOrder.quantity_produced)).group_by(ProductionOrder.product_id).all())
+
+    costs = {}
+    for product_id in set(material_costs) | set(labor_hours):
+        hours = labor_hours.get(product_id) or 0
+        quantity = quantities.get(product_id) or 0
+        labor_cost = (hours * hourly_rate) / quantity if hours > 0 and quantity > 0 else 0.0
+        costs[product_id] = (float(material_costs.get(product_id) or 0.0), labor_cost)
+    return costs
+
+def record_snapshot(db, snapshot_date=None, force=False):
+    """Creates or refreshes the snapshot for a day (today by default) and commits.
+
+    An existing snapshot is only recomputed if it is older than SNAPSHOT_REFRESH_MINUTES,
+    unless `force` is set, so calling this on every page view stays cheap.
+    """
+    snapshot_date = snapshot_date or date.today()
+    snapshot = db.query(ValuationSnapshot).filter(ValuationSnapshot.snapshot_date == snapshot_date).first()
+    if snapshot and not force and snapshot.updated_at and snapshot.updated_at > datetime.utcnow() - timedelta(minutes=SNAPSHOT_REFRESH_MINUTES):
+        return snapshot
+
+    inventory = inventory_summary(db) or {}
+    materials = materials_summary(db) or {}
+    if snapshot is None:
+        snapshot = ValuationSnapshot(snapshot_date=snapshot_date)
+        db.add(snapshot)
+    snapshot.inventory_value = inventory.get('total_value', 0.0)
+    snapshot.inventory_units = inventory.get('total_units', 0)
+    snapshot.low_stock_count = inventory.get('low_stock_count', 0)
+    snapshot.materials_value = materials.get('total_value', 0.0)
+    snapshot.reorder_count = materials.get('reorder_count', 0)
+    snapshot.updated_at = datetime.utcnow()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process recorded today's snapshot first
+        db.rollback()
+        snapshot = db.query(ValuationSnapshot).filter(ValuationSnapshot.snapshot_date == snapshot_date).first()
+    return snapshot
+
+def snapshot_history(db, since=None):
+    """Returns snapshots in date order, optionally starting at `since`."""
+    query = db.query(ValuationSnapshot)
+    if since is not None:
+        query = query.filter(ValuationSnapshot.snapshot_date >= since)
+    return query.order_by(ValuationSnapshot.snapshot_date).all()